@@ -15,7 +15,7 @@ from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from auth import get_current_user
-from db import CreditTransaction, Render, User, get_db
+from db import CreditTransaction, Render, User, get_db, utcnow
 
 router = APIRouter(prefix="/admin/api", tags=["admin"])
 
@@ -113,7 +113,7 @@ def _apply_filters(query, params: dict):
 
   time_range = params.get("time_range")
   if time_range:
-    now = datetime.datetime.utcnow()
+    now = utcnow()
     mapping = {"1h": 1, "24h": 24, "7d": 168, "30d": 720}
     hours = mapping.get(time_range)
     if hours:
@@ -295,7 +295,7 @@ async def cancel_render(
         detail=f"Cannot cancel render with status '{render.status}'",
     )
   render.status = "canceled"
-  render.finished_at = datetime.datetime.utcnow()
+  render.finished_at = utcnow()
   db.commit()
   return JSONResponse({"status": "canceled", "render_id": render_id})
 
@@ -529,7 +529,7 @@ async def grant_tokens(
   if not isinstance(amount, int) or amount <= 0:
     raise HTTPException(status_code=400, detail="Amount must be a positive integer")
 
-  user = db.query(User).filter(User.email == email).first()
+  user = db.query(User).filter(User.email_normalized == email.lower()).first()
   if not user:
     raise HTTPException(status_code=404, detail=f"User {email} not found")
 
@@ -0,0 +1,39 @@
+"""Add indexes for case-insensitive email and token lookups on users.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_users_email_lower", "users", [sa.text("lower(email)")],
+    )
+    op.create_index(
+        "ix_users_verification_token", "users", ["verification_token"],
+        unique=True,
+        sqlite_where=sa.text("verification_token IS NOT NULL"),
+        postgresql_where=sa.text("verification_token IS NOT NULL"),
+    )
+    op.create_index(
+        "ix_users_reset_token", "users", ["reset_token"],
+        unique=True,
+        sqlite_where=sa.text("reset_token IS NOT NULL"),
+        postgresql_where=sa.text("reset_token IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_reset_token", table_name="users")
+    op.drop_index("ix_users_verification_token", table_name="users")
+    op.drop_index("ix_users_email_lower", table_name="users")
@@ -0,0 +1,39 @@
+"""Add users.email_normalized and use it for case-insensitive lookups.
+
+Replaces the lower(email) functional index from 004 with a unique index
+on a stored lowercase copy. The backfill fails if two existing accounts
+differ only by email casing; merge those before upgrading.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("email_normalized", sa.String(), nullable=True),
+    )
+    op.execute("UPDATE users SET email_normalized = LOWER(TRIM(email))")
+    op.create_index(
+        "ix_users_email_normalized", "users", ["email_normalized"], unique=True,
+    )
+    op.drop_index("ix_users_email_lower", table_name="users")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_users_email_lower", "users", [sa.text("lower(email)")],
+    )
+    op.drop_index("ix_users_email_normalized", table_name="users")
+    op.drop_column("users", "email_normalized")
@@ -0,0 +1,24 @@
+"""Add a (status, started_at) index on renders for the stale-render reaper.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_render_status_started_at", "renders", ["status", "started_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_render_status_started_at", table_name="renders")
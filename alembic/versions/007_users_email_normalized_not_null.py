@@ -0,0 +1,38 @@
+"""Backfill users.email_normalized and make it NOT NULL.
+
+005 added the column as nullable and left it to the ORM to fill in, so
+rows written outside the ORM could still be missing it and every lookup
+by email would skip them.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "UPDATE users SET email_normalized = LOWER(TRIM(email)) "
+        "WHERE email_normalized IS NULL"
+    )
+    # Batch mode rebuilds the table on SQLite, which can't ALTER COLUMN.
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.alter_column(
+            "email_normalized", existing_type=sa.String(), nullable=False,
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.alter_column(
+            "email_normalized", existing_type=sa.String(), nullable=True,
+        )
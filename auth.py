@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import collections
 import datetime
 import logging
 import os
@@ -19,11 +18,12 @@ from fastapi.responses import JSONResponse, RedirectResponse
 from google.auth.transport.requests import Request as GoogleRequest
 from google.oauth2 import id_token as google_id_token
 import bcrypt as _bcrypt
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 import email_service
 import notification_service
-from db import CreditTransaction, User, get_db
+from db import CreditTransaction, User, get_db, utcnow
 from credits import token_model_info
 
 # Lazy import to avoid circular dependency at module level
@@ -66,10 +66,13 @@ _BLOCKED_PASSWORDS = {
 GOOGLE_AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
 GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
 
-# Simple in-memory rate limiter: {ip: deque of timestamps}
+# Simple in-memory fixed-window rate limiter: {ip: (window_expires_at, count)}
 _rate_limit_window = 300  # 5 minutes
 _rate_limit_max = 10  # max attempts per window
-_rate_buckets: dict[str, collections.deque] = {}
+_rate_buckets: dict[str, tuple[float, int]] = {}
+
+# Media types accepted by _require_json (parameters such as charset ignored)
+_JSON_CONTENT_TYPES = frozenset({"application/json"})
 
 # Account lockout: {email: (consecutive_failures, last_failure_time)}
 _LOCKOUT_MAX_FAILURES = 5
@@ -96,17 +99,25 @@ if not email_service.is_configured():
   )
 
 
+def _rate_incr(key: str, now: float) -> int:
+  """Count one attempt for key and return the count in its current window.
+
+  Same semantics as a Redis INCR + EXPIRE-on-create: the window starts at
+  the first attempt and the counter resets once it expires. O(1) per call.
+  """
+  expires_at, count = _rate_buckets.get(key, (0.0, 0))
+  if now >= expires_at:
+    expires_at, count = now + _rate_limit_window, 0
+  count += 1
+  _rate_buckets[key] = (expires_at, count)
+  return count
+
+
 def _check_rate_limit(request: Request) -> None:
   """Raise 429 if the IP has exceeded the auth attempt rate limit."""
   ip = request.client.host if request.client else "unknown"
-  now = time.time()
-  bucket = _rate_buckets.setdefault(ip, collections.deque())
-  # Evict old entries
-  while bucket and bucket[0] < now - _rate_limit_window:
-    bucket.popleft()
-  if len(bucket) >= _rate_limit_max:
+  if _rate_incr(ip, time.time()) > _rate_limit_max:
     raise HTTPException(status_code=429, detail="Too many attempts. Try again later.")
-  bucket.append(now)
 
 
 def _require_json(request: Request) -> None:
@@ -116,8 +127,8 @@ def _require_json(request: Request) -> None:
   multipart/form-data, so requiring application/json blocks cross-site
   form submissions.
   """
-  ct = (request.headers.get("content-type") or "").lower()
-  if "application/json" not in ct:
+  ct = request.headers.get("content-type") or ""
+  if ct.split(";", 1)[0].strip().lower() not in _JSON_CONTENT_TYPES:
     raise HTTPException(
         status_code=415,
         detail="Content-Type must be application/json",
@@ -190,7 +201,7 @@ def _create_session_token(user: User) -> str:
   payload = {
       "sub": user.id,
       "email": user.email,
-      "exp": datetime.datetime.utcnow()
+      "exp": utcnow()
       + datetime.timedelta(hours=SESSION_TTL_HOURS),
   }
   return jwt.encode(payload, SESSION_SECRET, algorithm="HS256")
@@ -310,12 +321,15 @@ async def callback(
   if not id_info.get("email_verified"):
     return RedirectResponse("/?auth_error=email_not_verified")
 
+  # Keep the display casing from the ID token; matching goes through the
+  # lowercased email_normalized column.
   email = id_info.get("email", "")
+  email_key = email.strip().lower()
   google_sub = id_info.get("sub", "")
 
   # 3) Upsert user — check by google_sub first, then by email (account linking)
   user = db.query(User).filter(User.google_sub == google_sub).first()
-  now = datetime.datetime.utcnow()
+  now = utcnow()
 
   if user:
     # Returning Google user — update last_login
@@ -324,7 +338,7 @@ async def callback(
     db.commit()
   else:
     # Check if an email/password user already exists with this email
-    existing = db.query(User).filter(User.email == email).first()
+    existing = db.query(User).filter(User.email_normalized == email_key).first()
     if existing:
       # Link Google identity to existing account
       existing.google_sub = google_sub
@@ -357,7 +371,7 @@ async def callback(
       db.add(tx)
 
       # One-time bonus for specific accounts
-      bonus = _BONUS_GRANTS.pop(email, 0)
+      bonus = _BONUS_GRANTS.pop(email_key, 0)
       if bonus:
         user.credits_balance += bonus
         bonus_tx = CreditTransaction(
@@ -414,7 +428,7 @@ async def me(user: User = Depends(get_current_user)):
           "has_google": user.google_sub is not None,
           "credits_balance": user.credits_balance,
           "created_at": user.created_at.isoformat() if user.created_at else None,
-          "token_model": token_model_info(),
+          "token_model": dict(token_model_info()),
       }
   })
 
@@ -438,12 +452,7 @@ async def register(request: Request, db: Session = Depends(get_db)):
   if pw_error:
     raise HTTPException(status_code=400, detail=pw_error)
 
-  # Check for existing user
-  existing = db.query(User).filter(User.email == email).first()
-  if existing:
-    raise HTTPException(status_code=409, detail="An account with this email already exists")
-
-  now = datetime.datetime.utcnow()
+  now = utcnow()
   verification_token = secrets.token_urlsafe(32)
 
   user = User(
@@ -458,7 +467,12 @@ async def register(request: Request, db: Session = Depends(get_db)):
       last_login=now,
   )
   db.add(user)
-  db.flush()
+  try:
+    # The unique email_normalized index doubles as the duplicate check.
+    db.flush()
+  except IntegrityError:
+    db.rollback()
+    raise HTTPException(status_code=409, detail="An account with this email already exists")
 
   # Log signup bonus
   tx = CreditTransaction(
@@ -529,7 +543,7 @@ async def login_email(request: Request, db: Session = Depends(get_db)):
 
   _check_account_lockout(email)
 
-  user = db.query(User).filter(User.email == email).first()
+  user = db.query(User).filter(User.email_normalized == email).first()
   if not user or not user.password_hash:
     _record_login_failure(email)
     raise HTTPException(status_code=401, detail="Invalid email or password")
@@ -539,7 +553,7 @@ async def login_email(request: Request, db: Session = Depends(get_db)):
     raise HTTPException(status_code=401, detail="Invalid email or password")
 
   _clear_login_failures(email)
-  user.last_login = datetime.datetime.utcnow()
+  user.last_login = utcnow()
   db.commit()
 
   session_token = _create_session_token(user)
@@ -569,7 +583,7 @@ async def verify_email(
     return RedirectResponse("/?auth_error=invalid_verification_token")
 
   # Check expiry
-  now = datetime.datetime.utcnow()
+  now = utcnow()
   if user.token_expires_at and now > user.token_expires_at:
     return RedirectResponse("/?auth_error=token_expired")
 
@@ -600,12 +614,12 @@ async def forgot_password(request: Request, db: Session = Depends(get_db)):
   if not email or "@" not in email:
     return JSONResponse(success_msg)
 
-  user = db.query(User).filter(User.email == email).first()
+  user = db.query(User).filter(User.email_normalized == email).first()
   if not user or not user.password_hash:
     # No user or Google-only user — silently do nothing
     return JSONResponse(success_msg)
 
-  now = datetime.datetime.utcnow()
+  now = utcnow()
   reset_token = secrets.token_urlsafe(32)
   user.reset_token = reset_token
   user.token_expires_at = now + RESET_TOKEN_TTL
@@ -640,7 +654,7 @@ async def reset_password(request: Request, db: Session = Depends(get_db)):
     raise HTTPException(status_code=400, detail="Invalid or expired reset link")
 
   # Check expiry
-  now = datetime.datetime.utcnow()
+  now = utcnow()
   if user.token_expires_at and now > user.token_expires_at:
     user.reset_token = None
     user.token_expires_at = None
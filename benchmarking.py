@@ -2,33 +2,77 @@
 
 """Historical benchmarking engine.
 
-Maintains a local JSON history of evaluation scores and computes
-percentile ranks for the current evaluation relative to all
+Maintains a local append-only JSONL history of evaluation scores and
+computes percentile ranks for the current evaluation relative to all
 historical evaluations.
 
-History file: data/benchmark_history.json
+History file: data/benchmark_history.jsonl (one JSON object per line)
 """
 
 from __future__ import annotations
 
-import json
 import logging
+import mmap
 import os
 import threading
 import time
-from bisect import bisect_left
 from pathlib import Path
 
-HISTORY_FILE = Path(__file__).parent / "data" / "benchmark_history.json"
+import numpy as np
+import orjson
+
+HISTORY_FILE = Path(__file__).parent / "data" / "benchmark_history.jsonl"
+# Pre-JSONL history (a single JSON array); migrated on first load.
+LEGACY_HISTORY_FILE = Path(__file__).parent / "data" / "benchmark_history.json"
 _CACHE_TTL = 3600  # 1 hour
 _lock = threading.Lock()
 _cache: dict | None = None
 _cache_ts: float = 0.0
 
+# Bumped whenever the cached history changes (reload or append), so
+# derived summaries can tell when they are stale.
+_history_version = 0
+
+# (history list, version, {vertical: summary}) — sorted score arrays and
+# distribution stats derived from that list at that version.
+_summary_cache: tuple[list[dict] | None, int, dict[str, tuple]] = (None, -1, {})
+
+
+def _read_history_file(path: Path) -> list[dict]:
+  """Parse a JSONL history file, skipping blank or truncated lines."""
+  with open(path, "rb") as f:
+    if os.fstat(f.fileno()).st_size == 0:
+      return []
+    history = []
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+      for line in iter(mm.readline, b""):
+        if not line.strip():
+          continue
+        try:
+          history.append(orjson.loads(line))
+        except orjson.JSONDecodeError:
+          logging.warning("Skipping malformed benchmark history line")
+  return history
+
+
+def _migrate_legacy_history() -> list[dict]:
+  """Convert the old JSON-array history file to JSONL, if present."""
+  if not LEGACY_HISTORY_FILE.is_file():
+    return []
+  data = orjson.loads(LEGACY_HISTORY_FILE.read_bytes())
+  if not isinstance(data, list):
+    return []
+  HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
+  tmp = HISTORY_FILE.with_suffix(".jsonl.tmp")
+  tmp.write_bytes(b"".join(orjson.dumps(h) + b"\n" for h in data))
+  os.replace(tmp, HISTORY_FILE)
+  logging.info("Migrated %d benchmark entries to %s", len(data), HISTORY_FILE)
+  return data
+
 
 def _load_history() -> list[dict]:
-  """Load benchmark history from local JSON file (cached)."""
-  global _cache, _cache_ts
+  """Load benchmark history from the local JSONL file (cached)."""
+  global _cache, _cache_ts, _history_version
   now = time.time()
   if _cache is not None and (now - _cache_ts) < _CACHE_TTL:
     return _cache  # type: ignore[return-value]
@@ -37,63 +81,67 @@ def _load_history() -> list[dict]:
     # Double-check after acquiring lock
     if _cache is not None and (now - _cache_ts) < _CACHE_TTL:
       return _cache  # type: ignore[return-value]
+    data: list[dict] = []
     try:
       if HISTORY_FILE.is_file():
-        data = json.loads(HISTORY_FILE.read_text())
-        if isinstance(data, list):
-          _cache = data
-          _cache_ts = time.time()
-          return data
+        data = _read_history_file(HISTORY_FILE)
+      else:
+        data = _migrate_legacy_history()
     except Exception as ex:
       logging.error("Failed to load benchmark history: %s", ex)
-    _cache = []
+    _cache = data
     _cache_ts = time.time()
-    return []
+    _history_version += 1
+    return data
 
 
-def _save_history(history: list[dict]) -> None:
-  """Persist benchmark history to local JSON file."""
-  global _cache, _cache_ts
+def _append_history(entry: dict) -> None:
+  """Append one entry to the JSONL history file and the in-memory cache."""
+  global _history_version
+  line = orjson.dumps(entry) + b"\n"
   try:
     HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with _lock:
-      HISTORY_FILE.write_text(json.dumps(history, indent=2))
-      _cache = history
-      _cache_ts = time.time()
+    # A single O_APPEND write keeps concurrent appenders from interleaving.
+    fd = os.open(HISTORY_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+      os.write(fd, line)
+    finally:
+      os.close(fd)
   except Exception as ex:
     logging.error("Failed to save benchmark history: %s", ex)
+    return
+  with _lock:
+    if _cache is not None:
+      _cache.append(entry)
+      _history_version += 1
 
 
-def _percentile_rank(sorted_values: list[float], value: float) -> float:
-  """Compute the percentile rank of a value in a sorted list.
+def _percentile_rank(sorted_values, value: float) -> float:
+  """Compute the percentile rank of a value in a sorted list or array.
 
   Returns a value from 0 to 100 (e.g. 72.0 means 72nd percentile).
   """
-  if not sorted_values:
+  if len(sorted_values) == 0:
     return 50.0  # No history — default to median
-  pos = bisect_left(sorted_values, value)
-  return round(pos / len(sorted_values) * 100, 1)
+  arr = np.asarray(sorted_values, dtype=np.float64)
+  pos = int(np.searchsorted(arr, value, side="left"))
+  return round(pos / len(arr) * 100, 1)
 
 
-def _distribution_stats(values: list[float]) -> dict:
-  """Compute p10/p25/p50/p75/p90 from a list of values."""
-  if not values:
-    return {}
-  sv = sorted(values)
-  n = len(sv)
+_PCT_LEVELS = (10, 25, 50, 75, 90)
 
-  def _pct(p: float) -> float:
-    idx = int(p / 100 * (n - 1))
-    return round(sv[idx], 1)
 
-  return {
-      "p10": _pct(10),
-      "p25": _pct(25),
-      "p50": _pct(50),
-      "p75": _pct(75),
-      "p90": _pct(90),
-      "mean": round(sum(sv) / n, 1),
-  }
+def _distribution_stats(values) -> dict:
+  """Compute p10/p25/p50/p75/p90 from a list or array of values."""
+  if len(values) == 0:
+    return {}
+  arr = np.asarray(values, dtype=np.float64)
+  # "lower" picks an actual sample at floor(p/100 * (n-1)), all five in
+  # a single pass over the data.
+  pcts = np.percentile(arr, _PCT_LEVELS, method="lower")
+  stats = {f"p{p}": round(float(v), 1) for p, v in zip(_PCT_LEVELS, pcts)}
+  stats["mean"] = round(float(arr.mean()), 1)
+  return stats
 
 
 def log_evaluation(
@@ -107,7 +155,7 @@ def log_evaluation(
 
   Called after each successful evaluation to grow the history.
   """
-  history = list(_load_history())  # shallow copy
+  _load_history()  # Migrate / warm the cache before the first append
   entry = {
       "report_id": report_id,
       "abcd_score": abcd_score,
@@ -116,8 +164,58 @@ def log_evaluation(
       "vertical": vertical or "",
       "ts": time.time(),
   }
-  history.append(entry)
-  _save_history(history)
+  _append_history(entry)
+
+
+def _history_summary(history: list[dict], vertical: str | None) -> tuple:
+  """Return (sample_size, abcd, persuasion, performance, distribution).
+
+  The three score arrays are sorted. Results are memoized per vertical
+  until _load_history returns a different list or the history version
+  changes.
+  """
+  global _summary_cache
+  version = _history_version
+  source, source_version, by_vertical = _summary_cache
+  if source is not history or source_version != version:
+    by_vertical = {}
+    _summary_cache = (history, version, by_vertical)
+  key = (vertical or "").lower()
+  cached = by_vertical.get(key)
+  if cached is not None:
+    return cached
+
+  # Optionally filter by vertical
+  if key:
+    filtered = [
+        h for h in history
+        if h.get("vertical", "").lower() == key
+    ]
+    # Fall back to global if filtered set is too small
+    if len(filtered) >= 10:
+      history = filtered
+
+  sample_size = len(history)
+
+  # Extract sorted score arrays
+  def _sorted_scores(field: str) -> np.ndarray:
+    arr = np.fromiter(
+        (h.get(field, 0) for h in history), dtype=np.float64, count=sample_size,
+    )
+    arr.sort()
+    return arr
+
+  abcd_vals = _sorted_scores("abcd_score")
+  pers_vals = _sorted_scores("persuasion_density")
+  perf_vals = _sorted_scores("performance_score")
+  distribution = {
+      "abcd": _distribution_stats(abcd_vals),
+      "persuasion": _distribution_stats(pers_vals),
+      "performance": _distribution_stats(perf_vals),
+  }
+  summary = (sample_size, abcd_vals, pers_vals, perf_vals, distribution)
+  by_vertical[key] = summary
+  return summary
 
 
 def compute_benchmarks(
@@ -138,24 +236,9 @@ def compute_benchmarks(
     Dict with percentile ranks and distribution context.
   """
   history = _load_history()
-
-  # Optionally filter by vertical
-  if vertical:
-    vertical_lower = vertical.lower()
-    filtered = [
-        h for h in history
-        if h.get("vertical", "").lower() == vertical_lower
-    ]
-    # Fall back to global if filtered set is too small
-    if len(filtered) >= 10:
-      history = filtered
-
-  sample_size = len(history)
-
-  # Extract sorted score arrays
-  abcd_vals = sorted(h.get("abcd_score", 0) for h in history)
-  pers_vals = sorted(h.get("persuasion_density", 0) for h in history)
-  perf_vals = sorted(h.get("performance_score", 0) for h in history)
+  sample_size, abcd_vals, pers_vals, perf_vals, distribution = (
+      _history_summary(history, vertical)
+  )
 
   return {
       "abcd_percentile": _percentile_rank(abcd_vals, abcd_score),
@@ -163,9 +246,5 @@ def compute_benchmarks(
       "performance_percentile": _percentile_rank(perf_vals, performance_score),
       "sample_size": sample_size,
       "vertical": vertical or "all",
-      "distribution": {
-          "abcd": _distribution_stats(abcd_vals),
-          "persuasion": _distribution_stats(pers_vals),
-          "performance": _distribution_stats(perf_vals),
-      },
+      "distribution": {k: dict(v) for k, v in distribution.items()},
   }
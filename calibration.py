@@ -12,12 +12,17 @@ import datetime
 import logging
 from collections import defaultdict
 
+import numpy as np
 from sqlalchemy.orm import Session
 
 _calibration_cache: dict = {}
 _cache_ts: datetime.datetime | None = None
 _CACHE_TTL_HOURS = 24
 
+# Linear blend weights: calibrated = raw * _RAW_WEIGHT + accuracy * _ACC_WEIGHT
+_RAW_WEIGHT = 0.7
+_ACC_WEIGHT = 0.3
+
 
 def compute_feature_reliability(
     db: Session,
@@ -66,12 +71,12 @@ def compute_all_reliability(db: Session) -> dict[str, dict]:
     Dict mapping feature_id -> reliability stats.
   """
   global _calibration_cache, _cache_ts
+  from db import FeatureFeedback, utcnow
 
-  now = datetime.datetime.utcnow()
+  now = utcnow()
   if _cache_ts and (now - _cache_ts).total_seconds() < _CACHE_TTL_HOURS * 3600:
     return _calibration_cache
 
-  from db import FeatureFeedback
   try:
     rows = db.query(FeatureFeedback).all()
   except Exception as ex:
@@ -123,5 +128,26 @@ def calibrate_confidence(
     return raw_confidence
 
   # Simple linear blend: 70% raw + 30% historical accuracy
-  calibrated = 0.7 * raw_confidence + 0.3 * accuracy
+  calibrated = _RAW_WEIGHT * raw_confidence + _ACC_WEIGHT * accuracy
   return round(min(1.0, max(0.0, calibrated)), 3)
+
+
+def calibrate_batch(raws: np.ndarray, accuracies: np.ndarray) -> np.ndarray:
+  """Vectorized calibrate_confidence for callers that already hold arrays.
+
+  Args:
+    raws: Raw LLM confidences.
+    accuracies: Historical accuracy per element; NaN where the feature has
+      no calibration data (the raw confidence is passed through).
+
+  Returns:
+    Calibrated confidences, same shape as raws. np.round may settle a
+    value sitting on a rounding tie one step (0.001) away from the
+    builtin round used by calibrate_confidence.
+  """
+  raws = np.asarray(raws, dtype=np.float64)
+  accuracies = np.asarray(accuracies, dtype=np.float64)
+  calibrated = np.round(
+      np.clip(_RAW_WEIGHT * raws + _ACC_WEIGHT * accuracies, 0.0, 1.0), 3,
+  )
+  return np.where(np.isnan(accuracies), raws, calibrated)
@@ -21,6 +21,7 @@
 """Module that defines global parameters"""
 
 import os
+import re
 from models import CreativeProviderType, LLMParameters
 
 # Use /tmp for temporary video files (Cloud Run ephemeral filesystem)
@@ -32,6 +33,25 @@ FFMPEG_BUFFER_REDUCED = os.path.join(_REDUCED_DIR, "buffer_reduced.mp4")
 
 os.makedirs(_REDUCED_DIR, exist_ok=True)
 
+# Comma separator with any surrounding whitespace, for the brand CSV fields
+_CSV_SPLIT = re.compile(r"\s*,\s*")
+
+
+def _parse_csv(value: str) -> list[str]:
+  """Split a comma delimited string into trimmed, non-empty items."""
+  if not value:
+    return []
+  return [t for t in _CSV_SPLIT.split(value.strip()) if t]
+
+
+# Provider lookup for set_parameters: accepts the enum value in upper or
+# lower case ("GCS", "gcs") or the member itself.
+_PROVIDER_TYPES = {
+    **{p.value: p for p in CreativeProviderType},
+    **{p.value.lower(): p for p in CreativeProviderType},
+    **{p: p for p in CreativeProviderType},
+}
+
 
 class Configuration:
   """Class that stores all parameters used by ABCD."""
@@ -134,11 +154,11 @@ class Configuration:
     self.verbose = verbose
     self.features_to_evaluate = features_to_evaluate
 
-    if creative_provider_type == CreativeProviderType.GCS.value:
-      self.creative_provider_type = CreativeProviderType.GCS
-
-    if creative_provider_type == CreativeProviderType.YOUTUBE.value:
-      self.creative_provider_type = CreativeProviderType.YOUTUBE
+    provider = _PROVIDER_TYPES.get(creative_provider_type)
+    if provider is None and isinstance(creative_provider_type, str):
+      # Mixed case ("YouTube") is rare; normalize only on a miss.
+      provider = _PROVIDER_TYPES.get(creative_provider_type.upper())
+    self.creative_provider_type = provider or self.creative_provider_type
 
     self.annotation_path = f"gs://{bucket_name}/ABCD/"
 
@@ -152,9 +172,9 @@ class Configuration:
       video_uris: a list of Google Cloud Storage URIs for videos or paths.
     """
     if isinstance(video_uris, str):
-      self.video_uris = [v.strip() for v in video_uris.split(",")]
+      self.video_uris = _parse_csv(video_uris)
     elif isinstance(video_uris, (list, tuple)):
-      self.video_uris = video_uris
+      self.video_uris = [v.strip() for v in video_uris if v and v.strip()]
     else:
       self.video_uris = [video_uris]
 
@@ -176,24 +196,10 @@ class Configuration:
         call_to_actions: comma delimited list of actions
     """
     self.brand_name = brand_name
-    self.brand_variations = (
-        [t.strip() for t in brand_variations.split(",")]
-        if brand_variations
-        else []
-    )
-    self.branded_products = (
-        [t.strip() for t in products.split(",")] if products else []
-    )
-    self.branded_products_categories = (
-        [t.strip() for t in products_categories.split(",")]
-        if products_categories
-        else []
-    )
-    self.branded_call_to_actions = (
-        [t.strip() for t in call_to_actions.split(",")]
-        if call_to_actions
-        else []
-    )
+    self.brand_variations = _parse_csv(brand_variations)
+    self.branded_products = _parse_csv(products)
+    self.branded_products_categories = _parse_csv(products_categories)
+    self.branded_call_to_actions = _parse_csv(call_to_actions)
 
   def set_annotations_params(
       self,
@@ -2,9 +2,8 @@
 """Script to create a new user with password and credits."""
 
 import sys
-import datetime
 import bcrypt as _bcrypt
-from db import SessionLocal, User, CreditTransaction
+from db import SessionLocal, User, CreditTransaction, utcnow
 import notification_service
 
 
@@ -13,12 +12,12 @@ def create_user(email: str, password: str, credits: int):
     db = SessionLocal()
     try:
         # Check if user already exists
-        existing = db.query(User).filter(User.email == email).first()
+        existing = db.query(User).filter(User.email_normalized == email.lower()).first()
         if existing:
             print(f"❌ Error: User with email '{email}' already exists")
             return False
         
-        now = datetime.datetime.utcnow()
+        now = utcnow()
         
         # Create user
         user = User(
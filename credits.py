@@ -7,7 +7,9 @@ import logging
 import math
 import os
 import subprocess
-from typing import Optional
+import threading
+from types import MappingProxyType
+from typing import Mapping, Optional
 
 from sqlalchemy.orm import Session
 
@@ -34,8 +36,25 @@ TOKEN_PACKS = {
     },
 }
 
+# Packs offered in 402 insufficient-credit responses. TOKEN_PACKS is fixed
+# at import, so the offer list is built once and shared by every response.
+# The tuple only stops callers adding or removing offers; the entries stay
+# plain dicts so JSONResponse can serialize them, and must not be modified.
+TOKEN_OFFERS = tuple(
+    {"pack": k, "usd": v["usd"], "tokens": v["tokens"]}
+    for k, v in TOKEN_PACKS.items()
+)
+
 # In-progress jobs per user (for concurrent upload limit)
-_active_jobs: dict[str, bool] = {}
+_active_jobs: set[str] = set()
+_active_jobs_lock = threading.Lock()
+
+# Server-wide cap on comparison variants being evaluated at once. New
+# comparisons are shed with a 503 rather than queued once it is reached.
+MAX_CONCURRENT_COMPARE_VARIANTS = int(
+    os.environ.get("MAX_CONCURRENT_COMPARE_VARIANTS", "10")
+)
+_compare_variants_in_flight = 0
 
 
 def required_tokens(duration_seconds: float) -> int:
@@ -79,7 +98,11 @@ def validate_upload(
     duration_seconds: float,
     user: User,
 ) -> Optional[dict]:
-  """Validate upload constraints. Returns error dict or None if valid."""
+  """Validate upload constraints. Returns error dict or None if valid.
+
+  Only `user.credits_balance` is read, so any object carrying that
+  attribute works; a missing attribute counts as a zero balance.
+  """
   # File size check
   file_size_mb = file_size_bytes / (1024 * 1024)
   if file_size_mb > MAX_FILE_SIZE_MB:
@@ -102,20 +125,14 @@ def validate_upload(
     }
 
   # Credit check — user just needs MIN_TOKENS_TO_RENDER to start
-  if user.credits_balance < MIN_TOKENS_TO_RENDER:
+  balance = getattr(user, "credits_balance", 0)
+  if balance < MIN_TOKENS_TO_RENDER:
     return {
         "error": "insufficient_credits",
-        "message": f"Need at least {MIN_TOKENS_TO_RENDER} credits but only have {user.credits_balance}",
-        "credits_balance": user.credits_balance,
+        "message": f"Need at least {MIN_TOKENS_TO_RENDER} credits but only have {balance}",
+        "credits_balance": balance,
         "required": MIN_TOKENS_TO_RENDER,
-        "offers": [
-            {
-                "pack": k,
-                "usd": v["usd"],
-                "tokens": v["tokens"],
-            }
-            for k, v in TOKEN_PACKS.items()
-        ],
+        "offers": TOKEN_OFFERS,
         "status_code": 402,
     }
 
@@ -127,9 +144,18 @@ def deduct_credits(
     user: User,
     duration_seconds: float,
     job_id: Optional[str] = None,
+    commit: bool = True,
 ) -> int:
   """Deduct credits from user and log the transaction.
 
+  Args:
+    db: Session the user row is attached to.
+    user: User being charged.
+    duration_seconds: Billable video duration.
+    job_id: Render/report ID recorded on the transaction.
+    commit: Commit now. Pass False to leave the charge pending in the
+      caller's transaction, e.g. alongside the render row update.
+
   Returns the number of tokens deducted.
   """
   tokens = required_tokens(duration_seconds)
@@ -143,8 +169,9 @@ def deduct_credits(
       job_id=job_id,
   )
   db.add(tx)
-  db.commit()
-  db.refresh(user)
+  if commit:
+    db.commit()
+    db.refresh(user)
 
   logging.info(
       "Deducted %d credits from user %s (balance: %d)",
@@ -153,6 +180,45 @@ def deduct_credits(
   return tokens
 
 
+def deduct_credits_batch(
+    db: Session,
+    user: User,
+    charges: list[tuple[float, Optional[str]]],
+) -> list[int]:
+  """Deduct credits for several jobs in one transaction.
+
+  Args:
+    db: Session the user row is attached to.
+    user: User being charged.
+    charges: (duration_seconds, job_id) per job, applied in order.
+
+  Returns:
+    Tokens deducted per charge, in the same order.
+  """
+  deducted = []
+  txs = []
+  for duration_seconds, job_id in charges:
+    tokens = required_tokens(duration_seconds)
+    user.credits_balance = max(0, user.credits_balance - tokens)
+    deducted.append(tokens)
+    txs.append(CreditTransaction(
+        user_id=user.id,
+        type="debit",
+        amount=tokens,
+        reason="video_evaluation",
+        job_id=job_id,
+    ))
+  db.add_all(txs)
+  db.commit()
+  db.refresh(user)
+
+  logging.info(
+      "Deducted %d credits for %d jobs from user %s (balance: %d)",
+      sum(deducted), len(deducted), user.email, user.credits_balance,
+  )
+  return deducted
+
+
 def refund_credits(
     db: Session,
     user: User,
@@ -210,21 +276,51 @@ def get_actual_duration(results: dict) -> Optional[float]:
 
 def acquire_job_slot(user_id: str) -> bool:
   """Try to acquire the single job slot for a user. Returns True on success."""
-  if _active_jobs.get(user_id):
-    return False
-  _active_jobs[user_id] = True
-  return True
+  with _active_jobs_lock:
+    if user_id in _active_jobs:
+      return False
+    _active_jobs.add(user_id)
+    return True
 
 
 def release_job_slot(user_id: str) -> None:
   """Release the job slot for a user."""
-  _active_jobs.pop(user_id, None)
+  with _active_jobs_lock:
+    _active_jobs.discard(user_id)
+
 
+def reserve_compare_slots(count: int) -> bool:
+  """Reserve evaluation capacity for count comparison variants.
+
+  All-or-nothing: returns False without reserving anything if the
+  variants would exceed MAX_CONCURRENT_COMPARE_VARIANTS.
+  """
+  global _compare_variants_in_flight
+  with _active_jobs_lock:
+    if _compare_variants_in_flight + count > MAX_CONCURRENT_COMPARE_VARIANTS:
+      return False
+    _compare_variants_in_flight += count
+    return True
 
-def token_model_info() -> dict:
-  """Return static token model info for /auth/me response."""
-  return {
-      "tokens_per_second": TOKENS_PER_SECOND,
-      "max_video_seconds": MAX_VIDEO_SECONDS,
-      "max_tokens_per_video": MAX_TOKENS_PER_VIDEO,
-  }
+
+def release_compare_slots(count: int) -> None:
+  """Release capacity taken by reserve_compare_slots."""
+  global _compare_variants_in_flight
+  with _active_jobs_lock:
+    _compare_variants_in_flight = max(0, _compare_variants_in_flight - count)
+
+
+_TOKEN_MODEL_INFO: Mapping[str, int] = MappingProxyType({
+    "tokens_per_second": TOKENS_PER_SECOND,
+    "max_video_seconds": MAX_VIDEO_SECONDS,
+    "max_tokens_per_video": MAX_TOKENS_PER_VIDEO,
+})
+
+
+def token_model_info() -> Mapping[str, int]:
+  """Return static token model info for /auth/me response.
+
+  The mapping is built once at import and is read-only; copy it with
+  dict() before serializing or modifying.
+  """
+  return _TOKEN_MODEL_INFO
@@ -14,6 +14,7 @@ from sqlalchemy import (
     Text,
     DateTime,
     ForeignKey,
+    Index,
     create_engine,
     event,
     text,
@@ -22,6 +23,7 @@ from sqlalchemy.orm import (
     DeclarativeBase,
     sessionmaker,
     relationship,
+    validates,
 )
 
 
@@ -52,6 +54,9 @@ else:
       pool_timeout=30,
       pool_recycle=1800,  # recycle connections every 30 min
       pool_pre_ping=True,  # verify connections are alive before use
+      # Reuse the most recently returned connection so bursts stay on a
+      # few warm connections and idle overflow ones age out.
+      pool_use_lifo=True,
   )
 
 SessionLocal = sessionmaker(bind=engine)
@@ -65,12 +70,23 @@ def _uuid() -> str:
   return str(uuid.uuid4())
 
 
+def utcnow() -> datetime.datetime:
+  """Current UTC time as a naive datetime, matching the DateTime columns.
+
+  Replaces the deprecated datetime.datetime.utcnow().
+  """
+  return datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+
+
 class User(Base):
   __tablename__ = "users"
 
   id = Column(String, primary_key=True, default=_uuid)
   google_sub = Column(String, unique=True, index=True, nullable=True)
   email = Column(String, unique=True, nullable=False)
+  # Lowercased copy of email for case-insensitive lookups and uniqueness;
+  # kept in sync by _normalize_email. email keeps the display casing.
+  email_normalized = Column(String, unique=True, index=True, nullable=False)
   password_hash = Column(String, nullable=True)
   email_verified = Column(Boolean, default=False, nullable=False)
   verification_token = Column(String, nullable=True)
@@ -79,13 +95,13 @@ class User(Base):
   stripe_customer_id = Column(String, nullable=True)
   is_admin = Column(Boolean, default=False, nullable=False)
   credits_balance = Column(Integer, default=0, nullable=False)
-  created_at = Column(DateTime, default=datetime.datetime.utcnow)
+  created_at = Column(DateTime, default=utcnow)
   updated_at = Column(
       DateTime,
-      default=datetime.datetime.utcnow,
-      onupdate=datetime.datetime.utcnow,
+      default=utcnow,
+      onupdate=utcnow,
   )
-  last_login = Column(DateTime, default=datetime.datetime.utcnow)
+  last_login = Column(DateTime, default=utcnow)
 
   transactions = relationship(
       "CreditTransaction", back_populates="user", lazy="dynamic",
@@ -94,6 +110,26 @@ class User(Base):
       "Render", back_populates="user", lazy="dynamic",
   )
 
+  __table_args__ = (
+      # Token lookups from the verify-email / reset-password links. Partial
+      # so the mostly-NULL columns stay cheap to index.
+      Index(
+          "ix_users_verification_token", verification_token, unique=True,
+          sqlite_where=verification_token.isnot(None),
+          postgresql_where=verification_token.isnot(None),
+      ),
+      Index(
+          "ix_users_reset_token", reset_token, unique=True,
+          sqlite_where=reset_token.isnot(None),
+          postgresql_where=reset_token.isnot(None),
+      ),
+  )
+
+  @validates("email")
+  def _normalize_email(self, _key, value):
+    self.email_normalized = value.strip().lower() if value else value
+    return value
+
 
 class CreditTransaction(Base):
   __tablename__ = "credit_transactions"
@@ -104,7 +140,7 @@ class CreditTransaction(Base):
   amount = Column(Integer, nullable=False)
   reason = Column(String, nullable=False)
   job_id = Column(String, nullable=True)
-  created_at = Column(DateTime, default=datetime.datetime.utcnow)
+  created_at = Column(DateTime, default=utcnow)
 
   user = relationship("User", back_populates="transactions")
 
@@ -118,7 +154,7 @@ class Render(Base):
   )  # queued / rendering / succeeded / failed / canceled
   progress_pct = Column(Integer, nullable=True)
 
-  created_at = Column(DateTime, default=datetime.datetime.utcnow)
+  created_at = Column(DateTime, default=utcnow)
   started_at = Column(DateTime, nullable=True)
   finished_at = Column(DateTime, nullable=True)
 
@@ -160,6 +196,11 @@ class Render(Base):
 
   user = relationship("User", back_populates="renders")
 
+  __table_args__ = (
+      # Stale-render reaper: active statuses ordered by start time.
+      Index("ix_render_status_started_at", status, started_at),
+  )
+
 
 class FeatureFeedback(Base):
   """Human feedback on feature detection accuracy."""
@@ -170,7 +211,7 @@ class FeatureFeedback(Base):
   feature_id = Column(String, nullable=False, index=True)
   verdict = Column(String, nullable=False)  # "correct" | "incorrect"
   user_id = Column(String, ForeignKey("users.id"), nullable=True)
-  created_at = Column(DateTime, default=datetime.datetime.utcnow)
+  created_at = Column(DateTime, default=utcnow)
 
 
 class ProcessedStripeEvent(Base):
@@ -178,7 +219,7 @@ class ProcessedStripeEvent(Base):
 
   stripe_event_id = Column(String, primary_key=True)
   stripe_session_id = Column(String, nullable=False)
-  processed_at = Column(DateTime, default=datetime.datetime.utcnow)
+  processed_at = Column(DateTime, default=utcnow)
 
 
 def init_db():
@@ -189,6 +230,20 @@ def init_db():
   logging.info("Database initialized (%s)", "SQLite" if _is_sqlite else "PostgreSQL")
 
 
+def check_db_health() -> bool:
+  """Run SELECT 1 on a pooled connection; True if the database answered.
+
+  Goes through the engine directly rather than an ORM session, and the
+  connection is returned to the pool even when the query fails.
+  """
+  try:
+    with engine.connect() as conn:
+      conn.execute(text("SELECT 1"))
+  except Exception:
+    return False
+  return True
+
+
 def get_db():
   """Yield a database session, closing it after use."""
   db = SessionLocal()
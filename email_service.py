@@ -7,7 +7,6 @@ configured — useful for local development.
 
 import logging
 import os
-import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
@@ -22,7 +21,7 @@ APP_NAME = "AI Creative Review"
 
 def is_configured() -> bool:
   """Return True if SMTP credentials are set."""
-  return bool(SMTP_HOST and SMTP_USER and SMTP_PASSWORD)
+  return all((SMTP_HOST, SMTP_USER, SMTP_PASSWORD))
 
 
 def _send(to: str, subject: str, html_body: str) -> bool:
@@ -34,6 +33,9 @@ def _send(to: str, subject: str, html_body: str) -> bool:
     )
     return False
 
+  # Imported here so dev/test runs without SMTP never load it.
+  import smtplib
+
   msg = MIMEMultipart("alternative")
   msg["From"] = f"{APP_NAME} <{SMTP_FROM}>"
   msg["To"] = to
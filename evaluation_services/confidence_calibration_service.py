@@ -59,6 +59,23 @@ def log_evaluation_confidence(
     feature_evaluations: list[models.FeatureEvaluation],
 ) -> None:
   """Log confidence data for each evaluated feature to BQ for calibration tracking."""
+  log_evaluations_confidence(
+      project_id, dataset_name, [(video_uri, feature_evaluations)],
+  )
+
+
+def log_evaluations_confidence(
+    project_id: str,
+    dataset_name: str,
+    evaluations: list[tuple[str, list[models.FeatureEvaluation]]],
+) -> None:
+  """Log confidence data for several videos with a single BQ load job.
+
+  Args:
+    project_id: GCP project that owns the dataset.
+    dataset_name: BQ dataset holding the calibration table.
+    evaluations: (video_uri, feature_evaluations) pairs.
+  """
   if not dataset_name:
     return
 
@@ -66,21 +83,22 @@ def log_evaluation_confidence(
     bq_service = bigquery_api_service.BigQueryAPIService(project_id)
     rows = []
 
-    for eval_feature in feature_evaluations:
-      row = {
-          "execution_timestamp": datetime.datetime.now(),
-          "video_uri": video_uri,
-          "feature_id": eval_feature.feature.id,
-          "feature_name": eval_feature.feature.name,
-          "evaluation_method": eval_feature.feature.evaluation_method.value,
-          "llm_detected": eval_feature.detected,
-          "llm_confidence": eval_feature.confidence_score or 0.0,
-          "annotation_detected": None,
-          "agreement": None,
-          "human_override": False,
-          "human_override_value": None,
-      }
-      rows.append(row)
+    for video_uri, feature_evaluations in evaluations:
+      for eval_feature in feature_evaluations:
+        row = {
+            "execution_timestamp": datetime.datetime.now(),
+            "video_uri": video_uri,
+            "feature_id": eval_feature.feature.id,
+            "feature_name": eval_feature.feature.name,
+            "evaluation_method": eval_feature.feature.evaluation_method.value,
+            "llm_detected": eval_feature.detected,
+            "llm_confidence": eval_feature.confidence_score or 0.0,
+            "annotation_detected": None,
+            "agreement": None,
+            "human_override": False,
+            "human_override_value": None,
+        }
+        rows.append(row)
 
     if rows:
       schema = get_calibration_schema()
@@ -22,8 +22,11 @@ from __future__ import annotations
 
 """Module to load helper functions and classes to interact with Vertex AI"""
 
+import functools
+import posixpath
 import time
 import json
+from urllib.parse import urlparse
 import vertexai
 import vertexai.preview.generative_models as generative_models
 from vertexai.preview.generative_models import GenerativeModel, Part, GenerationConfig
@@ -37,6 +40,43 @@ from models import LLMParameters
 
 DEFAULT_CONFIG = LLMParameters()
 
+# File extension -> MIME type for video URIs passed to Gemini
+_VIDEO_MIME_TYPES = {
+    "mp4": "video/mp4",
+    "mov": "video/quicktime",
+    "avi": "video/x-msvideo",
+    "webm": "video/webm",
+    "mkv": "video/x-matroska",
+}
+
+# YouTube hosts; subdomains (www., m., music.) match via the dotted suffix.
+_YT_HOSTS = ("youtube.com", "youtu.be")
+_YT_HOST_SUFFIXES = tuple("." + h for h in _YT_HOSTS)
+
+
+@functools.lru_cache(maxsize=1024)
+def _video_mime_type(video_uri: str) -> str:
+  """Cached implementation of GeminiAPIService._resolve_video_mime_type."""
+  parsed = urlparse(video_uri)
+  host = (parsed.hostname or "").lower()
+  if host in _YT_HOSTS or host.endswith(_YT_HOST_SUFFIXES):
+    return "video/mp4"
+  ext = posixpath.splitext(parsed.path)[1][1:].lower()
+  if not ext:
+    return "video/mp4"
+  return _VIDEO_MIME_TYPES.get(ext, f"video/{ext}")
+
+
+@functools.lru_cache(maxsize=8)
+def get_genai_client(project_id: str, location: str) -> genai.Client:
+  """Return the shared GenAI client for a project and location.
+
+  Building a client resolves credentials and opens a fresh HTTP pool, so
+  one instance per (project, location) is reused by every request instead
+  of constructing a client per call and per retry.
+  """
+  return genai.Client(vertexai=True, project=project_id, location=location)
+
 
 class GeminiAPIService:
   """Gemini API Service to leverage the Vertex APIs for inference"""
@@ -54,11 +94,7 @@ class GeminiAPIService:
     retries = 3
     for this_retry in range(retries):
       try:
-        client = genai.Client(
-            vertexai=True,
-            project=self.project_id,
-            location=llm_params.location,
-        )
+        client = get_genai_client(self.project_id, llm_params.location)
         # Build prompt parts
         contents = self._get_modality_params_genai(
             prompt_config.prompt, llm_params
@@ -260,19 +296,10 @@ class GeminiAPIService:
     """Derive MIME type from a video URI.
 
     YouTube URLs have no file extension, so default to video/mp4.
-    For GCS / file URIs, extract the extension from the path.
+    For GCS / file URIs, extract the extension from the path (query and
+    fragment excluded); paths without an extension also map to video/mp4.
     """
-    if "youtube.com" in video_uri or "youtu.be" in video_uri:
-      return "video/mp4"
-    ext = video_uri.rsplit(".", 1)[-1].lower().split("?")[0]
-    mime_map = {
-        "mp4": "video/mp4",
-        "mov": "video/quicktime",
-        "avi": "video/x-msvideo",
-        "webm": "video/webm",
-        "mkv": "video/x-matroska",
-    }
-    return mime_map.get(ext, f"video/{ext}")
+    return _video_mime_type(video_uri)
 
   def _get_modality_params(
       self, prompt: str, params: LLMParameters
@@ -463,44 +463,72 @@ def store_in_bq(
       f"Storing ABCD assessment for video {video_assessment.video_uri} in"
       " BigQuery... \n"
   )
-  bq_api_service = bigquery_api_service.BigQueryAPIService(config.project_id)
   assessment_bq = build_features_for_bq(config, video_assessment)
 
   # Insert if there is any feature evaluation
   if len(assessment_bq) > 0:
-    columns = get_table_columns()
-    dataframe = pandas.DataFrame(
-        assessment_bq,
-        # In the loaded table, the column order reflects the order of the
-        # columns in the DataFrame.
-        columns=columns,
+    _insert_assessment_rows(config, assessment_bq)
+  else:
+    print(
+        "There are no rows to insert into BQ for video"
+        f" {video_assessment.video_uri}. \n"
     )
-    # Create dataset if it does not exist
-    bq_api_service.create_dataset(config.bq_dataset_name, config.project_zone)
-    schema = get_table_schema()
-    table_created = bq_api_service.create_table(
-        config.bq_dataset_name, config.bq_table_name, schema
+
+
+def store_assessments_in_bq(
+    config: Configuration,
+    video_assessments: list[models.VideoAssessment],
+):
+  """Store several ABCD assessments in BQ with a single load job.
+
+  Rows for each assessment are built with that assessment's own config;
+  config only selects the project, dataset and table.
+  """
+  assessment_bq = []
+  for video_assessment in video_assessments:
+    assessment_bq.extend(
+        build_features_for_bq(video_assessment.config, video_assessment)
+    )
+  if assessment_bq:
+    print(
+        f"Storing {len(video_assessments)} ABCD assessments in BigQuery... \n"
+    )
+    _insert_assessment_rows(config, assessment_bq)
+
+
+def _insert_assessment_rows(
+    config: Configuration, assessment_bq: list[dict]
+) -> None:
+  """Append assessment rows to the configured BQ table, creating it if needed."""
+  bq_api_service = bigquery_api_service.BigQueryAPIService(config.project_id)
+  columns = get_table_columns()
+  dataframe = pandas.DataFrame(
+      assessment_bq,
+      # In the loaded table, the column order reflects the order of the
+      # columns in the DataFrame.
+      columns=columns,
+  )
+  # Create dataset if it does not exist
+  bq_api_service.create_dataset(config.bq_dataset_name, config.project_zone)
+  schema = get_table_schema()
+  table_created = bq_api_service.create_table(
+      config.bq_dataset_name, config.bq_table_name, schema
+  )
+  # Wait for table creation
+  if table_created:
+    print(f"Inserting {len(assessment_bq)} rows into BQ... \n")
+    bq_api_service.load_table_from_dataframe(
+        config.bq_dataset_name,
+        config.bq_table_name,
+        dataframe,
+        schema,
+        "WRITE_APPEND",
     )
-    # Wait for table creation
-    if table_created:
-      print(f"Inserting {len(assessment_bq)} rows into BQ... \n")
-      bq_api_service.load_table_from_dataframe(
-          config.bq_dataset_name,
-          config.bq_table_name,
-          dataframe,
-          schema,
-          "WRITE_APPEND",
-      )
-    else:
-      print(
-          "Error: ABCD assessments not loaded to table"
-          f" {config.bq_dataset_name}.{config.bq_table_name} because the table"
-          " could not be created. \n"
-      )
   else:
     print(
-        "There are no rows to insert into BQ for video"
-        f" {video_assessment.get('video_uri')}. \n"
+        "Error: ABCD assessments not loaded to table"
+        f" {config.bq_dataset_name}.{config.bq_table_name} because the table"
+        " could not be created. \n"
     )
 
 
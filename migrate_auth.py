@@ -7,8 +7,10 @@ Adds the following columns if they don't already exist:
   - verification_token (TEXT, nullable)
   - reset_token (TEXT, nullable)
   - token_expires_at (DATETIME, nullable)
+  - email_normalized (TEXT, lowercased email, unique)
 
-Also makes google_sub nullable for email/password-only users.
+Also makes google_sub nullable for email/password-only users, and
+backfills email_normalized so email lookups find existing accounts.
 
 Safe to run multiple times. Supports SQLite and PostgreSQL.
 
@@ -25,20 +27,8 @@ from sqlalchemy import create_engine, inspect, text
 DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///data/app.db")
 
 
-def _column_exists(inspector, table: str, column: str) -> bool:
-  """Check if a column exists in a table."""
-  columns = {c["name"] for c in inspector.get_columns(table)}
-  return column in columns
-
-
 def migrate():
   engine = create_engine(DATABASE_URL, echo=False)
-  inspector = inspect(engine)
-
-  if "users" not in inspector.get_table_names():
-    print("Table 'users' does not exist yet — skipping auth migration.")
-    return
-
   is_sqlite = DATABASE_URL.startswith("sqlite")
 
   migrations = [
@@ -68,16 +58,27 @@ def migrate():
           "ALTER TABLE users ADD COLUMN token_expires_at DATETIME",
           "ALTER TABLE users ADD COLUMN token_expires_at TIMESTAMP",
       ),
+      (
+          "email_normalized",
+          "ALTER TABLE users ADD COLUMN email_normalized TEXT",
+          "ALTER TABLE users ADD COLUMN email_normalized TEXT",
+      ),
   ]
 
   applied = 0
   skipped = 0
 
+  # Inspect once, then apply every missing column, the google_sub fix and
+  # the verified backfill in a single transaction.
   with engine.begin() as conn:
+    inspector = inspect(conn)
+    if not inspector.has_table("users"):
+      print("Table 'users' does not exist yet — skipping auth migration.")
+      return
+    existing = {c["name"] for c in inspector.get_columns("users")}
+
     for col_name, sqlite_sql, pg_sql in migrations:
-      # Re-inspect after each change (SQLite needs this)
-      inspector = inspect(engine)
-      if _column_exists(inspector, "users", col_name):
+      if col_name in existing:
         print(f"  [skip] {col_name} already exists")
         skipped += 1
         continue
@@ -90,23 +91,57 @@ def migrate():
     # Make google_sub nullable (SQLite doesn't support ALTER COLUMN,
     # but the column was already created as nullable in the latest schema).
     # For PostgreSQL:
+    # Each fallible statement runs in a savepoint: on PostgreSQL a failed
+    # statement aborts the whole transaction otherwise.
     if not is_sqlite:
       try:
-        conn.execute(text(
-            "ALTER TABLE users ALTER COLUMN google_sub DROP NOT NULL"
-        ))
+        with conn.begin_nested():
+          conn.execute(text(
+              "ALTER TABLE users ALTER COLUMN google_sub DROP NOT NULL"
+          ))
         print("  [fix]  google_sub made nullable")
       except Exception:
         pass  # Already nullable
 
-  # Mark existing Google users as email_verified
-  with engine.begin() as conn:
-    result = conn.execute(text(
-        "UPDATE users SET email_verified = 1 "
-        "WHERE google_sub IS NOT NULL AND email_verified = 0"
-    ))
-    if result.rowcount:
-      print(f"  [fix]  Marked {result.rowcount} existing Google user(s) as email_verified")
+    # Mark existing Google users as email_verified. Bound booleans keep the
+    # comparison valid on PostgreSQL's boolean column as well as SQLite.
+    try:
+      with conn.begin_nested():
+        result = conn.execute(
+            text(
+                "UPDATE users SET email_verified = :verified "
+                "WHERE google_sub IS NOT NULL AND email_verified = :unverified"
+            ),
+            {"verified": True, "unverified": False},
+        )
+      if result.rowcount:
+        print(f"  [fix]  Marked {result.rowcount} existing Google user(s) as email_verified")
+    except Exception as ex:
+      print(f"  [warn] email_verified backfill failed: {ex}")
+
+    # Auth looks users up by email_normalized only, so fill it for rows that
+    # predate the column before the first login. The unique index fails if
+    # two accounts differ only by email casing; merge those by hand.
+    try:
+      with conn.begin_nested():
+        result = conn.execute(text(
+            "UPDATE users SET email_normalized = LOWER(TRIM(email)) "
+            "WHERE email_normalized IS NULL"
+        ))
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_users_email_normalized "
+            "ON users (email_normalized)"
+        ))
+        # SQLite can't ALTER COLUMN; there the ORM keeps the column filled.
+        if not is_sqlite:
+          conn.execute(text(
+              "ALTER TABLE users ALTER COLUMN email_normalized SET NOT NULL"
+          ))
+      if result.rowcount:
+        print(f"  [fix]  Backfilled email_normalized for {result.rowcount} user(s)")
+    except Exception as ex:
+      print(f"  [warn] email_normalized backfill failed: {ex}")
+  engine.dispose()
 
   print(f"\nDone: {applied} column(s) added, {skipped} skipped.")
 
@@ -9,6 +9,8 @@ Model version: deterministic-rules.v1
 Same inputs → same outputs. No LLM required.
 """
 
+import orjson
+
 # Section score maximums
 SECTION_MAXES = {
     "hook_attention": 15,
@@ -56,14 +58,27 @@ def _has_keyword_detected(
     keywords: list[str],
     field: str = "name",
 ) -> bool:
-  """True if any detected feature's field contains one of the keywords."""
-  for f in features:
-    if not f.get("detected"):
-      continue
-    text = (f.get(field, "") or "").lower()
-    if any(k in text for k in keywords):
-      return True
-  return False
+  """True if any detected feature's field contains one of the keywords.
+
+  Matching is case-insensitive (Unicode casefold). The detected fields are
+  joined into one newline-separated buffer and casefolded once, so each
+  keyword costs a single substring scan; keywords contain no newline, so a
+  match cannot span two features.
+  """
+  text = "\n".join(
+      f.get(field, "") or "" for f in features if f.get("detected")
+  ).casefold()
+  return any(k.casefold() in text for k in keywords)
+
+
+# Evidence keywords that signal a trackable response path (lower case).
+_TRACKABLE_KEYWORDS = ("url", "qr", "link", "code", "shop", "offer")
+_MEASUREMENT_KEYWORDS = ("url", "qr", "link", "code", "shop", "visit")
+
+
+def _any_keyword(text: str, keywords: tuple[str, ...]) -> bool:
+  """True if the already-casefolded text contains one of the keywords."""
+  return any(k in text for k in keywords)
 
 
 def _by_sub(features: list[dict], sub: str) -> list[dict]:
@@ -74,6 +89,30 @@ def _by_sub(features: list[dict], sub: str) -> list[dict]:
   ]
 
 
+def _group_by_sub(features: list[dict]) -> dict[str, list[dict]]:
+  """Bucket features by upper-cased sub_category in a single pass."""
+  groups: dict[str, list[dict]] = {}
+  for f in features:
+    groups.setdefault(str(f.get("sub_category", "")).upper(), []).append(f)
+  return groups
+
+
+# Every feature field the prediction rules read. Two inputs that agree on
+# these fields produce the same predictions, so they form the cache key.
+_KEY_FIELDS = ("name", "sub_category", "detected", "confidence", "evidence", "rationale")
+_PREDICTIONS_CACHE_MAX = 256
+_predictions_cache: dict[tuple, bytes] = {}
+
+
+def _features_key(features: list[dict] | None) -> tuple:
+  """Hashable projection of the fields in _KEY_FIELDS."""
+  return tuple(
+      (f.get("name"), f.get("sub_category"), f.get("detected"),
+       f.get("confidence"), f.get("evidence"), f.get("rationale"))
+      for f in features or ()
+  )
+
+
 def compute_predictions(
     abcd_features: list[dict],
     persuasion_features: list[dict],
@@ -81,6 +120,10 @@ def compute_predictions(
 ) -> dict:
   """Compute deterministic performance predictions.
 
+  Results are memoized on the feature content (see _KEY_FIELDS), so the
+  same evaluation scored again skips the rules. The cache holds serialized
+  results and every call gets its own dict to mutate.
+
   Args:
     abcd_features: Formatted ABCD feature dicts with detected/confidence/name/sub_category.
     persuasion_features: Formatted persuasion feature dicts.
@@ -89,11 +132,34 @@ def compute_predictions(
   Returns:
     Full prediction dict with overall_score, indices, labels, flags, drivers.
   """
+  key = (
+      _features_key(abcd_features),
+      _features_key(persuasion_features),
+      _features_key(structure_features),
+  )
+  blob = _predictions_cache.get(key)
+  if blob is None:
+    blob = orjson.dumps(
+        _compute_predictions(abcd_features, persuasion_features, structure_features)
+    )
+    if len(_predictions_cache) >= _PREDICTIONS_CACHE_MAX:
+      _predictions_cache.clear()
+    _predictions_cache[key] = blob
+  return orjson.loads(blob)
+
+
+def _compute_predictions(
+    abcd_features: list[dict],
+    persuasion_features: list[dict],
+    structure_features: list[dict],
+) -> dict:
+  """Uncached body of compute_predictions."""
   # --- Group ABCD features by sub_category ---
-  attract = _by_sub(abcd_features, "ATTRACT")
-  brand = _by_sub(abcd_features, "BRAND")
-  connect = _by_sub(abcd_features, "CONNECT")
-  direct = _by_sub(abcd_features, "DIRECT")
+  by_sub = _group_by_sub(abcd_features or [])
+  attract = by_sub.get("ATTRACT", [])
+  brand = by_sub.get("BRAND", [])
+  connect = by_sub.get("CONNECT", [])
+  direct = by_sub.get("DIRECT", [])
 
   # Split CONNECT into product vs people
   product_kw = ["product"]
@@ -121,7 +187,14 @@ def compute_predictions(
 
   # Creative diversity: blend of structure variety + overall feature coverage
   all_abcd = abcd_features or []
-  coverage = len([f for f in all_abcd if f.get("detected")]) / max(len(all_abcd), 1)
+  # Evidence of every detected ABCD feature, gathered in one pass into a
+  # single casefolded buffer shared by both trackable-signal checks. The
+  # newline separator keeps keyword matches from spanning two features.
+  detected_evidence = [
+      f.get("evidence", "") or "" for f in all_abcd if f.get("detected")
+  ]
+  coverage = len(detected_evidence) / max(len(all_abcd), 1)
+  evidence_text = "\n".join(detected_evidence).casefold()
   scores["creative_diversity_readiness"] = round(
       min(
           _section_score(structure_features + persuasion_features, 10) * 0.6
@@ -135,11 +208,7 @@ def compute_predictions(
   scores["measurement_compatibility"] = round(
       min(
           _section_score(direct, 7)
-          + (3.0 if _has_keyword_detected(
-              direct + all_abcd,
-              ["url", "qr", "link", "code", "shop", "visit"],
-              field="evidence",
-          ) else 0.0),
+          + (3.0 if _any_keyword(evidence_text, _MEASUREMENT_KEYWORDS) else 0.0),
           10,
       ),
       2,
@@ -160,19 +229,11 @@ def compute_predictions(
   flags = {
       "hook_within_3s": _has_keyword_detected(attract, ["dynamic start"]),
       "brand_mentions_3x": (
-          len([f for f in brand if f.get("detected")]) >= 3
+          sum(1 for f in brand if f.get("detected")) >= 3
       ),
       "has_trackable_anchor": (
-          _has_keyword_detected(
-              direct + all_abcd,
-              ["url", "qr", "link", "code", "shop", "offer"],
-              field="evidence",
-          )
-          or _has_keyword_detected(
-              direct,
-              ["url", "qr", "link", "code", "shop", "offer"],
-              field="rationale",
-          )
+          _any_keyword(evidence_text, _TRACKABLE_KEYWORDS)
+          or _has_keyword_detected(direct, _TRACKABLE_KEYWORDS, field="rationale")
       ),
       "has_testimonial_or_ugc": _has_keyword_detected(
           persuasion_features + people_feats,
@@ -10,40 +10,56 @@ Same inputs → same outputs. No LLM required.
 
 from __future__ import annotations
 
+import functools
+import re
+from typing import NamedTuple
+
 
 # --- Aspect ratio helpers ---
 
+# Same numbers float()/int() accept: signed, "5.", ".5", "1e3"
+_NUM = r"\s*([+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)\s*"
+_INT = r"\s*([+-]?\d+)\s*"
+# "16:9", "16 : 9", "1.78"
+_AR_RE = re.compile(rf"^{_NUM}(?::{_NUM})?$")
+# "30", "30s", "30 s", "0:30", "1:05", "1:02:30" (input is stripped and
+# lowered first)
+_DUR_RE = re.compile(rf"^(?:(?:{_INT}:)?{_INT}:)?{_NUM}s*$")
+
+
 def _parse_aspect_ratio(ar_str: str) -> float | None:
   """Parse an aspect ratio string like '16:9' or '1.78' to a float."""
   if not ar_str:
     return None
-  if ":" in ar_str:
-    try:
-      w, h = ar_str.split(":")
-      return float(w) / float(h)
-    except (ValueError, ZeroDivisionError):
-      return None
-  try:
-    return float(ar_str)
-  except ValueError:
+  return _parse_aspect_ratio_cached(ar_str)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_aspect_ratio_cached(ar_str: str) -> float | None:
+  m = _AR_RE.match(ar_str)
+  if not m:
     return None
+  w, h = m.groups()
+  if h is None:
+    return float(w)
+  h = float(h)
+  return float(w) / h if h else None
 
 
 def _parse_duration_seconds(dur_str: str) -> float:
   """Parse a duration string like '0:30', '1:05', or '30s' to seconds."""
   if not dur_str:
     return 0.0
-  dur_str = dur_str.strip().lower().rstrip("s")
-  try:
-    if ":" in dur_str:
-      parts = dur_str.split(":")
-      if len(parts) == 2:
-        return int(parts[0]) * 60 + float(parts[1])
-      if len(parts) == 3:
-        return int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
-    return float(dur_str)
-  except (ValueError, IndexError):
+  return _parse_duration_seconds_cached(dur_str)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_duration_seconds_cached(dur_str: str) -> float:
+  m = _DUR_RE.match(dur_str.strip().lower())
+  if not m:
     return 0.0
+  hours, minutes, seconds = m.groups()
+  return int(hours or 0) * 3600 + int(minutes or 0) * 60 + float(seconds)
 
 
 def _has_feature_keyword(
@@ -52,18 +68,85 @@ def _has_feature_keyword(
     field: str = "name",
     detected_only: bool = True,
 ) -> bool:
-  """True if any feature's field contains one of the keywords."""
+  """True if any feature's field contains one of the keywords.
+
+  Matching is case-insensitive (Unicode casefold). Keywords are folded once
+  up front rather than per feature.
+  """
+  kws = [k.casefold() for k in keywords]
   for f in features:
     if detected_only and not f.get("detected"):
       continue
-    text = (f.get(field, "") or "").lower()
-    if any(k in text for k in keywords):
+    text = (f.get(field, "") or "").casefold()
+    if any(k in text for k in kws):
       return True
   return False
 
 
+# Keyword groups evaluated together by _keyword_signals, as
+# (signal name, keywords) pairs.
+_ABCD_SIGNALS = (
+    ("hook_fast", ("dynamic start", "hook", "supers")),
+    ("has_cta", ("call to action", "offer", "text", "url")),
+    ("has_brand_early", ("brand", "logo")),
+)
+_ACCESSIBILITY_SIGNALS = (
+    ("has_captions", ("captions", "subtitles")),
+    ("audio_independent", ("audio independence",)),
+    ("text_readable", ("text contrast", "readability")),
+)
+
+
+def _detected_names(features: list[dict]) -> tuple[str, ...]:
+  """Casefolded names of the detected features, in order."""
+  return tuple(
+      (f.get("name", "") or "").casefold() for f in features if f.get("detected")
+  )
+
+
+def _keyword_signals(
+    names: tuple[str, ...],
+    groups: tuple[tuple[str, tuple[str, ...]], ...],
+) -> dict[str, bool]:
+  """Evaluate several keyword groups in one pass over detected feature names.
+
+  Equivalent to calling _has_feature_keyword once per group on the
+  features behind `names` (from _detected_names), but stops as soon as
+  every group has matched.
+  """
+  found = dict.fromkeys((name for name, _ in groups), False)
+  pending = [(name, [k.casefold() for k in kws]) for name, kws in groups]
+  for text in names:
+    if not pending:
+      break
+    still_pending = []
+    for name, kws in pending:
+      if any(k in text for k in kws):
+        found[name] = True
+      else:
+        still_pending.append((name, kws))
+    pending = still_pending
+  return found
+
+
 # --- Platform scoring rules ---
 
+class PlatformScore(NamedTuple):
+  """Fit score (0-100) and up to three optimization tips for one platform."""
+
+  score: int
+  tips: tuple[str, ...]
+
+  def to_dict(self) -> dict:
+    """JSON-friendly form stored in report results."""
+    return {"score": self.score, "tips": list(self.tips)}
+
+
+def _platform_score(score: int, tips: list[str]) -> PlatformScore:
+  """Clamp the score to 0-100 and keep the top three tips."""
+  return PlatformScore(max(0, min(100, score)), tuple(tips[:3]))
+
+
 def _score_youtube(
     duration_s: float,
     ar: float | None,
@@ -73,7 +156,7 @@ def _score_youtube(
     has_brand_early: bool,
     has_captions: bool,
     **_kwargs,
-) -> dict:
+) -> PlatformScore:
   """YouTube pre-roll / in-stream scoring."""
   score = 70  # baseline
   tips = []
@@ -122,10 +205,7 @@ def _score_youtube(
   if has_captions:
     score += 5
 
-  return {
-      "score": max(0, min(100, score)),
-      "tips": tips[:3],
-  }
+  return _platform_score(score, tips)
 
 
 def _score_meta_feed(
@@ -136,7 +216,7 @@ def _score_meta_feed(
     has_captions: bool,
     audio_independent: bool,
     **_kwargs,
-) -> dict:
+) -> PlatformScore:
   """Meta (Facebook/Instagram) Feed scoring."""
   score = 65
   tips = []
@@ -183,10 +263,7 @@ def _score_meta_feed(
   if has_cta:
     score += 5
 
-  return {
-      "score": max(0, min(100, score)),
-      "tips": tips[:3],
-  }
+  return _platform_score(score, tips)
 
 
 def _score_meta_reels(
@@ -198,7 +275,7 @@ def _score_meta_reels(
     pacing_fast: bool,
     structure_archetype: str,
     **_kwargs,
-) -> dict:
+) -> PlatformScore:
   """Meta Reels / Instagram Reels scoring."""
   score = 60
   tips = []
@@ -247,10 +324,7 @@ def _score_meta_reels(
   if audio_independent:
     score += 5
 
-  return {
-      "score": max(0, min(100, score)),
-      "tips": tips[:3],
-  }
+  return _platform_score(score, tips)
 
 
 def _score_tiktok(
@@ -261,7 +335,7 @@ def _score_tiktok(
     pacing_fast: bool,
     structure_archetype: str,
     **_kwargs,
-) -> dict:
+) -> PlatformScore:
   """TikTok scoring."""
   score = 55
   tips = []
@@ -311,10 +385,7 @@ def _score_tiktok(
   if has_captions:
     score += 5
 
-  return {
-      "score": max(0, min(100, score)),
-      "tips": tips[:3],
-  }
+  return _platform_score(score, tips)
 
 
 def _score_ctv(
@@ -325,7 +396,7 @@ def _score_ctv(
     pacing_fast: bool,
     text_readable: bool,
     **_kwargs,
-) -> dict:
+) -> PlatformScore:
   """Connected TV (CTV) / OTT scoring."""
   score = 70
   tips = []
@@ -369,10 +440,16 @@ def _score_ctv(
   else:
     tips.append("Ensure text is large and high-contrast for viewing from 10+ feet on TV screens.")
 
-  return {
-      "score": max(0, min(100, score)),
-      "tips": tips[:3],
-  }
+  return _platform_score(score, tips)
+
+
+_PLATFORM_SCORERS = (
+    ("youtube", _score_youtube),
+    ("meta_feed", _score_meta_feed),
+    ("meta_reels", _score_meta_reels),
+    ("tiktok", _score_tiktok),
+    ("ctv", _score_ctv),
+)
 
 
 # --- Public API ---
@@ -387,6 +464,9 @@ def compute_platform_fit(
 ) -> dict:
   """Compute platform fit scores for all platforms.
 
+  Scoring is memoized on the inputs it actually reads (detected feature
+  names, structure archetype, duration, aspect ratio, scene count).
+
   Args:
     abcd_features: Formatted ABCD feature dicts.
     persuasion_features: Formatted persuasion feature dicts.
@@ -398,77 +478,49 @@ def compute_platform_fit(
   Returns:
     Dict with per-platform {score, tips} entries.
   """
-  # Extract signals from features and metadata
-  duration_s = _parse_duration_seconds(video_metadata.get("duration", ""))
-  ar = _parse_aspect_ratio(video_metadata.get("aspect_ratio", ""))
-  scene_count = len(scenes) if scenes else 0
-
-  all_features = abcd_features + persuasion_features + structure_features + accessibility_features
-
-  # Pacing: more than 1 scene per 5 seconds = fast
-  pacing_fast = (scene_count / max(duration_s, 1) * 5) > 1.0 if duration_s > 0 else False
-
-  # Hook: any ATTRACT feature detected
-  hook_fast = _has_feature_keyword(abcd_features, ["dynamic start", "hook", "supers"], detected_only=True)
-
-  # CTA: any DIRECT feature detected
-  has_cta = _has_feature_keyword(
-      abcd_features,
-      ["call to action", "offer", "text", "url"],
-      detected_only=True,
-  )
+  structure_archetype = ""
+  if structure_features:
+    structure_archetype = structure_features[0].get("evidence", "")
 
-  # Brand early: any BRAND feature detected
-  has_brand_early = _has_feature_keyword(
-      abcd_features,
-      ["brand", "logo"],
-      detected_only=True,
+  # Only these inputs affect the scores, so they double as the cache key.
+  scores = _platform_scores(
+      _detected_names(abcd_features),
+      _detected_names(accessibility_features),
+      structure_archetype,
+      video_metadata.get("duration", ""),
+      video_metadata.get("aspect_ratio", ""),
+      len(scenes) if scenes else 0,
   )
+  return {name: score.to_dict() for name, score in scores}
 
-  # Captions: accessibility feature
-  has_captions = _has_feature_keyword(
-      accessibility_features,
-      ["captions", "subtitles"],
-      detected_only=True,
-  )
 
-  # Audio independence
-  audio_independent = _has_feature_keyword(
-      accessibility_features,
-      ["audio independence"],
-      detected_only=True,
-  )
+@functools.lru_cache(maxsize=256)
+def _platform_scores(
+    abcd_names: tuple[str, ...],
+    accessibility_names: tuple[str, ...],
+    structure_archetype: str,
+    duration: str,
+    aspect_ratio: str,
+    scene_count: int,
+) -> tuple[tuple[str, PlatformScore], ...]:
+  """Score every platform; memoized on the extracted inputs."""
+  duration_s = _parse_duration_seconds(duration)
+  ar = _parse_aspect_ratio(aspect_ratio)
 
-  # Text readability
-  text_readable = _has_feature_keyword(
-      accessibility_features,
-      ["text contrast", "readability"],
-      detected_only=True,
-  )
+  # Pacing: more than 1 scene per 5 seconds = fast
+  pacing_fast = (scene_count / max(duration_s, 1) * 5) > 1.0 if duration_s > 0 else False
 
-  # Structure archetype
-  structure_archetype = ""
-  if structure_features:
-    structure_archetype = structure_features[0].get("evidence", "")
+  # Hook / CTA / early brand from ABCD; captions, sound-off and readable
+  # text from accessibility. One pass per list covers every keyword group.
+  signals = _keyword_signals(abcd_names, _ABCD_SIGNALS)
+  signals.update(_keyword_signals(accessibility_names, _ACCESSIBILITY_SIGNALS))
 
   common = dict(
       duration_s=duration_s,
       ar=ar,
       scene_count=scene_count,
-      hook_fast=hook_fast,
-      has_cta=has_cta,
-      has_brand_early=has_brand_early,
-      has_captions=has_captions,
-      audio_independent=audio_independent,
-      text_readable=text_readable,
       pacing_fast=pacing_fast,
       structure_archetype=structure_archetype,
+      **signals,
   )
-
-  return {
-      "youtube": _score_youtube(**common),
-      "meta_feed": _score_meta_feed(**common),
-      "meta_reels": _score_meta_reels(**common),
-      "tiktok": _score_tiktok(**common),
-      "ctv": _score_ctv(**common),
-  }
+  return tuple((name, scorer(**common)) for name, scorer in _PLATFORM_SCORERS)
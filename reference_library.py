@@ -9,26 +9,63 @@ ones to a given evaluation based on cosine similarity of normalized
 performance section scores.
 """
 
+import heapq
 import json
 import logging
 import math
+import operator
 import os
+from typing import NamedTuple
+
+import numpy as np
 
 _LIBRARY_PATH = os.path.join(os.path.dirname(__file__), "data", "reference_library.json")
 
 _library_cache: list[dict] | None = None
+_library_mtime: float | None = None
+
+# Section keys in feature-vector order (see performance_predictor).
+_FEATURE_KEYS: tuple[str, ...] = (
+    "hook_attention", "brand_visibility", "social_proof_trust",
+    "product_clarity_benefits", "funnel_alignment", "cta",
+    "creative_diversity_readiness", "measurement_compatibility",
+    "data_audience_leverage",
+)
+_gather_features = operator.itemgetter(*_FEATURE_KEYS)
+_ZERO_VECTOR: tuple[float, ...] = (0.0,) * len(_FEATURE_KEYS)
+
+
+class _LibraryIndex(NamedTuple):
+  """Column-wise view of the scorable library ads."""
+
+  source: list[dict]  # list this index was built from
+  ads: list[dict]  # ads with a full-length feature_vector
+  unit_rows: np.ndarray  # (N, 9) L2-normalized vectors; zero rows stay zero
+  # Lower-cased vertical -> (ads, unit_rows) restricted to that vertical,
+  # for every vertical present in the library
+  by_vertical: dict[str, tuple[list[dict], np.ndarray]]
+
+
+_index_cache: _LibraryIndex | None = None
 
 
 def load_library() -> list[dict]:
   """Load and cache the reference ad library from JSON.
 
+  The file is re-read when its modification time changes.
+
   Returns:
     List of reference ad dicts.
   """
-  global _library_cache
-  if _library_cache is not None:
+  global _library_cache, _library_mtime
+  try:
+    mtime = os.stat(_LIBRARY_PATH).st_mtime
+  except OSError:
+    mtime = None
+  if _library_cache is not None and mtime == _library_mtime:
     return _library_cache
 
+  _library_mtime = mtime
   try:
     with open(_LIBRARY_PATH, "r") as f:
       _library_cache = json.load(f)
@@ -43,27 +80,68 @@ def _cosine_similarity(a: list[float], b: list[float]) -> float:
   """Compute cosine similarity between two vectors."""
   if len(a) != len(b) or not a:
     return 0.0
-  dot = sum(x * y for x, y in zip(a, b))
-  mag_a = math.sqrt(sum(x * x for x in a))
-  mag_b = math.sqrt(sum(x * x for x in b))
-  if mag_a == 0 or mag_b == 0:
+  mag = math.hypot(*a) * math.hypot(*b)
+  if mag == 0:
     return 0.0
-  return dot / (mag_a * mag_b)
+  return sum(map(operator.mul, a, b)) / mag
 
 
-def _build_feature_vector(predictions: dict) -> list[float]:
+def _build_feature_vector(predictions: dict) -> tuple[float, ...]:
   """Build a 9-element normalized feature vector from predictions.
 
   Maps the 9 section scores from performance_predictor to a [0-1] vector.
+  Missing scores count as 0.0; with no scores at all the shared zero
+  vector is returned.
+  """
+  norm = predictions.get("normalized")
+  if not norm:
+    return _ZERO_VECTOR
+  try:
+    # compute_predictions always fills every section, so gather in one call
+    return _gather_features(norm)
+  except KeyError:
+    return tuple(norm.get(k, 0.0) for k in _FEATURE_KEYS)
+
+
+def _vertical_key(ad: dict) -> str:
+  """Lower-cased vertical of an ad ("" when missing)."""
+  return (ad.get("vertical") or "").lower()
+
+
+def _library_index(library: list[dict]) -> _LibraryIndex:
+  """Build (or reuse) the normalized matrix for a library list.
+
+  Ads without a full-length feature_vector are left out, as they could
+  never be scored. Cached until load_library returns a different list.
   """
-  norm = predictions.get("normalized", {})
-  keys = [
-      "hook_attention", "brand_visibility", "social_proof_trust",
-      "product_clarity_benefits", "funnel_alignment", "cta",
-      "creative_diversity_readiness", "measurement_compatibility",
-      "data_audience_leverage",
-  ]
-  return [norm.get(k, 0.0) for k in keys]
+  global _index_cache
+  cached = _index_cache
+  if cached is not None and cached.source is library:
+    return cached
+
+  dim = len(_FEATURE_KEYS)
+  ads = [ad for ad in library if len(ad.get("feature_vector") or ()) == dim]
+  matrix = np.array(
+      [ad["feature_vector"] for ad in ads], dtype=np.float64,
+  ).reshape(len(ads), dim)
+  norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+  unit_rows = np.divide(
+      matrix, norms, out=np.zeros_like(matrix), where=norms != 0,
+  )
+  verticals = np.array([_vertical_key(ad) for ad in ads], dtype=object)
+  by_vertical = {}
+  for key in {_vertical_key(ad) for ad in library}:
+    rows = np.flatnonzero(verticals == key)
+    # Contiguous copy so a filtered query scans only its own rows
+    by_vertical[key] = ([ads[i] for i in rows], np.ascontiguousarray(unit_rows[rows]))
+  index = _LibraryIndex(
+      source=library,
+      ads=ads,
+      unit_rows=unit_rows,
+      by_vertical=by_vertical,
+  )
+  _index_cache = index
+  return index
 
 
 def find_similar_ads(
@@ -80,28 +158,41 @@ def find_similar_ads(
   Returns:
     List of reference ad dicts with added "similarity" score.
   """
+  # An all-zero query matches nothing, so don't touch the library at all
+  current_vec = _build_feature_vector(predictions)
+  if not any(v > 0 for v in current_vec):
+    return []
+
   library = load_library()
   if not library:
     return []
 
-  current_vec = _build_feature_vector(predictions)
-  if not any(v > 0 for v in current_vec):
+  index = _library_index(library)
+  ads, unit_rows = index.ads, index.unit_rows
+  # Filter only when some library ad carries the vertical
+  if vertical and vertical.lower() in index.by_vertical:
+    ads, unit_rows = index.by_vertical[vertical.lower()]
+  if not ads:
     return []
 
-  candidates = library
-  if vertical:
-    v_lower = vertical.lower()
-    filtered = [ad for ad in library if ad.get("vertical", "").lower() == v_lower]
-    if filtered:
-      candidates = filtered
-
-  scored = []
-  for ad in candidates:
-    ref_vec = ad.get("feature_vector", [])
-    if not ref_vec or len(ref_vec) != len(current_vec):
-      continue
-    sim = _cosine_similarity(current_vec, ref_vec)
-    scored.append({**ad, "similarity": round(sim, 3)})
-
-  scored.sort(key=lambda x: x["similarity"], reverse=True)
-  return scored[:top_k]
+  # Cosine similarity against every candidate in one matrix-vector product
+  # over pre-normalized rows; zero rows score 0.0 like _cosine_similarity.
+  sims = unit_rows @ np.asarray(current_vec, dtype=np.float64)
+  # Scale the fresh result in place rather than allocating a unit query
+  sims /= math.hypot(*current_vec)
+
+  n = len(ads)
+  k = min(top_k, n)
+  if k <= 0:
+    return []
+  # Only ads within rounding distance of the k-th best score can make the
+  # cut, so partition to find it and rank just those candidates.
+  kth = np.partition(sims, n - k)[n - k]
+  candidates = np.flatnonzero(sims >= kth - 1e-3)
+  rounded = {
+      i: round(sim, 3)
+      for i, sim in zip(candidates.tolist(), sims[candidates].tolist())
+  }
+  # Rank by the rounded score; nlargest is stable, so ties keep library order.
+  top = heapq.nlargest(k, rounded, key=rounded.__getitem__)
+  return [{**ads[i], "similarity": rounded[i]} for i in top]
@@ -2109,24 +2109,15 @@ def _build_slack_blocks(data: dict, report_url: str) -> list[dict]:
   return blocks
 
 
-def send_slack_notification(
-    data: dict,
-    report_url: str,
-    webhook_url: str,
-) -> bool:
-  """Post an evaluation summary to a Slack incoming webhook.
+def build_slack_payload(data: dict, report_url: str) -> dict:
+  """Build the Slack webhook payload for an evaluation summary.
 
   Args:
     data: The formatted evaluation results dict.
     report_url: Public URL to the full HTML report.
-    webhook_url: Slack incoming webhook URL.
   Returns:
-    True if the notification was sent successfully.
+    The JSON-serializable webhook payload (fallback text plus blocks).
   """
-  if not webhook_url:
-    logging.info("No Slack webhook URL configured — skipping notification.")
-    return False
-
   video = data.get("video_name", "")
   brand = data.get("brand_name", "Unknown")
   blocks = _build_slack_blocks(data, report_url)
@@ -2146,16 +2137,38 @@ def send_slack_notification(
   if isinstance(acc, dict) and acc.get("total", 0) > 0:
     fallback_parts.append(f"Accessibility: {acc.get('score', 100)}%")
 
-  payload = {
+  return {
       "text": " | ".join(fallback_parts),
       "blocks": blocks,
       "unfurl_links": False,
   }
 
+
+def send_slack_notification(
+    data: dict,
+    report_url: str,
+    webhook_url: str,
+) -> bool:
+  """Post an evaluation summary to a Slack incoming webhook.
+
+  Args:
+    data: The formatted evaluation results dict.
+    report_url: Public URL to the full HTML report.
+    webhook_url: Slack incoming webhook URL.
+  Returns:
+    True if the notification was sent successfully.
+  """
+  if not webhook_url:
+    logging.info("No Slack webhook URL configured — skipping notification.")
+    return False
+
+  video = data.get("video_name", "")
+  payload = build_slack_payload(data, report_url)
+
   try:
     body = json.dumps(payload).encode("utf-8")
     logging.info("Sending Slack notification for %s (%d blocks, %d bytes)",
-                 video, len(blocks), len(body))
+                 video, len(payload["blocks"]), len(body))
     req = urllib.request.Request(
         webhook_url,
         data=body,
@@ -2179,10 +2192,42 @@ def send_slack_notification(
     return False
 
 
+# Static parts of the comparison page, built once at import.
+_COMPARISON_PAGE_HEAD = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
+<title>A/B Comparison Report \u2014 AI Creative Review</title>
+<style>
+  * { margin:0; padding:0; box-sizing:border-box; }
+  body { font-family:Inter,-apple-system,BlinkMacSystemFont,sans-serif; background:#f3f4f6; color:#1a1a2e; }
+  .header { background:linear-gradient(135deg,#0A6D86,#084c5e); color:#fff; padding:32px 40px; }
+  .header h1 { font-size:28px; font-weight:800; margin-bottom:4px; }
+  .header .sub { font-size:14px; opacity:0.8; }
+  .container { max-width:1100px; margin:0 auto; padding:32px 24px; }
+</style>
+</head>
+<body>
+<div class="header">
+  <h1>A/B Variant Comparison</h1>
+'''
+_COMPARISON_PAGE_FOOT = '''
+  <div style="text-align:center;color:#aaa;font-size:12px;padding:24px 0">Generated by AI Creative Review</div>
+</div>
+</body>
+</html>'''
+_DIFF_CELL_PASS = '<span style="color:#16a34a;font-weight:700;width:80px;text-align:center">&#10003;</span>'
+_DIFF_CELL_FAIL = '<span style="color:#dc2626;font-weight:700;width:80px;text-align:center">&#10007;</span>'
+_DIFF_CELL_NA = '<span style="color:#888;width:80px;text-align:center">N/A</span>'
+
+
 def generate_comparison_report_html(data: dict) -> str:
-  """Generate a side-by-side comparison report for 2+ evaluated variants."""
+  """Generate a side-by-side comparison report for 2+ evaluated variants.
+
+  Sections are appended to one list of chunks in document order and joined
+  once at the end.
+  """
   comparison = data.get("comparison", {})
-  variants_data = data.get("variants", [])
   variant_summaries = comparison.get("variants", [])
   deltas = comparison.get("deltas", [])
   feature_diffs = comparison.get("feature_diffs", [])
@@ -2191,10 +2236,25 @@ def generate_comparison_report_html(data: dict) -> str:
   comparison_id = data.get("comparison_id", "")
 
   n = len(variant_summaries)
-  col_w = max(20, 90 // n) if n else 45
 
-  # Build variant score cards side-by-side
-  cards_html = '<div style="display:grid;grid-template-columns:repeat(auto-fit,minmax(280px,1fr));gap:20px;margin-bottom:32px">'
+  parts = [
+      _COMPARISON_PAGE_HEAD,
+      f'  <div class="sub">{n} variants compared &middot; {escape(timestamp)} &middot; ID: {escape(comparison_id)}</div>\n',
+      '</div>\n<div class="container">\n  ',
+  ]
+  append = parts.append
+
+  # Winner recommendation
+  if winner:
+    append(f'''
+    <div style="background:linear-gradient(135deg,#f0fdf4,#dcfce7);border:2px solid #16a34a;border-radius:16px;padding:24px;margin-bottom:32px">
+      <h2 style="font-size:18px;font-weight:700;color:#16a34a;margin:0 0 8px">&#127942; Recommended Winner: {escape(winner.get("video_name", ""))}</h2>
+      <p style="font-size:14px;color:#333;margin:0;line-height:1.6">{escape(winner.get("justification", ""))}</p>
+    </div>''')
+  append("\n  ")
+
+  # Variant score cards side-by-side
+  append('<div style="display:grid;grid-template-columns:repeat(auto-fit,minmax(280px,1fr));gap:20px;margin-bottom:32px">')
   for i, vs in enumerate(variant_summaries):
     is_winner = (i == winner.get("index", -1))
     border = "2px solid #16a34a" if is_winner else "1px solid #e5e7eb"
@@ -2207,7 +2267,7 @@ def generate_comparison_report_html(data: dict) -> str:
     report_id = vs.get("report_id", "")
     report_link = f'<a href="/report/{report_id}" style="color:#0A6D86;font-size:12px">Full Report &rarr;</a>' if report_id else ""
 
-    cards_html += f'''
+    append(f'''
     <div style="background:#fff;border:{border};border-radius:16px;padding:24px;position:relative">
       <div style="font-size:18px;font-weight:700;color:#1a1a2e;margin-bottom:4px">{name}{badge}</div>
       <div style="font-size:13px;color:#666;margin-bottom:16px">{brand}</div>
@@ -2230,76 +2290,37 @@ def generate_comparison_report_html(data: dict) -> str:
         </div>
       </div>
       <div style="margin-top:12px;text-align:right">{report_link}</div>
-    </div>'''
-  cards_html += '</div>'
+    </div>''')
+  append('</div>')
+  append("\n  ")
 
   # Deltas section
-  deltas_html = ''
   if deltas:
-    deltas_html = '<div style="margin-bottom:32px"><h2 style="font-size:18px;font-weight:700;color:#1a1a2e;margin-bottom:12px">Score Deltas</h2>'
+    append('<div style="margin-bottom:32px"><h2 style="font-size:18px;font-weight:700;color:#1a1a2e;margin-bottom:12px">Score Deltas</h2>')
     for d in deltas:
-      deltas_html += f'<div style="background:#f8f9fa;border-radius:12px;padding:16px;margin-bottom:8px"><strong>{escape(d.get("vs", ""))}</strong><div style="display:flex;gap:20px;margin-top:8px">'
+      append(f'<div style="background:#f8f9fa;border-radius:12px;padding:16px;margin-bottom:8px"><strong>{escape(d.get("vs", ""))}</strong><div style="display:flex;gap:20px;margin-top:8px">')
       for key, label in [("abcd_delta", "ABCD"), ("persuasion_delta", "Persuasion"), ("performance_delta", "Performance")]:
         val = d.get(key, 0)
         color = "#16a34a" if val > 0 else "#dc2626" if val < 0 else "#888"
         arrow = "&#9650;" if val > 0 else "&#9660;" if val < 0 else "&#8212;"
-        deltas_html += f'<span style="color:{color};font-weight:600">{label}: {arrow} {abs(val):.1f}</span>'
-      deltas_html += '</div></div>'
-    deltas_html += '</div>'
+        append(f'<span style="color:{color};font-weight:600">{label}: {arrow} {abs(val):.1f}</span>')
+      append('</div></div>')
+    append('</div>')
+  append("\n  ")
 
   # Feature diffs
-  fdiffs_html = ''
   if feature_diffs:
-    fdiffs_html = '<div style="margin-bottom:32px"><h2 style="font-size:18px;font-weight:700;color:#1a1a2e;margin-bottom:12px">Feature Differences</h2>'
-    fdiffs_html += '<p style="font-size:13px;color:#666;margin-bottom:12px">Features where variants disagree:</p>'
+    append('<div style="margin-bottom:32px"><h2 style="font-size:18px;font-weight:700;color:#1a1a2e;margin-bottom:12px">Feature Differences</h2>')
+    append('<p style="font-size:13px;color:#666;margin-bottom:12px">Features where variants disagree:</p>')
     for fd in feature_diffs:
-      fdiffs_html += f'<div style="display:flex;align-items:center;gap:12px;padding:10px 0;border-bottom:1px solid #e5e7eb">'
-      fdiffs_html += f'<span style="width:200px;font-weight:600;font-size:13px">{escape(fd.get("feature_name", ""))}</span>'
-      for ri, r in enumerate(fd.get("results", [])):
-        if r is True:
-          fdiffs_html += '<span style="color:#16a34a;font-weight:700;width:80px;text-align:center">&#10003;</span>'
-        elif r is False:
-          fdiffs_html += '<span style="color:#dc2626;font-weight:700;width:80px;text-align:center">&#10007;</span>'
-        else:
-          fdiffs_html += '<span style="color:#888;width:80px;text-align:center">N/A</span>'
-      fdiffs_html += '</div>'
-    fdiffs_html += '</div>'
-
-  # Winner recommendation
-  winner_html = ''
-  if winner:
-    winner_html = f'''
-    <div style="background:linear-gradient(135deg,#f0fdf4,#dcfce7);border:2px solid #16a34a;border-radius:16px;padding:24px;margin-bottom:32px">
-      <h2 style="font-size:18px;font-weight:700;color:#16a34a;margin:0 0 8px">&#127942; Recommended Winner: {escape(winner.get("video_name", ""))}</h2>
-      <p style="font-size:14px;color:#333;margin:0;line-height:1.6">{escape(winner.get("justification", ""))}</p>
-    </div>'''
+      append('<div style="display:flex;align-items:center;gap:12px;padding:10px 0;border-bottom:1px solid #e5e7eb">')
+      append(f'<span style="width:200px;font-weight:600;font-size:13px">{escape(fd.get("feature_name", ""))}</span>')
+      parts.extend(
+          _DIFF_CELL_PASS if r is True else _DIFF_CELL_FAIL if r is False else _DIFF_CELL_NA
+          for r in fd.get("results", [])
+      )
+      append('</div>')
+    append('</div>')
 
-  html = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-<meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
-<title>A/B Comparison Report \u2014 AI Creative Review</title>
-<style>
-  * {{ margin:0; padding:0; box-sizing:border-box; }}
-  body {{ font-family:Inter,-apple-system,BlinkMacSystemFont,sans-serif; background:#f3f4f6; color:#1a1a2e; }}
-  .header {{ background:linear-gradient(135deg,#0A6D86,#084c5e); color:#fff; padding:32px 40px; }}
-  .header h1 {{ font-size:28px; font-weight:800; margin-bottom:4px; }}
-  .header .sub {{ font-size:14px; opacity:0.8; }}
-  .container {{ max-width:1100px; margin:0 auto; padding:32px 24px; }}
-</style>
-</head>
-<body>
-<div class="header">
-  <h1>A/B Variant Comparison</h1>
-  <div class="sub">{n} variants compared &middot; {escape(timestamp)} &middot; ID: {escape(comparison_id)}</div>
-</div>
-<div class="container">
-  {winner_html}
-  {cards_html}
-  {deltas_html}
-  {fdiffs_html}
-  <div style="text-align:center;color:#aaa;font-size:12px;padding:24px 0">Generated by AI Creative Review</div>
-</div>
-</body>
-</html>'''
-  return html
+  append(_COMPARISON_PAGE_FOOT)
+  return "".join(parts)
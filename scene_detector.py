@@ -5,9 +5,11 @@ from __future__ import annotations
 """Service for detecting scenes in videos using Gemini and extracting keyframes with ffmpeg."""
 
 import base64
+import functools
 import logging
 import os
 import re
+import shutil
 import subprocess
 import sys
 import tempfile
@@ -19,6 +21,28 @@ from models import LLMParameters, PromptConfig, SCENE_RESPONSE_SCHEMA, BRAND_INT
 
 FLASH_MODEL = "gemini-2.5-flash"
 
+# Minimum free space for tmpfs to hold a source video plus its 720p transcode.
+_TMPFS_MIN_FREE_BYTES = 512 * 1024 * 1024
+
+
+def _video_tmp_root() -> str | None:
+  """Return /dev/shm if it is writable and large enough, else None.
+
+  Downloaded videos are read several times (keyframes, volume, metadata,
+  audio), so keeping them on tmpfs serves those seeks from RAM. Containers
+  often mount a small /dev/shm (64MB in Docker), in which case the default
+  temp directory is used.
+  """
+  try:
+    if not os.access("/dev/shm", os.W_OK):
+      return None
+    st = os.statvfs("/dev/shm")
+    if st.f_bavail * st.f_frsize < _TMPFS_MIN_FREE_BYTES:
+      return None
+    return "/dev/shm"
+  except OSError:
+    return None
+
 
 def detect_scenes(config: Configuration, video_uri: str) -> list[dict]:
   """Send a video to Gemini and get back a list of detected scenes.
@@ -211,15 +235,27 @@ def extract_metadata_and_scenes(
     return {}, []
 
 
+@functools.lru_cache(maxsize=4096)
 def _parse_timestamp_seconds(ts: str) -> float:
-  """Convert a timestamp string like '0:15' or '1:02:30' to seconds."""
-  parts = ts.strip().split(":")
-  parts = [float(p) for p in parts]
+  """Convert a timestamp string like '0:15' or '1:02:30' to seconds.
+
+  Memoized: a report reuses a handful of distinct timestamps across all of
+  its scenes and features.
+
+  Raises:
+    ValueError: If ts is not an [[H:]M:]S timestamp.
+  """
+  # int()/float() tolerate surrounding whitespace, so no strip() is needed.
+  # M:SS is by far the most common form; parse it without building a list.
+  minutes, sep, seconds = ts.partition(":")
+  if sep and ":" not in seconds:
+    return int(minutes) * 60 + float(seconds)
+  parts = ts.split(":")
   if len(parts) == 3:
-    return parts[0] * 3600 + parts[1] * 60 + parts[2]
-  elif len(parts) == 2:
-    return parts[0] * 60 + parts[1]
-  return parts[0]
+    return int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
+  if len(parts) == 1:
+    return float(parts[0])
+  raise ValueError(f"Invalid timestamp: {ts!r}")
 
 
 def download_video_locally(
@@ -235,7 +271,7 @@ def download_video_locally(
     Tuple of (tmp_dir_path, video_file_path). Caller must clean up tmp_dir.
     Returns ("", "") if download fails.
   """
-  tmp_dir = tempfile.mkdtemp(prefix="abcd_video_")
+  tmp_dir = tempfile.mkdtemp(prefix="abcd_video_", dir=_video_tmp_root())
   video_path = os.path.join(tmp_dir, "source.mp4")
 
   # Handle GCS URIs
@@ -245,8 +281,7 @@ def download_video_locally(
       if not blob:
         logging.error("Could not download video %s", video_uri)
         return ("", "")
-      with open(video_path, "wb") as f:
-        f.write(blob.download_as_string(client=None))
+      blob.download_to_filename(video_path)
       return (tmp_dir, video_path)
     except Exception as ex:
       logging.error("Failed to download GCS video %s: %s", video_uri, ex)
@@ -257,7 +292,6 @@ def download_video_locally(
     try:
       logging.info("Downloading YouTube video: %s", video_uri)
       # Use yt-dlp to download the video (try binary, fall back to python -m)
-      import shutil
       yt_dlp_cmd = shutil.which("yt-dlp")
       if yt_dlp_cmd:
         cmd = [yt_dlp_cmd]
@@ -296,20 +330,13 @@ def cleanup_temp_dir(tmp_dir: str) -> None:
   """Remove a temporary directory and all its contents."""
   if not tmp_dir or not os.path.isdir(tmp_dir):
     return
-  for f in os.listdir(tmp_dir):
-    try:
-      os.remove(os.path.join(tmp_dir, f))
-    except OSError:
-      pass
-  try:
-    os.rmdir(tmp_dir)
-  except OSError:
-    pass
+  # rmtree walks with scandir and fd-relative unlinks, and also clears any
+  # nested directories a step may have left behind.
+  shutil.rmtree(tmp_dir, ignore_errors=True)
 
 
 def _find_ffmpeg() -> str:
   """Find ffmpeg binary in common locations."""
-  import shutil
   # Try to find ffmpeg in PATH
   ffmpeg = shutil.which("ffmpeg")
   if ffmpeg:
@@ -349,30 +376,34 @@ def extract_keyframes(
     ffmpeg_path = _find_ffmpeg()
 
   keyframes: list[str] = []
-  tmp_dir = os.path.dirname(video_path)
 
   for i, scene in enumerate(scenes):
-    frame_path = os.path.join(tmp_dir, f"scene_{i:03d}.jpg")
     ts = scene.get("start_time", "0:00")
     seconds = _parse_timestamp_seconds(ts)
 
     try:
-      subprocess.run(
+      # -ss before -i seeks the demuxer to the preceding keyframe, so only
+      # the frames up to the target are decoded. Audio/subtitle/data streams
+      # are dropped and the JPEG is piped back instead of round-tripping
+      # through a temp file.
+      result = subprocess.run(
           [
               ffmpeg_path, "-y",
               "-ss", str(seconds),
               "-i", video_path,
+              "-an", "-sn", "-dn",
               "-vframes", "1",
               "-q:v", "2",
               "-vf", "scale=640:360:force_original_aspect_ratio=decrease,pad=640:360:(ow-iw)/2:(oh-ih)/2:black",
-              frame_path,
+              "-f", "image2pipe",
+              "-vcodec", "mjpeg",
+              "-",
           ],
           capture_output=True,
           timeout=30,
       )
-      if os.path.exists(frame_path) and os.path.getsize(frame_path) > 0:
-        with open(frame_path, "rb") as img:
-          keyframes.append(base64.b64encode(img.read()).decode("ascii"))
+      if result.returncode == 0 and result.stdout:
+        keyframes.append(base64.b64encode(result.stdout).decode("ascii"))
       else:
         keyframes.append("")
     except Exception as ex:
@@ -472,7 +503,6 @@ def extract_video_metadata(
     return {}
 
   if not ffprobe_path:
-    import shutil
     ffprobe_path = shutil.which("ffprobe")
     if not ffprobe_path:
       # Try alongside ffmpeg
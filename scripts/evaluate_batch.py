@@ -13,7 +13,6 @@ Usage:
 from __future__ import annotations
 
 import argparse
-import datetime
 import hashlib
 import json
 import logging
@@ -29,6 +28,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from pytubefix import YouTube
 from google.cloud import storage
 
+from db import utcnow
 from web_app import (
     build_config,
     run_evaluation,
@@ -151,7 +151,7 @@ def process_video(video: dict) -> Optional[dict]:
 
         # Step 4: Save results
         results["report_id"] = report_id
-        results["timestamp"] = datetime.datetime.utcnow().isoformat() + "Z"
+        results["timestamp"] = utcnow().isoformat() + "Z"
         results["youtube_url"] = url
         results_store[report_id] = results
         _save_results_to_gcs(report_id, results)
@@ -263,7 +263,7 @@ def main():
     os.makedirs(os.path.dirname(summary_path), exist_ok=True)
     with open(summary_path, "w") as f:
         json.dump({
-            "generated_at": datetime.datetime.utcnow().isoformat() + "Z",
+            "generated_at": utcnow().isoformat() + "Z",
             "count": len(results_list),
             "results": results_list,
         }, f, indent=2)
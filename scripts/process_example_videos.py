@@ -8,6 +8,7 @@ Usage:
     python scripts/process_example_videos.py
     python scripts/process_example_videos.py --resume   # skip already-processed
     python scripts/process_example_videos.py --video-id VqB98tCClPQ  # single video
+    python scripts/process_example_videos.py --legacy-report-ids  # MD5 report IDs
 """
 
 from __future__ import annotations
@@ -19,18 +20,23 @@ import logging
 import os
 import sys
 import time
-import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from google.cloud import storage
+
+import scene_detector
+from db import utcnow
 from web_app import (
     build_config,
     run_evaluation,
     _save_results_to_gcs,
     results_store,
     PUBLIC_BASE_URL,
+    PROJECT_ID,
 )
 
 logging.basicConfig(
@@ -57,6 +63,14 @@ EXAMPLE_VIDEOS = [
 ]
 
 BASE_URL = PUBLIC_BASE_URL or "https://app.aicreativereview.com"
+
+# How many upcoming videos to download while the current one is evaluated.
+PREFETCH_DEPTH = 3
+
+# One storage client for the whole batch so every report upload reuses the
+# same pooled HTTPS session instead of re-authenticating per video.
+_STORAGE_CLIENT = storage.Client(project=PROJECT_ID)
+
 EXAMPLES_JSON = os.path.join(
     os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
     "static",
@@ -64,9 +78,21 @@ EXAMPLES_JSON = os.path.join(
 )
 
 
+# Reports published before the switch to BLAKE2s used MD5-derived IDs.
+# Set via --legacy-report-ids to regenerate those reports in place.
+USE_LEGACY_REPORT_IDS = False
+
+
 def make_report_id(video_id: str) -> str:
-    """Deterministic 8-char report ID from YouTube video ID."""
-    return hashlib.md5(f"example_{video_id}".encode()).hexdigest()[:8]
+    """Deterministic 8-char report ID from YouTube video ID.
+
+    The ID only needs to be stable, not secure, so a 4-byte BLAKE2s digest
+    is used instead of truncating an MD5 hex digest.
+    """
+    key = f"example_{video_id}".encode()
+    if USE_LEGACY_REPORT_IDS:
+        return hashlib.md5(key).hexdigest()[:8]
+    return hashlib.blake2s(key, digest_size=4).hexdigest()
 
 
 def youtube_url(video_id: str) -> str:
@@ -85,7 +111,7 @@ def load_existing() -> list[dict]:
 def save_examples(examples: list[dict]) -> None:
     """Write examples.json with full metadata."""
     payload = {
-        "generated_at": datetime.datetime.utcnow().isoformat() + "Z",
+        "generated_at": utcnow().isoformat() + "Z",
         "count": len(examples),
         "examples": examples,
     }
@@ -94,38 +120,83 @@ def save_examples(examples: list[dict]) -> None:
     log.info("Wrote %d examples to %s", len(examples), EXAMPLES_JSON)
 
 
-def process_video(video_id: str, existing: list[dict]) -> Optional[dict]:
-    """Process a single YouTube video and return metadata dict."""
+def find_processed(video_id: str, existing: list[dict]) -> Optional[dict]:
+    """Return the existing processed entry for a video, if any."""
     report_id = make_report_id(video_id)
-    url = youtube_url(video_id)
-
-    # Check if already processed
     for ex in existing:
         if ex.get("report_id") == report_id and ex.get("processed"):
-            log.info("Skipping %s (already processed as %s)", video_id, report_id)
             return ex
+    return None
 
-    log.info("Processing %s → report_id=%s", video_id, report_id)
-    config = build_config(
+
+def example_config():
+    """Evaluation config shared by all example videos."""
+    return build_config(
         use_abcd=True,
         use_shorts=False,
         use_ci=True,
         provider_type="YOUTUBE",
     )
 
+
+def prefetch_video(video_id: str) -> tuple[str, str]:
+    """Download a video ahead of its evaluation. Returns (tmp_dir, path)."""
+    return scene_detector.download_video_locally(
+        example_config(), youtube_url(video_id),
+    )
+
+
+def process_video(
+    video_id: str,
+    existing: list[dict],
+    prefetched: Optional[Future] = None,
+) -> Optional[dict]:
+    """Process a single YouTube video and return metadata dict.
+
+    Args:
+        video_id: YouTube video ID.
+        existing: Previously written examples (for --resume).
+        prefetched: Optional future resolving to the (tmp_dir, path) of a
+            background download started by prefetch_video.
+    """
+    report_id = make_report_id(video_id)
+    url = youtube_url(video_id)
+
+    # Check if already processed
+    existing_entry = find_processed(video_id, existing)
+    if existing_entry:
+        log.info("Skipping %s (already processed as %s)", video_id, report_id)
+        return existing_entry
+
+    log.info("Processing %s → report_id=%s", video_id, report_id)
+    config = example_config()
+
+    prefetched_video = None
+    if prefetched is not None:
+        try:
+            tmp_dir, path = prefetched.result()
+            if path:
+                prefetched_video = (tmp_dir, path)
+        except Exception as ex:
+            log.warning("Prefetch failed for %s, downloading inline: %s", video_id, ex)
+
     def on_progress(step, message, pct=0, partial=None):
         log.info("  [%3d%%] %s: %s", pct, step, message)
 
     try:
         start = time.time()
-        results = run_evaluation(url, config, on_progress=on_progress)
+        results = run_evaluation(
+            url, config, on_progress=on_progress,
+            prefetched_video=prefetched_video,
+        )
         elapsed = time.time() - start
+        now = utcnow().isoformat() + "Z"
 
         # Assign report ID and save to GCS
         results["report_id"] = report_id
-        results["timestamp"] = datetime.datetime.utcnow().isoformat() + "Z"
+        results["timestamp"] = now
         results_store[report_id] = results
-        _save_results_to_gcs(report_id, results)
+        _save_results_to_gcs(report_id, results, client=_STORAGE_CLIENT)
 
         # Wait briefly for GCS write to complete
         time.sleep(2)
@@ -137,12 +208,13 @@ def process_video(video_id: str, existing: list[dict]) -> Optional[dict]:
         brand_intel = results.get("brand_intelligence", {})
         scenes = results.get("scenes", [])
 
+        # Indices of scenes that have a keyframe (single scan over scenes)
+        kf_idx = [i for i, sc in enumerate(scenes) if sc.get("keyframe")]
+
         # Get first keyframe as base64 for thumbnail (first scene)
         first_keyframe = ""
-        for sc in scenes:
-            if sc.get("keyframe"):
-                first_keyframe = sc["keyframe"][:200] + "..."  # truncated reference
-                break
+        if kf_idx:
+            first_keyframe = scenes[kf_idx[0]]["keyframe"][:200] + "..."  # truncated reference
 
         report_url = f"{BASE_URL}/report/{report_id}"
         meta = {
@@ -157,15 +229,13 @@ def process_video(video_id: str, existing: list[dict]) -> Optional[dict]:
             "persuasion_density": persuasion.get("density", 0),
             "performance_score": predictions.get("overall_score", 0),
             "scene_count": len(scenes),
-            "keyframe_count": sum(1 for s in scenes if s.get("keyframe")),
+            "keyframe_count": len(kf_idx),
             "thumbnail_url": f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg",
             "keyframe_urls": [
-                f"{BASE_URL}/api/keyframe/{report_id}/{i}"
-                for i in range(len(scenes))
-                if i < len(scenes) and scenes[i].get("keyframe")
+                f"{BASE_URL}/api/keyframe/{report_id}/{i}" for i in kf_idx
             ],
             "processed": True,
-            "processed_at": datetime.datetime.utcnow().isoformat() + "Z",
+            "processed_at": now,
             "processing_time_s": round(elapsed, 1),
         }
 
@@ -203,8 +273,15 @@ def main():
         "--video-id", type=str, default=None,
         help="Process a single video ID instead of the full list",
     )
+    parser.add_argument(
+        "--legacy-report-ids", action="store_true",
+        help="Derive report IDs with MD5 to keep previously published URLs",
+    )
     args = parser.parse_args()
 
+    global USE_LEGACY_REPORT_IDS
+    USE_LEGACY_REPORT_IDS = args.legacy_report_ids
+
     existing = load_existing() if args.resume else []
     video_ids = [args.video_id] if args.video_id else EXAMPLE_VIDEOS
 
@@ -216,11 +293,24 @@ def main():
     # Preserve any existing entries not being re-processed
     existing_by_id = {ex["video_id"]: ex for ex in existing}
 
-    for i, vid in enumerate(video_ids):
-        log.info("\n[%d/%d] Video: %s", i + 1, len(video_ids), vid)
-        meta = process_video(vid, existing)
-        if meta:
-            existing_by_id[vid] = meta
+    # Download the next few videos in the background while the current one
+    # is evaluated, so yt-dlp latency overlaps with Gemini calls.
+    to_fetch = [vid for vid in video_ids if not find_processed(vid, existing)]
+    downloads: dict[str, Future] = {}
+    with ThreadPoolExecutor(max_workers=PREFETCH_DEPTH) as pool:
+        def _schedule(n):
+            for vid in to_fetch[n:n + PREFETCH_DEPTH]:
+                if vid not in downloads:
+                    downloads[vid] = pool.submit(prefetch_video, vid)
+
+        _schedule(0)
+        for i, vid in enumerate(video_ids):
+            log.info("\n[%d/%d] Video: %s", i + 1, len(video_ids), vid)
+            meta = process_video(vid, existing, prefetched=downloads.pop(vid, None))
+            if meta:
+                existing_by_id[vid] = meta
+            if vid in to_fetch:
+                _schedule(to_fetch.index(vid) + 1)
 
     # Build final list in original order
     for vid in EXAMPLE_VIDEOS:
@@ -229,20 +319,27 @@ def main():
 
     save_examples(results_list)
 
-    # Summary
-    processed = sum(1 for r in results_list if r.get("processed"))
-    failed = sum(1 for r in results_list if not r.get("processed"))
+    # Summary (single pass over results)
+    processed = 0
+    failed = 0
+    url_lines = []
+    for r in results_list:
+        if r.get("processed"):
+            processed += 1
+            url_lines.append(("  %s → %s", r["video_id"], r["report_url"]))
+            if r.get("keyframe_urls"):
+                url_lines.append(("    Keyframes: %s", r["keyframe_urls"][0]))
+        else:
+            failed += 1
+
     log.info("\n" + "=" * 60)
     log.info("SUMMARY: %d processed, %d failed, %d total", processed, failed, len(results_list))
     log.info("=" * 60)
 
     if processed > 0:
         log.info("\nPublic Report URLs:")
-        for r in results_list:
-            if r.get("processed"):
-                log.info("  %s → %s", r["video_id"], r["report_url"])
-                if r.get("keyframe_urls"):
-                    log.info("    Keyframes: %s", r["keyframe_urls"][0])
+        for line in url_lines:
+            log.info(*line)
 
 
 if __name__ == "__main__":
@@ -3,10 +3,11 @@
 
 import datetime
 import json
-import random
 import uuid
 
-from db import Render, User, init_db, SessionLocal
+import numpy as np
+
+from db import Render, User, init_db, SessionLocal, utcnow
 
 STATUSES = ["queued", "rendering", "succeeded", "failed", "canceled"]
 SOURCE_TYPES = ["upload", "url", "api"]
@@ -33,17 +34,20 @@ ERROR_CODES = [None, None, None, None, "TIMEOUT", "ENCODE_FAIL", "OOM", "PIPELIN
 BRANDS = ["Nike", "Coca-Cola", "Apple", "Google", "Samsung", "Adidas", "Pepsi", "Tesla"]
 
 
-def _rand_dt(days_back: int = 30) -> datetime.datetime:
-  """Return a random datetime within the last N days."""
-  now = datetime.datetime.utcnow()
-  offset = random.randint(0, days_back * 86400)
-  return now - datetime.timedelta(seconds=offset)
+def _rand_dts(
+    rng: np.random.Generator, count: int, days_back: int = 30,
+) -> list[datetime.datetime]:
+  """Return `count` random datetimes within the last N days."""
+  now = np.datetime64(utcnow(), "us")
+  offsets = rng.integers(0, days_back * 86400, size=count, endpoint=True)
+  return (now - offsets.astype("timedelta64[s]")).tolist()
 
 
 def seed(count: int = 20):
   """Insert sample renders into the database."""
   init_db()
   db = SessionLocal()
+  rng = np.random.default_rng()
 
   # Ensure at least one demo user exists
   demo_users = []
@@ -59,34 +63,54 @@ def seed(count: int = 20):
           google_sub=f"demo_sub_{i}",
           email=email,
           is_admin=(i == 0),  # first user is admin
-          credits_balance=random.randint(200, 5000),
+          credits_balance=int(rng.integers(200, 5000, endpoint=True)),
       )
       db.add(user)
       db.flush()
     demo_users.append(user)
 
+  # Draw every random column up front as one array per field instead of
+  # ~20 scalar RNG calls per row.
+  user_idx = rng.integers(0, len(demo_users), size=count)
+  statuses = rng.choice(STATUSES, size=count, p=[0.05, 0.05, 0.6, 0.2, 0.1])
+  created_at = _rand_dts(rng, count)
+  start_delays = rng.integers(0, 5, size=count, endpoint=True)
+  run_times = rng.integers(10, 120, size=count, endpoint=True)
+  durations = np.round(rng.uniform(6, 60, size=count), 1)
+  progress = rng.integers(10, 90, size=count, endpoint=True)
+  error_codes = rng.choice([c for c in ERROR_CODES if c], size=count)
+  filenames = rng.choice(FILENAMES, size=count)
+  source_types = rng.choice(SOURCE_TYPES, size=count)
+  asset_sizes = np.round(rng.uniform(2, 48, size=count), 1)
+  file_sizes = np.round(rng.uniform(2, 48, size=count), 1)
+  prompt_brands = rng.choice(BRANDS, size=count)
+  styles = rng.choice(["upbeat", "cinematic", "minimal", "bold"], size=count)
+  brand_guides = rng.choice(BRANDS, size=count)
+  aspect_ratios = rng.choice(["16:9", "9:16", "1:1"], size=count)
+  fps_values = rng.choice([24, 30, 60], size=count)
+  bitrates = rng.choice(["8M", "12M", "20M"], size=count)
+  pipelines = rng.choice(PIPELINES, size=count)
+  models = rng.choice(MODELS, size=count)
+  webhook_failures = rng.choice([0, 0, 0, 0, 1, 2, 3], size=count)
+
   for n in range(count):
-    user = random.choice(demo_users)
-    status = random.choices(
-        STATUSES, weights=[5, 5, 60, 20, 10], k=1,
-    )[0]
-    created = _rand_dt()
-    started = created + datetime.timedelta(seconds=random.randint(0, 5))
-    duration = round(random.uniform(6, 60), 1)
+    user = demo_users[user_idx[n]]
+    status = str(statuses[n])
+    created = created_at[n]
+    started = created + datetime.timedelta(seconds=int(start_delays[n]))
+    duration = float(durations[n])
     finished = None
     error_code = None
     error_message = None
 
     if status in ("succeeded", "failed", "canceled"):
-      finished = started + datetime.timedelta(
-          seconds=random.randint(10, 120),
-      )
+      finished = started + datetime.timedelta(seconds=int(run_times[n]))
     if status == "failed":
-      error_code = random.choice([c for c in ERROR_CODES if c])
+      error_code = str(error_codes[n])
       error_message = f"Pipeline error: {error_code}"
 
-    filename = random.choice(FILENAMES)
-    source_type = random.choice(SOURCE_TYPES)
+    filename = str(filenames[n])
+    source_type = str(source_types[n])
     source_ref = filename if source_type == "upload" else f"https://storage.example.com/{filename}"
 
     tokens_est = int(duration * 10)
@@ -96,7 +120,7 @@ def seed(count: int = 20):
         render_id=str(uuid.uuid4())[:8],
         status=status,
         progress_pct=100 if status == "succeeded" else (
-            random.randint(10, 90) if status == "rendering" else 0
+            int(progress[n]) if status == "rendering" else 0
         ),
         created_at=created,
         started_at=started,
@@ -108,29 +132,29 @@ def seed(count: int = 20):
         source_ref=source_ref,
         input_assets=json.dumps([{
             "type": "video",
-            "size": round(random.uniform(2, 48), 1),
+            "size": float(asset_sizes[n]),
             "url": f"gs://demo-bucket/{filename}",
         }]),
-        prompt_text=f"Create a {random.choice(BRANDS)} ad with {random.choice(['upbeat', 'cinematic', 'minimal', 'bold'])} style",
-        brand_guide=random.choice(BRANDS),
+        prompt_text=f"Create a {prompt_brands[n]} ad with {styles[n]} style",
+        brand_guide=str(brand_guides[n]),
         config_json=json.dumps({
-            "aspect_ratio": random.choice(["16:9", "9:16", "1:1"]),
-            "fps": random.choice([24, 30, 60]),
-            "bitrate": random.choice(["8M", "12M", "20M"]),
+            "aspect_ratio": str(aspect_ratios[n]),
+            "fps": int(fps_values[n]),
+            "bitrate": str(bitrates[n]),
             "output_format": "mp4",
         }),
         output_url=f"gs://demo-bucket/output/{filename}" if status == "succeeded" else None,
         thumbnail_url=f"/api/keyframe/demo/{n}" if status == "succeeded" else None,
         duration_seconds=duration,
-        file_size_mb=round(random.uniform(2, 48), 1),
-        pipeline_version=random.choice(PIPELINES),
-        model=random.choice(MODELS),
+        file_size_mb=float(file_sizes[n]),
+        pipeline_version=str(pipelines[n]),
+        model=str(models[n]),
         tokens_estimated=tokens_est,
         tokens_used=tokens_used,
         error_code=error_code,
         error_message=error_message,
         logs_url=f"/admin/api/renders/{n}/logs",
-        webhook_failures_count=random.choice([0, 0, 0, 0, 1, 2, 3]),
+        webhook_failures_count=int(webhook_failures[n]),
     )
     db.add(render)
 
@@ -1,6 +1,6 @@
 """Shared test fixtures for auth test suite."""
 
-import datetime
+import logging
 import os
 import sys
 
@@ -18,21 +18,82 @@ os.environ["DATABASE_URL"] = "sqlite://"  # in-memory
 os.environ["GOOGLE_CLIENT_ID"] = ""
 os.environ["GOOGLE_CLIENT_SECRET"] = ""
 os.environ["STRIPE_SECRET_KEY"] = ""
+# No Slack webhooks: keeps the Slack error log handler and notification
+# threads out of every request.
+os.environ["SLACK_WEBHOOK_URL"] = ""
+os.environ["SLACK_ERROR_WEBHOOK_URL"] = ""
 
-from db import Base, User, CreditTransaction  # noqa: E402
+# Drop app log records before they are formatted. Pass --log-level to
+# pytest to see them again when debugging.
+logging.getLogger().setLevel(logging.CRITICAL)
+
+from db import Base, User, CreditTransaction, utcnow  # noqa: E402
 import bcrypt as _bcrypt  # noqa: E402
 
+# Tests don't need cryptographic strength: use the minimum bcrypt cost and
+# hash the default password once instead of once per created user.
+_BCRYPT_TEST_ROUNDS = 4
+_DEFAULT_PASSWORD = "Testpass1"
+_DEFAULT_PASSWORD_HASH = _bcrypt.hashpw(
+    _DEFAULT_PASSWORD.encode(), _bcrypt.gensalt(rounds=_BCRYPT_TEST_ROUNDS),
+).decode()
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _fast_bcrypt():
+  """Force the minimum bcrypt cost for every hash made during tests.
+
+  Covers hashes made by the app itself (e.g. /auth/register) as well as
+  direct bcrypt.hashpw calls in test bodies.
+  """
+  orig_gensalt = _bcrypt.gensalt
+
+  def _gensalt(rounds=_BCRYPT_TEST_ROUNDS, prefix=b"2b"):
+    return orig_gensalt(rounds=_BCRYPT_TEST_ROUNDS, prefix=prefix)
+
+  with pytest.MonkeyPatch.context() as mp:
+    mp.setattr(_bcrypt, "gensalt", _gensalt)
+    yield
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _orjson_request_bodies():
+  """Serialize TestClient json= bodies with orjson instead of stdlib json.
+
+  httpx calls json_dumps with stdlib-only keyword arguments; orjson's
+  defaults already match them (compact separators, UTF-8 output).
+  """
+  import httpx._content
+  import orjson
+
+  def _dumps(obj, **_kwargs):
+    return orjson.dumps(obj).decode()
+
+  with pytest.MonkeyPatch.context() as mp:
+    mp.setattr(httpx._content, "json_dumps", _dumps)
+    yield
+
+
+def _hash_password(password):
+  """Return a low-cost bcrypt hash, reusing the cached default-password hash."""
+  if password == _DEFAULT_PASSWORD:
+    return _DEFAULT_PASSWORD_HASH
+  return _bcrypt.hashpw(
+      password.encode(), _bcrypt.gensalt(rounds=_BCRYPT_TEST_ROUNDS),
+  ).decode()
+
 
 # ---------------------------------------------------------------------------
 # Database fixtures
 # ---------------------------------------------------------------------------
 
-@pytest.fixture()
-def db_engine():
-  """Create an in-memory SQLite engine with all tables.
+@pytest.fixture(scope="session")
+def _shared_engine():
+  """Create one in-memory SQLite engine with all tables for the session.
 
   Uses StaticPool so every connection shares the same in-memory DB,
   and check_same_thread=False for FastAPI TestClient threading.
+  Journaling and syncing are turned off since the DB is throwaway.
   """
   engine = create_engine(
       "sqlite://",
@@ -40,26 +101,61 @@ def db_engine():
       connect_args={"check_same_thread": False},
       poolclass=StaticPool,
   )
+
+  @event.listens_for(engine, "connect")
+  def _set_sqlite_pragmas(dbapi_conn, _record):
+    # The DB is discarded after the session, so skip durability work.
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA locking_mode=EXCLUSIVE")
+    cursor.close()
+
   Base.metadata.create_all(bind=engine)
   yield engine
   engine.dispose()
 
 
 @pytest.fixture()
-def db_session(db_engine):
-  """Yield a fresh DB session per test, rolled back after."""
-  Session = sessionmaker(bind=db_engine)
-  session = Session()
+def db_engine(_shared_engine):
+  """Yield the shared in-memory engine, deleting all rows after the test.
+
+  Rows are wiped rather than rolled back because the app under test and
+  the test body commit through separate sessions on the shared connection.
+  """
+  yield _shared_engine
+  with _shared_engine.begin() as conn:
+    for table in reversed(Base.metadata.sorted_tables):
+      conn.execute(table.delete())
+
+
+@pytest.fixture(scope="session")
+def _session_factory(_shared_engine):
+  """One sessionmaker for the whole run, shared by tests and the app."""
+  return sessionmaker(bind=_shared_engine)
+
+
+@pytest.fixture()
+def db_session(db_engine, _session_factory):
+  """Yield a fresh DB session per test, rolled back and closed after."""
+  session = _session_factory()
   yield session
+  session.rollback()
   session.close()
 
 
-@pytest.fixture()
-def client(db_engine):
-  """FastAPI TestClient wired to the in-memory DB."""
+@pytest.fixture(scope="session")
+def _shared_client(_session_factory):
+  """Build the FastAPI app and TestClient once per session.
+
+  Unhandled server errors are re-raised so a failing route fails its test
+  with the real traceback. A test that expects such a 500 should build its
+  own TestClient(app, raise_server_exceptions=False).
+  """
   from fastapi.testclient import TestClient
 
-  SessionLocal = sessionmaker(bind=db_engine)
+  SessionLocal = _session_factory
 
   # Must import app AFTER env vars are set
   from web_app import app
@@ -74,15 +170,41 @@ def client(db_engine):
 
   app.dependency_overrides[get_db] = _override_get_db
 
+  with TestClient(app, base_url="https://testserver") as c:
+    yield c
+
+  app.dependency_overrides.clear()
+
+
+@pytest.fixture()
+def client(_shared_client, db_engine):
+  """FastAPI TestClient wired to the in-memory DB, reset for each test."""
   # Clear rate-limit and lockout buckets between tests
   from auth import _rate_buckets, _login_failures
   _rate_buckets.clear()
   _login_failures.clear()
+  _shared_client.cookies.clear()
+  yield _shared_client
 
-  with TestClient(app, base_url="https://testserver") as c:
-    yield c
 
-  app.dependency_overrides.clear()
+@pytest.fixture()
+def anyio_backend():
+  """Run @pytest.mark.anyio tests on asyncio only."""
+  return "asyncio"
+
+
+@pytest.fixture()
+def async_client(client):
+  """httpx AsyncClient speaking ASGI directly to the app, for gathering
+  independent requests inside one test. Shares the DB override and the
+  per-test resets of `client`; use as `async with async_client as c`.
+  """
+  import httpx
+  from web_app import app
+
+  return httpx.AsyncClient(
+      transport=httpx.ASGITransport(app=app), base_url="https://testserver",
+  )
 
 
 # ---------------------------------------------------------------------------
@@ -95,7 +217,7 @@ def create_user(db_session):
 
   def _create(
       email="test@example.com",
-      password="Testpass1",
+      password=_DEFAULT_PASSWORD,
       email_verified=False,
       google_sub=None,
       credits_balance=1000,
@@ -103,10 +225,10 @@ def create_user(db_session):
       reset_token=None,
       token_expires_at=None,
   ):
-    now = datetime.datetime.utcnow()
+    now = utcnow()
     user = User(
         email=email,
-        password_hash=_bcrypt.hashpw(password.encode(), _bcrypt.gensalt()).decode() if password else None,
+        password_hash=_hash_password(password) if password else None,
         email_verified=email_verified,
         google_sub=google_sub,
         credits_balance=credits_balance,
@@ -125,6 +247,26 @@ def create_user(db_session):
   return _create
 
 
+def _insert_user_row(engine, password=_DEFAULT_PASSWORD, **cols):
+  """Insert one users row with a Core INSERT, skipping the ORM unit of work."""
+  if password:
+    cols["password_hash"] = _hash_password(password)
+  cols.setdefault("credits_balance", 1000)
+  cols.setdefault("email_normalized", cols["email"].lower())
+  with engine.begin() as conn:
+    conn.execute(User.__table__.insert(), [cols])
+
+
+@pytest.fixture()
+def insert_user_row(db_engine):
+  """Factory for bare users rows when the test doesn't need the ORM object."""
+
+  def _insert(**cols):
+    _insert_user_row(db_engine, **cols)
+
+  return _insert
+
+
 @pytest.fixture()
 def auth_headers(client):
   """Helper: register a user and return headers with the session cookie."""
@@ -5,42 +5,57 @@ Uses FastAPI TestClient with mocked evaluation to test:
 - GET /report/compare/{comparison_id}
 """
 
+import asyncio
+import threading
+
 import pytest
+from sqlalchemy import event
 from unittest import mock
 
 
+# Evaluation result returned by the mocked run_evaluation_async. Built once; the
+# endpoint only sets top-level keys on results, so a shallow copy per
+# variant is enough.
+_MOCK_EVAL_TEMPLATE = {
+    "brand_name": "TestBrand",
+    "video_uri": "gs://bucket/test_video.mp4",
+    "video_name": "test_video.mp4",
+    "abcd": {"score": 75, "result": "Might Improve", "passed": 6, "total": 8, "features": []},
+    "persuasion": {"density": 57, "detected": 4, "total": 7, "features": []},
+    "structure": {"features": []},
+    "shorts": {"features": []},
+    "scenes": [],
+    "concept": {"name": "Test Concept", "description": "A test ad"},
+    "predictions": {"overall_score": 68, "section_scores": {}, "section_maxes": {},
+                    "normalized": {}, "flags": {}, "labels": {}, "drivers": {"top_positive": [], "top_negative": []}},
+    "reference_ads": [],
+    "brand_intelligence": {},
+    "video_metadata": {"duration": "0:30", "aspect_ratio": "16:9"},
+    "emotional_coherence": {"score": 80, "flagged_shifts": []},
+    "audio_analysis": {},
+    "action_plan": [],
+    "feature_timeline": {"video_duration_s": 30, "scene_boundaries": [], "features": []},
+    "accessibility": {"score": 75, "passed": 3, "total": 4, "features": [], "speech_rate_wpm": 150, "speech_rate_flag": "ok"},
+    "platform_fit": {"youtube": {"score": 85, "tips": []}, "meta_feed": {"score": 70, "tips": []},
+                     "meta_reels": {"score": 55, "tips": []}, "tiktok": {"score": 50, "tips": []},
+                     "ctv": {"score": 90, "tips": []}},
+    "benchmarks": {"abcd_percentile": 50, "persuasion_percentile": 50, "performance_percentile": 50,
+                   "sample_size": 0, "vertical": "all", "distribution": {}},
+}
+
+
+def _mock_eval_result(name="test_video.mp4", bucket="bucket"):
+  """Build a mock evaluation result dict for one variant."""
+  return {
+      **_MOCK_EVAL_TEMPLATE,
+      "video_uri": f"gs://{bucket}/{name}",
+      "video_name": name,
+  }
+
+
 class TestEvaluateCompareEndpoint:
   """Tests for POST /api/evaluate_compare."""
 
-  def _mock_eval_result(self, name="test_video.mp4"):
-    """Build a mock evaluation result dict."""
-    return {
-        "brand_name": "TestBrand",
-        "video_uri": f"gs://bucket/{name}",
-        "video_name": name,
-        "abcd": {"score": 75, "result": "Might Improve", "passed": 6, "total": 8, "features": []},
-        "persuasion": {"density": 57, "detected": 4, "total": 7, "features": []},
-        "structure": {"features": []},
-        "shorts": {"features": []},
-        "scenes": [],
-        "concept": {"name": "Test Concept", "description": "A test ad"},
-        "predictions": {"overall_score": 68, "section_scores": {}, "section_maxes": {},
-                        "normalized": {}, "flags": {}, "labels": {}, "drivers": {"top_positive": [], "top_negative": []}},
-        "reference_ads": [],
-        "brand_intelligence": {},
-        "video_metadata": {"duration": "0:30", "aspect_ratio": "16:9"},
-        "emotional_coherence": {"score": 80, "flagged_shifts": []},
-        "audio_analysis": {},
-        "action_plan": [],
-        "feature_timeline": {"video_duration_s": 30, "scene_boundaries": [], "features": []},
-        "accessibility": {"score": 75, "passed": 3, "total": 4, "features": [], "speech_rate_wpm": 150, "speech_rate_flag": "ok"},
-        "platform_fit": {"youtube": {"score": 85, "tips": []}, "meta_feed": {"score": 70, "tips": []},
-                         "meta_reels": {"score": 55, "tips": []}, "tiktok": {"score": 50, "tips": []},
-                         "ctv": {"score": 90, "tips": []}},
-        "benchmarks": {"abcd_percentile": 50, "persuasion_percentile": 50, "performance_percentile": 50,
-                       "sample_size": 0, "vertical": "all", "distribution": {}},
-    }
-
   def test_requires_auth(self, client):
     """Unauthenticated request should be rejected."""
     resp = client.post("/api/evaluate_compare", json={
@@ -82,11 +97,11 @@ class TestEvaluateCompareEndpoint:
     assert resp.status_code == 200
     headers = {"Cookie": f"session_token={resp.cookies.get('session_token')}"}
 
-    # Mock run_evaluation to return predetermined results
-    with mock.patch("web_app.run_evaluation") as mock_eval:
+    # Mock run_evaluation_async to return predetermined results
+    with mock.patch("web_app.run_evaluation_async") as mock_eval:
       mock_eval.side_effect = [
-          self._mock_eval_result("variant_a.mp4"),
-          self._mock_eval_result("variant_b.mp4"),
+          _mock_eval_result("variant_a.mp4"),
+          _mock_eval_result("variant_b.mp4"),
       ]
       resp = client.post(
           "/api/evaluate_compare",
@@ -106,14 +121,221 @@ class TestEvaluateCompareEndpoint:
     assert "recommended_winner" in data["comparison"]
     # Variants stored individually
     assert len(data["variants"]) == 2
+    assert {v["timestamp"] for v in data["variants"]} == {data["timestamp"]}
+
+  def test_all_variants_failing_reports_errors(self, client, create_user):
+    create_user(email="cmpfail@test.com", password="Testpass1",
+                email_verified=True, credits_balance=100000)
+    resp = client.post("/auth/login/email", json={
+        "email": "cmpfail@test.com", "password": "Testpass1",
+    })
+    headers = {"Cookie": f"session_token={resp.cookies.get('session_token')}"}
+
+    with mock.patch(
+        "web_app.run_evaluation_async", side_effect=RuntimeError("boom"),
+    ):
+      resp = client.post(
+          "/api/evaluate_compare",
+          json={"video_uris": ["gs://bucket/a.mp4", "gs://bucket/b.mp4"]},
+          headers=headers,
+      )
+
+    assert resp.status_code == 500
+    assert resp.headers["content-type"] == "application/json"
+    data = resp.json()
+    assert data["error"] == "comparison_failed"
+    assert len(data["errors"]) == 2
+
+  def test_sends_one_slack_notification_per_comparison(self, client, create_user):
+    create_user(email="cmpslack@test.com", password="Testpass1",
+                email_verified=True, credits_balance=100000)
+    resp = client.post("/auth/login/email", json={
+        "email": "cmpslack@test.com", "password": "Testpass1",
+    })
+    headers = {"Cookie": f"session_token={resp.cookies.get('session_token')}"}
+
+    uris = [f"gs://bucket/v{i}.mp4" for i in range(3)]
+    with mock.patch(
+        "web_app.run_evaluation_async",
+        side_effect=lambda uri, *a, **kw: _mock_eval_result(uri.rsplit("/", 1)[-1]),
+    ), mock.patch("web_app._send_slack_notification") as per_variant, \
+        mock.patch("web_app._send_comparison_slack_notification") as notify:
+      resp = client.post(
+          "/api/evaluate_compare", json={"video_uris": uris}, headers=headers,
+      )
+
+    assert resp.status_code == 200
+    per_variant.assert_not_called()
+    notify.assert_called_once()
+    result, url = notify.call_args.args
+    assert result["comparison_id"] == resp.json()["comparison_id"]
+    assert url.endswith(f"/report/compare/{result['comparison_id']}")
+
+  def test_sheds_load_when_compare_capacity_is_full(self, client, create_user):
+    import credits as credits_mod
+    create_user(email="cmpbusy@test.com", password="Testpass1",
+                email_verified=True, credits_balance=100000)
+    resp = client.post("/auth/login/email", json={
+        "email": "cmpbusy@test.com", "password": "Testpass1",
+    })
+    headers = {"Cookie": f"session_token={resp.cookies.get('session_token')}"}
+
+    with mock.patch.object(credits_mod, "MAX_CONCURRENT_COMPARE_VARIANTS", 1), \
+        mock.patch("web_app.run_evaluation_async") as run_eval:
+      resp = client.post(
+          "/api/evaluate_compare",
+          json={"video_uris": ["gs://bucket/a.mp4", "gs://bucket/b.mp4"]},
+          headers=headers,
+      )
+
+    assert resp.status_code == 503
+    assert resp.headers["retry-after"] == "30"
+    assert resp.json()["error"] == "busy"
+    run_eval.assert_not_called()
+    assert credits_mod._compare_variants_in_flight == 0
+
+  def test_compare_runs_evaluations_concurrently(self, client, create_user):
+    """All variants must be in flight at once, not evaluated one by one."""
+    create_user(email="concurrent@test.com", password="Testpass1",
+                email_verified=True, credits_balance=100000)
+    resp = client.post("/auth/login/email", json={
+        "email": "concurrent@test.com", "password": "Testpass1",
+    })
+    headers = {"Cookie": f"session_token={resp.cookies.get('session_token')}"}
+
+    uris = [f"gs://bucket/variant_{i}.mp4" for i in range(3)]
+    # Each call waits until every variant has started; a serial endpoint
+    # would break the barrier on timeout and fail all evaluations.
+    barrier = asyncio.Barrier(len(uris))
+
+    async def _eval(uri, *args, **kwargs):
+      await asyncio.wait_for(barrier.wait(), timeout=5)
+      return _mock_eval_result(uri.rsplit("/", 1)[-1])
+
+    with mock.patch("web_app.run_evaluation_async", side_effect=_eval):
+      resp = client.post(
+          "/api/evaluate_compare", json={"video_uris": uris}, headers=headers,
+      )
+
+    assert resp.status_code == 200
+    assert resp.json()["comparison"]["variant_count"] == 3
+
+  def test_compare_formats_variants_off_the_loop(self, client, create_user):
+    """Each variant's result formatting must overlap, not block the loop in turn."""
+    import scene_detector as sd
+    import web_app
+    create_user(email="cmpformat@test.com", password="Testpass1",
+                email_verified=True, credits_balance=100000)
+    resp = client.post("/auth/login/email", json={
+        "email": "cmpformat@test.com", "password": "Testpass1",
+    })
+    headers = {"Cookie": f"session_token={resp.cookies.get('session_token')}"}
+
+    uris = [f"gs://bucket/format_{i}.mp4" for i in range(3)]
+    # format_results waits until every variant is formatting at once. Run on
+    # the loop, the first call would hold it and the barrier would time out.
+    barrier = threading.Barrier(len(uris), timeout=5)
+
+    def _format(brand_name, uri, *args):
+      barrier.wait()
+      return _mock_eval_result(uri.rsplit("/", 1)[-1])
+
+    with mock.patch.object(web_app, "format_results", side_effect=_format), \
+        mock.patch.object(web_app.generic_helpers, "trim_video"), \
+        mock.patch.object(web_app.generic_helpers, "remove_local_video_files"), \
+        mock.patch.object(web_app, "_bq_log_background"), \
+        mock.patch.object(
+            sd, "extract_metadata_and_scenes", return_value=({"brand_name": "Acme"}, []),
+        ), \
+        mock.patch.object(sd, "download_video_locally", return_value=(None, None)), \
+        mock.patch.object(sd, "generate_brand_intelligence", return_value={}), \
+        mock.patch.object(sd, "generate_creative_brief", return_value={}), \
+        mock.patch.object(
+            web_app.video_evaluation_service.video_evaluation_service,
+            "evaluate_features", return_value=[],
+        ):
+      resp = client.post(
+          "/api/evaluate_compare", json={"video_uris": uris}, headers=headers,
+      )
+
+    assert resp.status_code == 200
+    assert resp.json()["comparison"]["variant_count"] == 3
+
+  def test_evaluate_compare_query_count_is_flat(self, client, create_user, db_engine):
+    """Credit bookkeeping must not issue extra queries per variant."""
+    create_user(email="queries@test.com", password="Testpass1",
+                email_verified=True, credits_balance=100000)
+    resp = client.post("/auth/login/email", json={
+        "email": "queries@test.com", "password": "Testpass1",
+    })
+    headers = {"Cookie": f"session_token={resp.cookies.get('session_token')}"}
+
+    statements = []
+
+    def _count(conn, cursor, statement, *args):
+      statements.append(statement)
+
+    def _compare(n):
+      statements.clear()
+      with mock.patch(
+          "web_app.run_evaluation_async",
+          side_effect=lambda uri, *a, **kw: _mock_eval_result(uri.rsplit("/", 1)[-1]),
+      ):
+        resp = client.post(
+            "/api/evaluate_compare",
+            json={"video_uris": [f"gs://bucket/v{i}.mp4" for i in range(n)]},
+            headers=headers,
+        )
+      assert resp.status_code == 200
+      return resp.json(), len(statements)
+
+    event.listen(db_engine, "before_cursor_execute", _count)
+    try:
+      two, two_count = _compare(2)
+      five, five_count = _compare(5)
+    finally:
+      event.remove(db_engine, "before_cursor_execute", _count)
+
+    assert five_count == two_count
+    # 30s mock videos at 10 tokens/s, charged once per variant
+    assert [v["tokens_used"] for v in two["variants"]] == [300, 300]
+    assert five["variants"][-1]["credits_remaining"] == 100000 - 7 * 300
 
 
 class TestComparisonReportEndpoint:
   """Tests for GET /report/compare/{comparison_id}."""
 
   def test_not_found(self, client):
-    resp = client.get("/report/compare/nonexistent")
+    storage = mock.Mock()
+    blob = storage.bucket.return_value.blob.return_value
+    blob.download_as_bytes.side_effect = type("NotFound", (Exception,), {"code": 404})
+    with mock.patch("web_app._get_storage_client", return_value=storage):
+      resp = client.get("/report/compare/nonexistent")
     assert resp.status_code == 404
+    storage.bucket.return_value.blob.assert_called_once_with(
+        "reports/cmp_nonexistent.json",
+    )
+
+  def test_reloads_evicted_comparison_from_gcs(self, client):
+    """Comparisons persist like reports, so any worker can serve them."""
+    import orjson
+    import web_app
+    storage = mock.Mock()
+    storage.bucket.return_value.blob.return_value.download_as_bytes.return_value = (
+        orjson.dumps({"comparison_id": "gcs00001", "comparison": {}, "variants": []})
+    )
+    try:
+      with mock.patch("web_app._get_storage_client", return_value=storage), \
+          mock.patch(
+              "web_app.report_service.generate_comparison_report_html",
+              return_value="<html>A/B Variant Comparison</html>",
+          ):
+        resp = client.get("/report/compare/gcs00001")
+      assert resp.status_code == 200
+      assert "cmp_gcs00001" in web_app.results_store
+    finally:
+      web_app.results_store.pop("cmp_gcs00001", None)
+      web_app._comparison_html_cache.pop("gcs00001", None)
 
   def test_serves_html_after_comparison(self, client, auth_headers, create_user):
     """After a comparison, the report endpoint should serve HTML."""
@@ -124,30 +346,10 @@ class TestComparisonReportEndpoint:
     })
     headers = {"Cookie": f"session_token={resp.cookies.get('session_token')}"}
 
-    mock_result = {
-        "brand_name": "B", "video_uri": "gs://b/v.mp4", "video_name": "v.mp4",
-        "abcd": {"score": 80, "result": "Excellent", "passed": 8, "total": 8, "features": []},
-        "persuasion": {"density": 50, "detected": 3, "total": 7, "features": []},
-        "structure": {"features": []}, "shorts": {"features": []}, "scenes": [],
-        "concept": {}, "predictions": {"overall_score": 70, "section_scores": {},
-        "section_maxes": {}, "normalized": {}, "flags": {}, "labels": {},
-        "drivers": {"top_positive": [], "top_negative": []}},
-        "reference_ads": [], "brand_intelligence": {},
-        "video_metadata": {"duration": "0:30", "aspect_ratio": "16:9"},
-        "emotional_coherence": {"score": 85, "flagged_shifts": []},
-        "audio_analysis": {}, "action_plan": [],
-        "feature_timeline": {"video_duration_s": 30, "scene_boundaries": [], "features": []},
-        "accessibility": {"score": 80, "passed": 3, "total": 4, "features": [],
-                          "speech_rate_wpm": 140, "speech_rate_flag": "ok"},
-        "platform_fit": {"youtube": {"score": 80, "tips": []}, "meta_feed": {"score": 70, "tips": []},
-                         "meta_reels": {"score": 60, "tips": []}, "tiktok": {"score": 55, "tips": []},
-                         "ctv": {"score": 85, "tips": []}},
-        "benchmarks": {"abcd_percentile": 50, "persuasion_percentile": 50,
-                       "performance_percentile": 50, "sample_size": 0,
-                       "vertical": "all", "distribution": {}},
-    }
-
-    with mock.patch("web_app.run_evaluation", return_value=mock_result):
+    with mock.patch(
+        "web_app.run_evaluation_async",
+        side_effect=lambda *args, **kwargs: _mock_eval_result("v.mp4", bucket="b"),
+    ):
       cmp_resp = client.post(
           "/api/evaluate_compare",
           json={"video_uris": ["gs://b/v1.mp4", "gs://b/v2.mp4"]},
@@ -162,3 +364,28 @@ class TestComparisonReportEndpoint:
     assert rpt_resp.status_code == 200
     assert "text/html" in rpt_resp.headers["content-type"]
     assert "A/B Variant Comparison" in rpt_resp.text
+
+  def test_comparison_report_cached(self, client):
+    """The report is rendered once and then served gzipped from memory."""
+    import web_app
+    web_app.results_store["cmp_cached01"] = {
+        "comparison_id": "cached01",
+        "comparison": {"variant_count": 2},
+        "variants": [],
+    }
+    try:
+      with mock.patch(
+          "web_app.report_service.generate_comparison_report_html",
+          return_value="<html>A/B Variant Comparison</html>",
+      ) as render:
+        first = client.get("/report/compare/cached01")
+        second = client.get(
+            "/report/compare/cached01", headers={"Accept-Encoding": "identity"},
+        )
+      assert render.call_count == 1
+      assert first.headers["content-encoding"] == "gzip"
+      assert "content-encoding" not in second.headers
+      assert first.text == second.text == "<html>A/B Variant Comparison</html>"
+    finally:
+      web_app.results_store.pop("cmp_cached01", None)
+      web_app._comparison_html_cache.pop("cached01", None)
@@ -1,8 +1,23 @@
 """Tests for the auth module: registration, login, password reset, etc."""
 
+import asyncio
 import datetime
 from unittest.mock import patch
 
+import pytest
+
+
+@pytest.fixture()
+def frozen_auth_clock():
+  """Freeze the clock auth uses for rate limits and lockouts.
+
+  Only auth's view of time.time() is replaced, so the attempt loops do
+  no clock reads and can't straddle a window boundary.
+  """
+  with patch("auth.time") as fake_time:
+    fake_time.time.return_value = 1_700_000_000.0
+    yield fake_time
+
 
 # ===== Registration =====
 
@@ -50,33 +65,18 @@ class TestRegister:
 # ===== Password Validation =====
 
 class TestPasswordValidation:
-  def test_too_short(self, client):
-    resp = client.post("/auth/register", json={
-        "email": "pw@example.com", "password": "Ab1",
-    })
-    assert resp.status_code == 400
-    assert "8 characters" in resp.json()["detail"]
-
-  def test_no_letter(self, client):
-    resp = client.post("/auth/register", json={
-        "email": "pw@example.com", "password": "12345678",
-    })
-    assert resp.status_code == 400
-    assert "letter" in resp.json()["detail"]
-
-  def test_no_number(self, client):
-    resp = client.post("/auth/register", json={
-        "email": "pw@example.com", "password": "abcdefgh",
-    })
-    assert resp.status_code == 400
-    assert "number" in resp.json()["detail"]
-
-  def test_blocked_password(self, client):
+  @pytest.mark.parametrize("password, message", [
+      ("Ab1", "8 characters"),
+      ("12345678", "letter"),
+      ("abcdefgh", "number"),
+      ("password1", "too common"),
+  ], ids=["too_short", "no_letter", "no_number", "blocked_password"])
+  def test_invalid_password(self, client, password, message):
     resp = client.post("/auth/register", json={
-        "email": "pw@example.com", "password": "password1",
+        "email": "pw@example.com", "password": password,
     })
     assert resp.status_code == 400
-    assert "too common" in resp.json()["detail"]
+    assert message in resp.json()["detail"]
 
   def test_valid_password(self, client):
     resp = client.post("/auth/register", json={
@@ -163,44 +163,40 @@ class TestLogout:
 # ===== Email Verification =====
 
 class TestVerifyEmail:
-  def test_verify_valid_token(self, client):
+  def test_verify_valid_token(self, client, db_session):
     # Register to get a user with a verification token
     client.post("/auth/register", json={
         "email": "verify@example.com", "password": "Goodpass1",
     })
-    # Dig out the token from the DB
-    from sqlalchemy.orm import sessionmaker
-    from db import engine, User
-    Session = sessionmaker(bind=engine)
-    # We need to get the token from the test DB, but the client uses overridden DB.
-    # Instead, test via the /me response — email_verified should be False
     me = client.get("/auth/me")
     assert me.json()["user"]["email_verified"] is False
 
+    # Dig out the token from the test DB
+    from db import User
+    user = db_session.query(User).filter(
+        User.email_normalized == "verify@example.com",
+    ).first()
+    resp = client.get(
+        "/auth/verify-email", params={"token": user.verification_token},
+    )
+    assert "email_verified=true" in str(resp.url)
+    me = client.get("/auth/me")
+    assert me.json()["user"]["email_verified"] is True
+
   def test_verify_invalid_token(self, client):
     resp = client.get("/auth/verify-email", params={"token": "bogus-token"})
     assert resp.status_code == 200  # redirect
     assert "invalid_verification_token" in resp.headers.get("location", resp.url.path + "?" + str(resp.url.query))
 
-  def test_verify_expired_token(self, client, db_engine):
+  def test_verify_expired_token(self, client, insert_user_row):
     """Verify that an expired token is rejected."""
-    from sqlalchemy.orm import sessionmaker
-    from db import User
-    import bcrypt as _bcrypt
-
-    Session = sessionmaker(bind=db_engine)
-    session = Session()
-    user = User(
+    insert_user_row(
         email="expired@example.com",
-        password_hash=_bcrypt.hashpw(b"Goodpass1", _bcrypt.gensalt()).decode(),
+        password="Goodpass1",
         email_verified=False,
         verification_token="expired-tok",
         token_expires_at=datetime.datetime.utcnow() - datetime.timedelta(hours=1),
-        credits_balance=1000,
     )
-    session.add(user)
-    session.commit()
-    session.close()
 
     resp = client.get("/auth/verify-email", params={"token": "expired-tok"})
     assert "token_expired" in str(resp.url)
@@ -232,7 +228,7 @@ class TestForgotPassword:
 
 
 class TestResetPassword:
-  def test_reset_password_full_flow(self, client, db_engine):
+  def test_reset_password_full_flow(self, client, db_session):
     """Register → forgot → extract token → reset → login with new password."""
     # Register
     client.post("/auth/register", json={
@@ -246,13 +242,9 @@ class TestResetPassword:
     })
 
     # Extract reset token from DB
-    from sqlalchemy.orm import sessionmaker
     from db import User
-    Session = sessionmaker(bind=db_engine)
-    session = Session()
-    user = session.query(User).filter(User.email == "reset@example.com").first()
+    user = db_session.query(User).filter(User.email == "reset@example.com").first()
     reset_token = user.reset_token
-    session.close()
     assert reset_token is not None
 
     # Reset
@@ -280,24 +272,14 @@ class TestResetPassword:
     })
     assert resp.status_code == 400
 
-  def test_reset_expired_token(self, client, db_engine):
-    from sqlalchemy.orm import sessionmaker
-    from db import User
-    import bcrypt as _bcrypt
-
-    Session = sessionmaker(bind=db_engine)
-    session = Session()
-    user = User(
+  def test_reset_expired_token(self, client, insert_user_row):
+    insert_user_row(
         email="expiredreset@example.com",
-        password_hash=_bcrypt.hashpw(b"Oldpass1", _bcrypt.gensalt()).decode(),
+        password="Oldpass1",
         email_verified=True,
         reset_token="expired-reset-tok",
         token_expires_at=datetime.datetime.utcnow() - datetime.timedelta(hours=2),
-        credits_balance=1000,
     )
-    session.add(user)
-    session.commit()
-    session.close()
 
     resp = client.post("/auth/reset-password", json={
         "token": "expired-reset-tok", "password": "Newpass1!",
@@ -305,24 +287,14 @@ class TestResetPassword:
     assert resp.status_code == 400
     assert "expired" in resp.json()["detail"].lower()
 
-  def test_reset_weak_password(self, client, db_engine):
-    from sqlalchemy.orm import sessionmaker
-    from db import User
-    import bcrypt as _bcrypt
-
-    Session = sessionmaker(bind=db_engine)
-    session = Session()
-    user = User(
+  def test_reset_weak_password(self, client, insert_user_row):
+    insert_user_row(
         email="weakreset@example.com",
-        password_hash=_bcrypt.hashpw(b"Oldpass1", _bcrypt.gensalt()).decode(),
+        password="Oldpass1",
         email_verified=True,
         reset_token="valid-tok",
         token_expires_at=datetime.datetime.utcnow() + datetime.timedelta(hours=1),
-        credits_balance=1000,
     )
-    session.add(user)
-    session.commit()
-    session.close()
 
     resp = client.post("/auth/reset-password", json={
         "token": "valid-tok", "password": "short",
@@ -333,67 +305,75 @@ class TestResetPassword:
 # ===== Rate Limiting =====
 
 class TestRateLimit:
-  def test_rate_limit_kicks_in(self, client):
+  @pytest.mark.anyio
+  async def test_rate_limit_kicks_in(self, async_client, frozen_auth_clock):
     """After 10 attempts in 5 minutes, should get 429."""
-    for i in range(10):
-      client.post("/auth/login/email", json={
-          "email": f"spam{i}@example.com", "password": "x",
+    async with async_client as c:
+      await asyncio.gather(*(
+          c.post("/auth/login/email", json={
+              "email": f"spam{i}@example.com", "password": "x",
+          })
+          for i in range(10)
+      ))
+      resp = await c.post("/auth/login/email", json={
+          "email": "spam@example.com", "password": "x",
       })
-    resp = client.post("/auth/login/email", json={
-        "email": "spam@example.com", "password": "x",
-    })
     assert resp.status_code == 429
 
+  def test_window_resets_after_expiry(self, client):
+    from auth import _rate_incr, _rate_limit_window
+    assert [_rate_incr("1.2.3.4", 1000.0) for _ in range(3)] == [1, 2, 3]
+    assert _rate_incr("1.2.3.4", 1000.0 + _rate_limit_window - 1) == 4
+    assert _rate_incr("1.2.3.4", 1000.0 + _rate_limit_window) == 1
+
 
 # ===== CSRF Protection =====
 
 class TestCSRFProtection:
-  def test_register_rejects_form_encoded(self, client):
-    """POST with form-encoded body should be rejected (CSRF protection)."""
-    resp = client.post(
-        "/auth/register",
-        data={"email": "csrf@example.com", "password": "Goodpass1"},
-    )
-    assert resp.status_code == 415
-
-  def test_login_rejects_no_content_type(self, client):
-    resp = client.post(
-        "/auth/login/email",
-        content='{"email": "x@x.com", "password": "Goodpass1"}',
-    )
+  @pytest.mark.parametrize("path, kwargs", [
+      ("/auth/register", {"data": {"email": "csrf@example.com", "password": "Goodpass1"}}),
+      ("/auth/login/email", {"content": '{"email": "x@x.com", "password": "Goodpass1"}'}),
+      ("/auth/forgot-password", {"data": {"email": "csrf@example.com"}}),
+      ("/auth/reset-password", {"data": {"token": "x", "password": "Goodpass1"}}),
+  ], ids=["register_form", "login_no_content_type", "forgot_form", "reset_form"])
+  def test_rejects_non_json_body(self, client, path, kwargs):
+    """POST without a JSON content type should be rejected (CSRF protection)."""
+    resp = client.post(path, **kwargs)
     assert resp.status_code == 415
 
-  def test_forgot_rejects_form_encoded(self, client):
+  @pytest.mark.parametrize("content_type, expected", [
+      ("application/json", 200),
+      ("Application/JSON; charset=utf-8", 200),
+      ("text/plain; note=application/json", 415),
+  ], ids=["json", "json_charset", "json_in_parameter"])
+  def test_matches_media_type_only(self, client, content_type, expected):
     resp = client.post(
-        "/auth/forgot-password",
-        data={"email": "csrf@example.com"},
+        "/auth/forgot-password", content="{}",
+        headers={"Content-Type": content_type},
     )
-    assert resp.status_code == 415
-
-  def test_reset_rejects_form_encoded(self, client):
-    resp = client.post(
-        "/auth/reset-password",
-        data={"token": "x", "password": "Goodpass1"},
-    )
-    assert resp.status_code == 415
+    assert resp.status_code == expected
 
 
 # ===== Account Lockout =====
 
 class TestAccountLockout:
-  def test_lockout_after_5_failures(self, client):
+  @pytest.mark.anyio
+  async def test_lockout_after_5_failures(self, async_client, frozen_auth_clock):
     """After 5 wrong passwords, the account should be locked."""
-    client.post("/auth/register", json={
-        "email": "lockme@example.com", "password": "Goodpass1",
-    })
-    for _ in range(5):
-      client.post("/auth/login/email", json={
-          "email": "lockme@example.com", "password": "WrongPass1",
+    async with async_client as c:
+      await c.post("/auth/register", json={
+          "email": "lockme@example.com", "password": "Goodpass1",
+      })
+      await asyncio.gather(*(
+          c.post("/auth/login/email", json={
+              "email": "lockme@example.com", "password": "WrongPass1",
+          })
+          for _ in range(5)
+      ))
+      # 6th attempt — should be locked
+      resp = await c.post("/auth/login/email", json={
+          "email": "lockme@example.com", "password": "Goodpass1",
       })
-    # 6th attempt — should be locked
-    resp = client.post("/auth/login/email", json={
-        "email": "lockme@example.com", "password": "Goodpass1",
-    })
     assert resp.status_code == 429
     assert "locked" in resp.json()["detail"].lower()
 
@@ -437,6 +417,29 @@ class TestSecurityHeaders:
     assert resp.headers["Referrer-Policy"] == "strict-origin-when-cross-origin"
     assert "camera=()" in resp.headers["Permissions-Policy"]
 
+  def test_security_headers_not_duplicated(self, client):
+    resp = client.get("/health")
+    for name in ("X-Content-Type-Options", "X-Frame-Options", "Referrer-Policy"):
+      assert len(resp.headers.get_list(name)) == 1
+
+  @pytest.mark.parametrize("production, has_hsts", [(True, True), (False, False)])
+  def test_hsts_only_in_production(self, production, has_hsts):
+    import web_app
+
+    async def _app(scope, receive, send):
+      await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    sent = []
+
+    async def _send(message):
+      sent.append(message)
+
+    middleware = web_app.SecurityHeadersMiddleware(_app, production=production)
+    asyncio.run(middleware({"type": "http"}, None, _send))
+    names = {name for name, _ in sent[0]["headers"]}
+    assert (b"strict-transport-security" in names) is has_hsts
+    assert b"x-frame-options" in names
+
 
 # ===== Reset Password Page =====
 
@@ -445,3 +448,54 @@ class TestResetPasswordPage:
     resp = client.get("/reset-password")
     assert resp.status_code == 200
     assert "Reset Password" in resp.text
+
+
+# ===== Lookup Indexes =====
+
+class TestUserLookupIndexes:
+  @pytest.mark.parametrize("where, index", [
+      ("email_normalized = :v", "ix_users_email_normalized"),
+      ("reset_token = :v", "ix_users_reset_token"),
+      ("verification_token = :v", "ix_users_verification_token"),
+  ], ids=["email", "reset_token", "verification_token"])
+  def test_lookup_uses_index(self, db_engine, where, index):
+    from sqlalchemy import text
+    with db_engine.connect() as conn:
+      plan = conn.execute(
+          text(f"EXPLAIN QUERY PLAN SELECT id FROM users WHERE {where}"),
+          {"v": "x"},
+      ).fetchall()
+    detail = " ".join(row[-1] for row in plan)
+    assert f"USING INDEX {index}" in detail
+
+
+# ===== Google OAuth callback =====
+
+class TestGoogleCallback:
+  def _callback(self, client, email, sub="gsub-1"):
+    id_info = {
+        "iss": "accounts.google.com", "email_verified": True,
+        "email": email, "sub": sub,
+    }
+    with patch("auth.requests.post") as post, \
+        patch("auth.google_id_token.verify_oauth2_token", return_value=id_info), \
+        patch("auth.notification_service.notify_new_signup"), \
+        patch("auth._get_billing"):
+      post.return_value.status_code = 200
+      post.return_value.json.return_value = {"id_token": "tok"}
+      return client.get("/auth/callback?code=abc", follow_redirects=False)
+
+  def test_new_user_keeps_display_casing(self, client, db_session):
+    from db import User
+    resp = self._callback(client, "Mixed.Case@Example.com")
+    assert resp.status_code == 302
+    user = db_session.query(User).filter_by(google_sub="gsub-1").one()
+    assert user.email == "Mixed.Case@Example.com"
+    assert user.email_normalized == "mixed.case@example.com"
+
+  def test_links_existing_account_case_insensitively(self, client, create_user, db_session):
+    user = create_user(email="linked@example.com")
+    self._callback(client, "Linked@Example.com", sub="gsub-2")
+    db_session.refresh(user)
+    assert user.google_sub == "gsub-2"
+    assert user.email == "linked@example.com"
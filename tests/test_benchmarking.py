@@ -5,6 +5,8 @@ import pytest
 from unittest import mock
 from pathlib import Path
 
+import numpy as np
+
 import benchmarking
 
 
@@ -12,13 +14,13 @@ class TestPercentileRank:
   def test_empty_list_returns_50(self):
     assert benchmarking._percentile_rank([], 50) == 50.0
 
-  def test_value_at_bottom(self):
-    vals = [10, 20, 30, 40, 50]
-    assert benchmarking._percentile_rank(vals, 5) == 0.0
-
-  def test_value_at_top(self):
+  @pytest.mark.parametrize("value, expected", [
+      (5, 0.0),
+      (60, 100.0),
+  ], ids=["bottom", "top"])
+  def test_value_at_extremes(self, value, expected):
     vals = [10, 20, 30, 40, 50]
-    assert benchmarking._percentile_rank(vals, 60) == 100.0
+    assert benchmarking._percentile_rank(vals, value) == expected
 
   def test_value_in_middle(self):
     vals = [10, 20, 30, 40, 50]
@@ -30,6 +32,15 @@ class TestPercentileRank:
     result = benchmarking._percentile_rank(vals, 50)
     assert 0 <= result <= 100
 
+  def test_accepts_ndarray(self):
+    vals = [10, 20, 30, 40, 50]
+    assert benchmarking._percentile_rank(np.arange(10, 60, 10), 30) == (
+        benchmarking._percentile_rank(vals, 30)
+    )
+
+  def test_empty_ndarray_returns_50(self):
+    assert benchmarking._percentile_rank(np.array([]), 50) == 50.0
+
 
 class TestDistributionStats:
   def test_empty_returns_empty(self):
@@ -52,6 +63,19 @@ class TestDistributionStats:
     assert result["p50"] == 50.0
     assert result["mean"] == 50.0
 
+  def test_picks_lower_sample(self):
+    result = benchmarking._distribution_stats([1, 2, 3, 4])
+    assert result["p10"] == 1.0
+    assert result["p50"] == 2.0
+    assert result["p90"] == 3.0
+    assert result["mean"] == 2.5
+
+  def test_ndarray_matches_list(self):
+    vals = [5.0, 12.5, 40.0, 77.0, 91.0, 33.0]
+    assert benchmarking._distribution_stats(np.array(vals)) == (
+        benchmarking._distribution_stats(vals)
+    )
+
 
 class TestComputeBenchmarks:
   def test_no_history(self):
@@ -85,17 +109,79 @@ class TestComputeBenchmarks:
     # Within ecommerce subset (all 30), 80 should be 100th percentile
     assert result["abcd_percentile"] == 100.0
 
+  def test_compute_benchmarks_is_cached(self):
+    history = [
+        {"abcd_score": s, "persuasion_density": s, "performance_score": s, "vertical": ""}
+        for s in range(10, 100, 10)
+    ]
+    with mock.patch.object(benchmarking, "_load_history", return_value=history), \
+        mock.patch.object(
+            benchmarking, "_distribution_stats",
+            wraps=benchmarking._distribution_stats,
+        ) as stats:
+      first = benchmarking.compute_benchmarks(50, 50, 50)
+      second = benchmarking.compute_benchmarks(70, 50, 50)
+    # One _distribution_stats call per score type, only on the first call
+    assert stats.call_count == 3
+    assert second["distribution"] == first["distribution"]
+    assert second["abcd_percentile"] > first["abcd_percentile"]
+
+  def test_cache_follows_new_history(self):
+    low = [{"abcd_score": 10, "vertical": ""}] * 10
+    high = [{"abcd_score": 90, "vertical": ""}] * 10
+    with mock.patch.object(benchmarking, "_load_history", return_value=low):
+      assert benchmarking.compute_benchmarks(50, 0, 0)["abcd_percentile"] == 100.0
+    with mock.patch.object(benchmarking, "_load_history", return_value=high):
+      assert benchmarking.compute_benchmarks(50, 0, 0)["abcd_percentile"] == 0.0
+
 
 class TestLogEvaluation:
-  def test_log_appends_entry(self, tmp_path):
-    hist_file = tmp_path / "benchmark_history.json"
-    hist_file.write_text("[]")
-    with mock.patch.object(benchmarking, "HISTORY_FILE", hist_file):
+  @pytest.fixture(autouse=True)
+  def _history_file(self, tmp_path):
+    hist_file = tmp_path / "benchmark_history.jsonl"
+    with mock.patch.object(benchmarking, "HISTORY_FILE", hist_file), \
+        mock.patch.object(
+            benchmarking, "LEGACY_HISTORY_FILE",
+            tmp_path / "benchmark_history.json",
+        ):
       # Reset cache
       benchmarking._cache = None
       benchmarking._cache_ts = 0.0
-      benchmarking.log_evaluation("rpt-1", 85, 60, 72)
-    data = json.loads(hist_file.read_text())
-    assert len(data) == 1
-    assert data[0]["report_id"] == "rpt-1"
-    assert data[0]["abcd_score"] == 85
+      yield hist_file
+    benchmarking._cache = None
+    benchmarking._cache_ts = 0.0
+
+  def test_log_appends_entry(self, _history_file):
+    benchmarking.log_evaluation("rpt-1", 85, 60, 72)
+    lines = _history_file.read_text().splitlines()
+    assert len(lines) == 1
+    data = json.loads(lines[0])
+    assert data["report_id"] == "rpt-1"
+    assert data["abcd_score"] == 85
+
+  def test_appends_are_visible_to_load(self, _history_file):
+    benchmarking.log_evaluation("rpt-1", 85, 60, 72)
+    benchmarking.log_evaluation("rpt-2", 40, 30, 20)
+    assert len(_history_file.read_text().splitlines()) == 2
+    assert [h["report_id"] for h in benchmarking._load_history()] == ["rpt-1", "rpt-2"]
+    # Fresh read from disk agrees with the in-memory cache
+    benchmarking._cache = None
+    assert [h["report_id"] for h in benchmarking._load_history()] == ["rpt-1", "rpt-2"]
+
+  def test_migrates_legacy_json_history(self, _history_file, tmp_path):
+    legacy = tmp_path / "benchmark_history.json"
+    legacy.write_text(json.dumps([{"report_id": "old", "abcd_score": 10}]))
+    benchmarking.log_evaluation("rpt-1", 85, 60, 72)
+    ids = [json.loads(l)["report_id"] for l in _history_file.read_text().splitlines()]
+    assert ids == ["old", "rpt-1"]
+
+  def test_append_updates_cache_in_place(self, _history_file):
+    benchmarking.log_evaluation("rpt-1", 10, 10, 10)
+    history = benchmarking._load_history()
+    before = benchmarking.compute_benchmarks(50, 50, 50)
+    benchmarking.log_evaluation("rpt-2", 90, 90, 90)
+    assert benchmarking._load_history() is history
+    assert len(history) == 2
+    after = benchmarking.compute_benchmarks(50, 50, 50)
+    assert before["sample_size"] == 1
+    assert after["sample_size"] == 2
@@ -1,7 +1,8 @@
 """Tests for calibration module."""
 
+import numpy as np
 import pytest
-from calibration import calibrate_confidence
+from calibration import calibrate_batch, calibrate_confidence
 
 
 class TestCalibrateConfidence:
@@ -31,3 +32,19 @@ class TestCalibrateConfidence:
   def test_accuracy_none_returns_raw(self):
     cal = {"feat_1": {"accuracy": None, "sample_size": 0, "reliability_level": "unknown"}}
     assert calibrate_confidence(0.75, "feat_1", cal) == 0.75
+
+
+class TestCalibrateBatch:
+  def test_calibrate_batch_matches_scalar(self):
+    raws = np.linspace(0.0, 1.0, 201)
+    accs = np.resize(np.linspace(0.0, 1.0, 37), raws.shape)
+    accs[::10] = np.nan  # No calibration data for these features
+    batch = calibrate_batch(raws, accs)
+    for i, (raw, acc) in enumerate(zip(raws.tolist(), accs.tolist())):
+      cal = {} if np.isnan(acc) else {"f": {"accuracy": acc}}
+      # np.round and round can settle a tie one 0.001 step apart, never more
+      assert abs(batch[i] - calibrate_confidence(raw, "f", cal)) < 0.0015
+
+  def test_clamps_out_of_range(self):
+    result = calibrate_batch([1.5, -0.5], [1.0, 0.0])
+    assert result.tolist() == [1.0, 0.0]
@@ -5,56 +5,47 @@ import models
 from configuration import Configuration
 
 
-class TestSetParameters:
-    def test_gcs_provider_from_string(self):
-        config = Configuration()
-        config.set_parameters(
-            project_id="p", project_zone="z", bucket_name="b",
-            knowledge_graph_api_key="k", bigquery_dataset="d",
-            bigquery_table="t", assessment_file="",
-            extract_brand_metadata=True, use_annotations=False,
-            use_llms=True, run_long_form_abcd=True, run_shorts=False,
-            run_creative_intelligence=True, features_to_evaluate=[],
-            creative_provider_type="GCS", verbose=False,
-        )
-        assert config.creative_provider_type == models.CreativeProviderType.GCS
+# Baseline set_parameters() kwargs; each test overrides only what it checks.
+_BASE_PARAMS = dict(
+    project_id="p", project_zone="z", bucket_name="b",
+    knowledge_graph_api_key="k", bigquery_dataset="d",
+    bigquery_table="t", assessment_file="",
+    extract_brand_metadata=True, use_annotations=False,
+    use_llms=True, run_long_form_abcd=True, run_shorts=False,
+    run_creative_intelligence=True, features_to_evaluate=[],
+    creative_provider_type="GCS", verbose=False,
+)
 
-    def test_youtube_provider_from_string(self):
-        config = Configuration()
-        config.set_parameters(
-            project_id="p", project_zone="z", bucket_name="b",
-            knowledge_graph_api_key="k", bigquery_dataset="d",
-            bigquery_table="t", assessment_file="",
-            extract_brand_metadata=True, use_annotations=False,
-            use_llms=True, run_long_form_abcd=True, run_shorts=False,
-            run_creative_intelligence=True, features_to_evaluate=[],
-            creative_provider_type="YOUTUBE", verbose=False,
-        )
-        assert config.creative_provider_type == models.CreativeProviderType.YOUTUBE
 
-    def test_api_key_stripped(self):
+@pytest.fixture()
+def make_config():
+    """Build a Configuration from _BASE_PARAMS plus per-test overrides."""
+    def _make(**overrides):
         config = Configuration()
-        config.set_parameters(
-            project_id="p", project_zone="z", bucket_name="b",
-            knowledge_graph_api_key="  key_with_spaces  ",
-            bigquery_dataset="", bigquery_table="", assessment_file="",
-            extract_brand_metadata=False, use_annotations=False,
-            use_llms=True, run_long_form_abcd=True, run_shorts=False,
-            run_creative_intelligence=False, features_to_evaluate=[],
-            creative_provider_type="GCS", verbose=False,
-        )
+        config.set_parameters(**{**_BASE_PARAMS, **overrides})
+        return config
+    return _make
+
+
+class TestSetParameters:
+    @pytest.mark.parametrize("provider, expected", [
+        ("GCS", models.CreativeProviderType.GCS),
+        ("YOUTUBE", models.CreativeProviderType.YOUTUBE),
+        ("gcs", models.CreativeProviderType.GCS),
+        ("YouTube", models.CreativeProviderType.YOUTUBE),
+        (models.CreativeProviderType.YOUTUBE, models.CreativeProviderType.YOUTUBE),
+        ("VIMEO", models.CreativeProviderType.GCS),
+    ], ids=["gcs", "youtube", "lowercase", "mixed_case", "enum_member", "unknown_keeps_default"])
+    def test_provider_type(self, make_config, provider, expected):
+        config = make_config(creative_provider_type=provider)
+        assert config.creative_provider_type == expected
+
+    def test_api_key_stripped(self, make_config):
+        config = make_config(knowledge_graph_api_key="  key_with_spaces  ")
         assert config.knowledge_graph_api_key == "key_with_spaces"
 
-    def test_zone_defaults_to_us_central(self):
-        config = Configuration()
-        config.set_parameters(
-            project_id="p", project_zone=None, bucket_name="b",
-            knowledge_graph_api_key="", bigquery_dataset="", bigquery_table="",
-            assessment_file="", extract_brand_metadata=False,
-            use_annotations=False, use_llms=True, run_long_form_abcd=True,
-            run_shorts=False, run_creative_intelligence=False,
-            features_to_evaluate=[], creative_provider_type="GCS", verbose=False,
-        )
+    def test_zone_defaults_to_us_central(self, make_config):
+        config = make_config(project_zone=None)
         assert config.project_zone == "us-central1"
 
 
@@ -68,7 +59,12 @@ class TestSetVideos:
         config = Configuration()
         config.set_videos("gs://a/1.mp4, gs://a/2.mp4")
         assert len(config.video_uris) == 2
-        assert config.video_uris[0].strip() == "gs://a/1.mp4"
+        assert config.video_uris == ["gs://a/1.mp4", "gs://a/2.mp4"]
+
+    def test_list_items_trimmed(self):
+        config = Configuration()
+        config.set_videos([" gs://a/1.mp4 ", "", "gs://a/2.mp4"])
+        assert config.video_uris == ["gs://a/1.mp4", "gs://a/2.mp4"]
 
     def test_single_string(self):
         config = Configuration()
@@ -97,6 +93,12 @@ class TestSetBrandDetails:
         assert config.brand_variations == []
         assert config.branded_products == []
 
+    def test_trims_and_drops_empty_items(self):
+        config = Configuration()
+        config.set_brand_details("Brand", " Acme ,ACME,, acme , ", "Widget", "", "")
+        assert config.brand_variations == ["Acme", "ACME", "acme"]
+        assert config.branded_products == ["Widget"]
+
 
 class TestSetLLMParams:
     def test_sets_model_and_generation_config(self):
@@ -1,5 +1,7 @@
 """Tests for credits.py — token math, job slots, upload validation."""
 
+from types import SimpleNamespace
+
 import pytest
 import credits as credits_mod
 from db import User
@@ -39,15 +41,34 @@ class TestJobSlots:
     def test_release_nonexistent_noop(self):
         credits_mod.release_job_slot("ghost")  # should not raise
 
+    def test_concurrent_acquire_grants_one_slot(self):
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(credits_mod.acquire_job_slot, ["user1"] * 32))
+        assert results.count(True) == 1
+
+
+class TestCompareSlots:
+    def setup_method(self):
+        credits_mod._compare_variants_in_flight = 0
+
+    def test_reserve_up_to_cap(self, monkeypatch):
+        monkeypatch.setattr(credits_mod, "MAX_CONCURRENT_COMPARE_VARIANTS", 5)
+        assert credits_mod.reserve_compare_slots(3) is True
+        assert credits_mod.reserve_compare_slots(3) is False  # all-or-nothing
+        assert credits_mod.reserve_compare_slots(2) is True
+        credits_mod.release_compare_slots(3)
+        assert credits_mod.reserve_compare_slots(3) is True
+
+    def test_release_never_goes_negative(self):
+        credits_mod.release_compare_slots(4)
+        assert credits_mod._compare_variants_in_flight == 0
+
 
 class TestValidateUpload:
     def _user(self, balance=1000):
         """Create a lightweight User-like object for validation tests."""
-        class FakeUser:
-            pass
-        u = FakeUser()
-        u.credits_balance = balance
-        return u
+        return SimpleNamespace(credits_balance=balance)
 
     def test_valid_upload(self):
         err = credits_mod.validate_upload(10 * 1024 * 1024, 30, self._user())
@@ -67,7 +88,13 @@ class TestValidateUpload:
         err = credits_mod.validate_upload(10 * 1024 * 1024, 30, self._user(balance=5))
         assert err is not None
         assert err["error"] == "insufficient_credits"
-        assert "offers" in err
+        assert [o["pack"] for o in err["offers"]] == list(credits_mod.TOKEN_PACKS)
+        assert "stripe_price_id" not in err["offers"][0]
+
+    def test_missing_balance_treated_as_zero(self):
+        err = credits_mod.validate_upload(10 * 1024 * 1024, 30, SimpleNamespace())
+        assert err["error"] == "insufficient_credits"
+        assert err["credits_balance"] == 0
 
 
 class TestTokenModelInfo:
@@ -77,3 +104,8 @@ class TestTokenModelInfo:
         assert "max_video_seconds" in info
         assert "max_tokens_per_video" in info
         assert info["max_tokens_per_video"] == info["tokens_per_second"] * info["max_video_seconds"]
+
+    def test_is_read_only(self):
+        info = credits_mod.token_model_info()
+        with pytest.raises(TypeError):
+            info["tokens_per_second"] = 0
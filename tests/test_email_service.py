@@ -1,58 +1,61 @@
 """Tests for the email_service module."""
 
-import os
-import sys
 from unittest.mock import patch, MagicMock
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import pytest
 
 import email_service
 
 
+@pytest.fixture
+def smtp_unconfigured(monkeypatch):
+  """Clear SMTP settings for one test; monkeypatch restores them."""
+  monkeypatch.setattr(email_service, "SMTP_HOST", "")
+  monkeypatch.setattr(email_service, "SMTP_USER", "")
+  monkeypatch.setattr(email_service, "SMTP_PASSWORD", "")
+
+
+@pytest.fixture
+def smtp_configured(monkeypatch):
+  """Set SMTP settings for one test; monkeypatch restores them."""
+  monkeypatch.setattr(email_service, "SMTP_HOST", "smtp.test.com")
+  monkeypatch.setattr(email_service, "SMTP_USER", "user")
+  monkeypatch.setattr(email_service, "SMTP_PASSWORD", "pass")
+
+
 class TestIsConfigured:
-  def test_not_configured_by_default(self):
-    with patch.dict(os.environ, {"SMTP_HOST": "", "SMTP_USER": "", "SMTP_PASSWORD": ""}, clear=False):
-      # Force re-read
-      email_service.SMTP_HOST = ""
-      email_service.SMTP_USER = ""
-      email_service.SMTP_PASSWORD = ""
-      assert email_service.is_configured() is False
-
-  def test_configured_when_all_set(self):
-    email_service.SMTP_HOST = "smtp.test.com"
-    email_service.SMTP_USER = "user"
-    email_service.SMTP_PASSWORD = "pass"
+  def test_not_configured_by_default(self, smtp_unconfigured):
+    assert email_service.is_configured() is False
+
+  def test_configured_when_all_set(self, smtp_configured):
     assert email_service.is_configured() is True
-    # Reset
-    email_service.SMTP_HOST = ""
-    email_service.SMTP_USER = ""
-    email_service.SMTP_PASSWORD = ""
 
+  def test_partial_config_is_not_configured(self, smtp_configured, monkeypatch):
+    monkeypatch.setattr(email_service, "SMTP_PASSWORD", "")
+    assert email_service.is_configured() is False
 
+
+@pytest.mark.usefixtures("smtp_unconfigured")
 class TestSendFallback:
   def test_send_returns_false_when_not_configured(self):
-    email_service.SMTP_HOST = ""
-    result = email_service._send("to@example.com", "Subject", "<p>body</p>")
+    with patch("smtplib.SMTP") as mock_smtp:
+      result = email_service._send("to@example.com", "Subject", "<p>body</p>")
     assert result is False
+    mock_smtp.assert_not_called()
 
   def test_verification_email_logs_url_when_not_configured(self):
-    email_service.SMTP_HOST = ""
     result = email_service.send_verification_email("to@test.com", "https://example.com/verify?token=abc")
     assert result is False
 
   def test_reset_email_logs_url_when_not_configured(self):
-    email_service.SMTP_HOST = ""
     result = email_service.send_password_reset_email("to@test.com", "https://example.com/reset?token=abc")
     assert result is False
 
 
+@pytest.mark.usefixtures("smtp_configured")
 class TestSendWithSMTP:
   def test_send_success(self):
-    email_service.SMTP_HOST = "smtp.test.com"
-    email_service.SMTP_USER = "user"
-    email_service.SMTP_PASSWORD = "pass"
-
-    with patch("email_service.smtplib.SMTP") as mock_smtp:
+    with patch("smtplib.SMTP") as mock_smtp:
       instance = MagicMock()
       mock_smtp.return_value.__enter__ = MagicMock(return_value=instance)
       mock_smtp.return_value.__exit__ = MagicMock(return_value=False)
@@ -60,22 +63,8 @@ class TestSendWithSMTP:
       result = email_service._send("to@example.com", "Test", "<p>hi</p>")
       assert result is True
 
-    # Reset
-    email_service.SMTP_HOST = ""
-    email_service.SMTP_USER = ""
-    email_service.SMTP_PASSWORD = ""
-
   def test_send_handles_smtp_error(self):
-    email_service.SMTP_HOST = "smtp.test.com"
-    email_service.SMTP_USER = "user"
-    email_service.SMTP_PASSWORD = "pass"
-
-    with patch("email_service.smtplib.SMTP") as mock_smtp:
+    with patch("smtplib.SMTP") as mock_smtp:
       mock_smtp.side_effect = Exception("Connection refused")
       result = email_service._send("to@example.com", "Test", "<p>hi</p>")
       assert result is False
-
-    # Reset
-    email_service.SMTP_HOST = ""
-    email_service.SMTP_USER = ""
-    email_service.SMTP_PASSWORD = ""
@@ -1,15 +1,20 @@
 """Tests for gcp_api_services/gemini_api_service.py."""
 
+from unittest import mock
+
 import pytest
+from gcp_api_services import gemini_api_service
 from gcp_api_services.gemini_api_service import GeminiAPIService
 
+YOUTUBE_WATCH_URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
 
 class TestResolveMimeType:
     """_resolve_video_mime_type must produce valid MIME types for all URI shapes."""
 
     # YouTube URLs
     @pytest.mark.parametrize("url", [
-        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        YOUTUBE_WATCH_URL,
         "https://youtube.com/watch?v=dQw4w9WgXcQ",
         "https://m.youtube.com/watch?v=abc123",
         "https://www.youtube.com/embed/abc123",
@@ -53,12 +58,41 @@ class TestResolveMimeType:
         uri = "gs://bucket/video.flv"
         assert GeminiAPIService._resolve_video_mime_type(uri) == "video/flv"
 
+    def test_dot_in_bucket_only(self):
+        uri = "gs://my.bucket/videos/clip"
+        assert GeminiAPIService._resolve_video_mime_type(uri) == "video/mp4"
+
+    def test_local_path(self):
+        assert GeminiAPIService._resolve_video_mime_type("/tmp/upload.mov") == "video/quicktime"
+
+    def test_lookalike_host_is_not_youtube(self):
+        uri = "https://notyoutube.com/media/clip.webm"
+        assert GeminiAPIService._resolve_video_mime_type(uri) == "video/webm"
+
     # Regression: the old code produced invalid MIME for YouTube URLs
     def test_old_behavior_was_broken(self):
-        url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+        url = YOUTUBE_WATCH_URL
         old_mime = f"video/{url.rsplit('.', 1)[-1]}"
         # Old result contained slashes in the type → invalid
         assert "/" in old_mime.split("video/", 1)[1]
         # New result is clean
         new_mime = GeminiAPIService._resolve_video_mime_type(url)
         assert "/" not in new_mime.split("video/", 1)[1]
+
+
+class TestGenaiClient:
+    @pytest.fixture(autouse=True)
+    def _fresh_cache(self):
+        gemini_api_service.get_genai_client.cache_clear()
+        yield
+        gemini_api_service.get_genai_client.cache_clear()
+
+    def test_client_is_shared_per_project_and_location(self):
+        with mock.patch.object(gemini_api_service.genai, "Client") as client_cls:
+            first = gemini_api_service.get_genai_client("proj", "us-central1")
+            again = gemini_api_service.get_genai_client("proj", "us-central1")
+            other = gemini_api_service.get_genai_client("proj", "europe-west4")
+        assert first is again
+        assert client_cls.call_count == 2
+        client_cls.assert_any_call(vertexai=True, project="proj", location="europe-west4")
+        assert other is client_cls.return_value
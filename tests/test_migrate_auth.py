@@ -1,13 +1,9 @@
 """Tests for the migrate_auth.py migration script."""
 
-import os
-import sys
-import tempfile
-
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-
 from sqlalchemy import create_engine, inspect, text
 
+import migrate_auth
+
 
 def _create_legacy_db(db_path: str):
   """Create a DB with the old schema (no auth columns)."""
@@ -28,7 +24,8 @@ def _create_legacy_db(db_path: str):
     """))
     conn.execute(text("""
       INSERT INTO users (id, google_sub, email, credits_balance)
-      VALUES ('u1', 'gsub1', 'user@example.com', 500)
+      VALUES ('u1', 'gsub1', 'user@example.com', 500),
+             ('u2', 'gsub2', ' Mixed.Case@Example.com', 0)
     """))
   engine.dispose()
   return f"sqlite:///{db_path}"
@@ -40,7 +37,6 @@ class TestMigration:
     db_url = _create_legacy_db(db_path)
 
     # Patch DATABASE_URL and run migration
-    import migrate_auth
     migrate_auth.DATABASE_URL = db_url
     migrate_auth.migrate()
 
@@ -61,7 +57,6 @@ class TestMigration:
     db_path = str(tmp_path / "test2.db")
     db_url = _create_legacy_db(db_path)
 
-    import migrate_auth
     migrate_auth.DATABASE_URL = db_url
     migrate_auth.migrate()
     migrate_auth.migrate()  # Second run should be a no-op
@@ -77,7 +72,6 @@ class TestMigration:
     db_path = str(tmp_path / "test3.db")
     db_url = _create_legacy_db(db_path)
 
-    import migrate_auth
     migrate_auth.DATABASE_URL = db_url
     migrate_auth.migrate()
 
@@ -90,3 +84,38 @@ class TestMigration:
     engine.dispose()
 
     assert row[0] == 1  # Should be marked as verified
+
+  def test_backfills_email_normalized(self, tmp_path):
+    db_url = _create_legacy_db(str(tmp_path / "test5.db"))
+
+    migrate_auth.DATABASE_URL = db_url
+    migrate_auth.migrate()
+
+    engine = create_engine(db_url)
+    with engine.begin() as conn:
+      rows = dict(conn.execute(text(
+          "SELECT id, email_normalized FROM users"
+      )).fetchall())
+    indexes = {i["name"]: i for i in inspect(engine).get_indexes("users")}
+    engine.dispose()
+
+    assert rows == {"u1": "user@example.com", "u2": "mixed.case@example.com"}
+    assert indexes["ix_users_email_normalized"]["unique"]
+
+  def test_second_run_adds_nothing(self, tmp_path, capsys):
+    db_url = _create_legacy_db(str(tmp_path / "test4.db"))
+
+    migrate_auth.DATABASE_URL = db_url
+    migrate_auth.migrate()
+    capsys.readouterr()
+    migrate_auth.migrate()
+
+    out = capsys.readouterr().out
+    assert "[add]" not in out
+    assert "0 column(s) added, 6 skipped" in out
+
+  def test_missing_users_table_skipped(self, tmp_path, capsys):
+    migrate_auth.DATABASE_URL = f"sqlite:///{tmp_path / 'empty.db'}"
+    migrate_auth.migrate()
+
+    assert "does not exist yet" in capsys.readouterr().out
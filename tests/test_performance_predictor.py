@@ -1,10 +1,15 @@
 """Tests for performance_predictor module."""
 
+import math
+from unittest import mock
+
 import pytest
+import performance_predictor
 from performance_predictor import (
     _section_score,
     _has_keyword_detected,
     _by_sub,
+    _group_by_sub,
     compute_predictions,
     SECTION_MAXES,
 )
@@ -20,7 +25,7 @@ class TestSectionScore:
         {"detected": True, "confidence": 1.0},
     ]
     result = _section_score(features, 10)
-    assert result == pytest.approx(10.0, abs=0.01)
+    assert math.isclose(result, 10.0, abs_tol=0.01)
 
   def test_none_detected(self):
     features = [
@@ -36,12 +41,12 @@ class TestSectionScore:
     ]
     result = _section_score(features, 10)
     # 1 detected: 0.8 * (10/2) = 4.0
-    assert result == pytest.approx(4.0, abs=0.01)
+    assert math.isclose(result, 4.0, abs_tol=0.01)
 
   def test_no_confidence_defaults_half(self):
     features = [{"detected": True, "confidence": None}]
     result = _section_score(features, 10)
-    assert result == pytest.approx(5.0, abs=0.01)  # 0.5 * 10
+    assert math.isclose(result, 5.0, abs_tol=0.01)  # 0.5 * 10
 
   def test_capped_at_max(self):
     features = [{"detected": True, "confidence": 2.0}]  # above 1.0
@@ -66,6 +71,21 @@ class TestHasKeywordDetected:
     features = [{"name": "CTA", "evidence": "shop now button", "detected": True}]
     assert _has_keyword_detected(features, ["shop"], field="evidence") is True
 
+  def test_mixed_case_keywords(self):
+    features = [{"name": "Dynamic Start", "detected": True}]
+    assert _has_keyword_detected(features, ["Dynamic START"]) is True
+
+  def test_match_does_not_span_features(self):
+    features = [
+        {"name": "dynamic", "detected": True},
+        {"name": "start", "detected": True},
+    ]
+    assert _has_keyword_detected(features, ["dynamic start"]) is False
+
+  def test_none_field(self):
+    features = [{"name": None, "detected": True}]
+    assert _has_keyword_detected(features, ["hook"]) is False
+
 
 class TestBySub:
   def test_filters_correctly(self):
@@ -87,6 +107,17 @@ class TestBySub:
     assert _by_sub([], "ATTRACT") == []
 
 
+class TestGroupBySub:
+  def test_matches_by_sub(self, abcd_features):
+    groups = _group_by_sub(abcd_features)
+    for sub in ("ATTRACT", "BRAND", "CONNECT", "DIRECT"):
+      assert groups[sub] == _by_sub(abcd_features, sub)
+
+  def test_case_insensitive(self):
+    features = [{"sub_category": "attract"}, {"sub_category": "Attract"}]
+    assert len(_group_by_sub(features)["ATTRACT"]) == 2
+
+
 class TestComputePredictions:
   def test_returns_expected_keys(self, abcd_features, persuasion_features, structure_features):
     result = compute_predictions(abcd_features, persuasion_features, structure_features)
@@ -133,3 +164,38 @@ class TestComputePredictions:
     assert "top_positive" in drivers
     assert "top_negative" in drivers
     assert isinstance(drivers["top_positive"], list)
+
+
+class TestPredictionCache:
+  @pytest.fixture(autouse=True)
+  def _empty_cache(self):
+    performance_predictor._predictions_cache.clear()
+    yield
+    performance_predictor._predictions_cache.clear()
+
+  def test_same_content_computed_once(self, abcd_features, persuasion_features, structure_features):
+    with mock.patch.object(
+        performance_predictor, "_compute_predictions",
+        wraps=performance_predictor._compute_predictions,
+    ) as impl:
+      first = compute_predictions(abcd_features, persuasion_features, structure_features)
+      # Fresh but equal lists, extra fields the rules never read
+      copies = [[{**f, "strengths": "x"} for f in fs]
+                for fs in (abcd_features, persuasion_features, structure_features)]
+      second = compute_predictions(*copies)
+    assert impl.call_count == 1
+    assert second == first
+
+  def test_hits_return_independent_dicts(self, abcd_features, persuasion_features, structure_features):
+    first = compute_predictions(abcd_features, persuasion_features, structure_features)
+    first["flags"]["hook_within_3s"] = "mutated"
+    second = compute_predictions(abcd_features, persuasion_features, structure_features)
+    assert isinstance(second["flags"]["hook_within_3s"], bool)
+
+  def test_changed_feature_recomputes(self, abcd_features, persuasion_features, structure_features):
+    before = compute_predictions(abcd_features, persuasion_features, structure_features)
+    for f in abcd_features:
+      f["detected"] = False
+    after = compute_predictions(abcd_features, persuasion_features, structure_features)
+    assert after["overall_score"] < before["overall_score"]
+
@@ -1,15 +1,21 @@
 """Tests for platform_optimizer module."""
 
+import math
+
 import pytest
 from platform_optimizer import (
     _parse_aspect_ratio,
     _parse_duration_seconds,
     _has_feature_keyword,
+    _keyword_signals,
+    _detected_names,
+    _ABCD_SIGNALS,
     _score_youtube,
     _score_meta_feed,
     _score_meta_reels,
     _score_tiktok,
     _score_ctv,
+    PlatformScore,
     compute_platform_fit,
 )
 
@@ -18,13 +24,13 @@ from platform_optimizer import (
 
 class TestParseAspectRatio:
   def test_colon_format(self):
-    assert _parse_aspect_ratio("16:9") == pytest.approx(16 / 9, rel=1e-3)
+    assert math.isclose(_parse_aspect_ratio("16:9"), 16 / 9, rel_tol=1e-3)
 
   def test_colon_4_5(self):
-    assert _parse_aspect_ratio("4:5") == pytest.approx(0.8, rel=1e-3)
+    assert math.isclose(_parse_aspect_ratio("4:5"), 0.8, rel_tol=1e-3)
 
   def test_float_string(self):
-    assert _parse_aspect_ratio("1.78") == pytest.approx(1.78, rel=1e-3)
+    assert math.isclose(_parse_aspect_ratio("1.78"), 1.78, rel_tol=1e-3)
 
   def test_empty(self):
     assert _parse_aspect_ratio("") is None
@@ -38,6 +44,16 @@ class TestParseAspectRatio:
   def test_zero_denominator(self):
     assert _parse_aspect_ratio("16:0") is None
 
+  def test_spaced_colon(self):
+    assert math.isclose(_parse_aspect_ratio(" 9 : 16 "), 0.5625)
+
+  def test_repeat_calls_hit_cache(self):
+    import platform_optimizer
+    platform_optimizer._parse_aspect_ratio_cached.cache_clear()
+    _parse_aspect_ratio("21:9")
+    _parse_aspect_ratio("21:9")
+    assert platform_optimizer._parse_aspect_ratio_cached.cache_info().hits == 1
+
 
 class TestParseDurationSeconds:
   def test_mm_ss(self):
@@ -64,6 +80,63 @@ class TestParseDurationSeconds:
   def test_invalid(self):
     assert _parse_duration_seconds("abc") == 0.0
 
+  def test_uppercase_suffix_and_whitespace(self):
+    assert _parse_duration_seconds(" 30S ") == 30.0
+
+  def test_too_many_parts(self):
+    assert _parse_duration_seconds("1:2:3:4") == 0.0
+
+
+def _baseline_aspect_ratio(ar_str):
+  """The split/float() parser the regexes replaced, kept as an oracle."""
+  if not ar_str:
+    return None
+  if ":" in ar_str:
+    try:
+      w, h = ar_str.split(":")
+      return float(w) / float(h)
+    except (ValueError, ZeroDivisionError):
+      return None
+  try:
+    return float(ar_str)
+  except ValueError:
+    return None
+
+
+def _baseline_duration_seconds(dur_str):
+  """The split/float() parser the regexes replaced, kept as an oracle."""
+  if not dur_str:
+    return 0.0
+  dur_str = dur_str.strip().lower().rstrip("s")
+  try:
+    if ":" in dur_str:
+      parts = dur_str.split(":")
+      if len(parts) == 2:
+        return int(parts[0]) * 60 + float(parts[1])
+      if len(parts) == 3:
+        return int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
+    return float(dur_str)
+  except (ValueError, IndexError):
+    return 0.0
+
+
+_PARSE_INPUTS = [
+    "", "16:9", "9:16", "4:5", "1.78", " 16 : 9 ", "16:0", "16:-9", "-16:9",
+    "+4:+5", "1e3", "1E3:1", "5.", ".5", "-1", "+2", "-0:30", "0:30", "1:05",
+    "1:02:30", "1:-02:30", "30", "30s", "30S", "30 s", " 30 S ", "0:30 s",
+    "30ss", "30 s s", "1.5:30", "1:2:3:4", "abc", "16:", ":9", "s",
+]
+
+
+class TestParseMatchesBaseline:
+  @pytest.mark.parametrize("value", _PARSE_INPUTS)
+  def test_aspect_ratio(self, value):
+    assert _parse_aspect_ratio(value) == _baseline_aspect_ratio(value)
+
+  @pytest.mark.parametrize("value", _PARSE_INPUTS)
+  def test_duration_seconds(self, value):
+    assert _parse_duration_seconds(value) == _baseline_duration_seconds(value)
+
 
 class TestHasFeatureKeyword:
   def test_detected_match(self):
@@ -85,24 +158,67 @@ class TestHasFeatureKeyword:
   def test_empty(self):
     assert _has_feature_keyword([], ["anything"]) is False
 
+  def test_keywords_are_case_insensitive(self):
+    features = [{"name": "Dynamic Start Hook", "detected": True}]
+    assert _has_feature_keyword(features, ["DYNAMIC Start"]) is True
+
+  def test_casefold_matching(self):
+    features = [{"name": "Große Marke", "detected": True}]
+    assert _has_feature_keyword(features, ["grosse"]) is True
+
+
+class TestKeywordSignals:
+  @pytest.mark.parametrize("names", [
+      [],
+      ["Dynamic Start", "Brand Logo"],
+      ["Call To Action text", "Product Focus", "Hook"],
+      ["Nothing relevant"],
+  ])
+  def test_matches_per_group_scan(self, names):
+    features = [
+        {"name": n, "detected": i % 3 != 2} for i, n in enumerate(names)
+    ]
+    expected = {
+        name: _has_feature_keyword(features, list(kws))
+        for name, kws in _ABCD_SIGNALS
+    }
+    assert _keyword_signals(_detected_names(features), _ABCD_SIGNALS) == expected
+
+  def test_undetected_features_ignored(self):
+    features = [{"name": "Brand Logo", "detected": False}]
+    assert _keyword_signals(_detected_names(features), _ABCD_SIGNALS)["has_brand_early"] is False
+
 
 # ---- Platform scoring ----
 
+class TestPlatformScore:
+  def test_to_dict(self):
+    assert PlatformScore(80, ("a", "b")).to_dict() == {"score": 80, "tips": ["a", "b"]}
+
+  def test_scorer_keeps_top_three_tips(self):
+    result = _score_tiktok(
+        duration_s=90, ar=1.0, hook_fast=False,
+        has_captions=False, pacing_fast=False, structure_archetype="",
+    )
+    assert isinstance(result, PlatformScore)
+    assert len(result.tips) == 3
+
+
 class TestScoreYouTube:
   def test_ideal_video(self):
     result = _score_youtube(
         duration_s=30, ar=16/9, scene_count=6,
         hook_fast=True, has_cta=True, has_brand_early=True, has_captions=True,
     )
-    assert result["score"] >= 90
-    assert isinstance(result["tips"], list)
+    assert result.score >= 90
+    assert isinstance(result.tips, tuple)
 
   def test_short_video_penalized(self):
     result = _score_youtube(
         duration_s=3, ar=16/9, scene_count=1,
         hook_fast=False, has_cta=False, has_brand_early=False, has_captions=False,
     )
-    assert result["score"] < 70
+    assert result.score < 70
 
   def test_vertical_penalized(self):
     result = _score_youtube(
@@ -114,14 +230,14 @@ class TestScoreYouTube:
         duration_s=30, ar=16/9, scene_count=6,
         hook_fast=True, has_cta=True, has_brand_early=True, has_captions=True,
     )
-    assert result["score"] < ideal["score"]
+    assert result.score < ideal.score
 
   def test_score_clamped_0_100(self):
     result = _score_youtube(
         duration_s=30, ar=16/9, scene_count=6,
         hook_fast=True, has_cta=True, has_brand_early=True, has_captions=True,
     )
-    assert 0 <= result["score"] <= 100
+    assert 0 <= result.score <= 100
 
 
 class TestScoreMetaFeed:
@@ -130,21 +246,21 @@ class TestScoreMetaFeed:
         duration_s=20, ar=1.0, hook_fast=True,
         has_cta=True, has_captions=True, audio_independent=True,
     )
-    assert result["score"] >= 85
+    assert result.score >= 85
 
   def test_landscape_penalized(self):
     result = _score_meta_feed(
         duration_s=20, ar=16/9, hook_fast=True,
         has_cta=True, has_captions=True, audio_independent=True,
     )
-    assert any("square" in t.lower() or "landscape" in t.lower() for t in result["tips"])
+    assert any("square" in t.lower() or "landscape" in t.lower() for t in result.tips)
 
   def test_no_captions_no_audio_independence(self):
     result = _score_meta_feed(
         duration_s=20, ar=1.0, hook_fast=True,
         has_cta=True, has_captions=False, audio_independent=False,
     )
-    assert result["score"] <= 70
+    assert result.score <= 70
 
 
 class TestScoreMetaReels:
@@ -154,7 +270,7 @@ class TestScoreMetaReels:
         has_captions=True, audio_independent=True,
         pacing_fast=True, structure_archetype="UGC",
     )
-    assert result["score"] >= 85
+    assert result.score >= 85
 
   def test_landscape_heavily_penalized(self):
     result = _score_meta_reels(
@@ -162,7 +278,7 @@ class TestScoreMetaReels:
         has_captions=True, audio_independent=True,
         pacing_fast=True, structure_archetype="",
     )
-    assert result["score"] <= 65
+    assert result.score <= 65
 
 
 class TestScoreTikTok:
@@ -171,14 +287,14 @@ class TestScoreTikTok:
         duration_s=12, ar=9/16, hook_fast=True,
         has_captions=True, pacing_fast=True, structure_archetype="UGC",
     )
-    assert result["score"] >= 85
+    assert result.score >= 85
 
   def test_long_landscape(self):
     result = _score_tiktok(
         duration_s=90, ar=16/9, hook_fast=False,
         has_captions=False, pacing_fast=False, structure_archetype="",
     )
-    assert result["score"] < 45
+    assert result.score < 45
 
 
 class TestScoreCTV:
@@ -187,14 +303,14 @@ class TestScoreCTV:
         duration_s=30, ar=16/9, has_brand_early=True,
         has_cta=True, pacing_fast=False, text_readable=True,
     )
-    assert result["score"] >= 90
+    assert result.score >= 90
 
   def test_vertical_penalized(self):
     result = _score_ctv(
         duration_s=30, ar=9/16, has_brand_early=True,
         has_cta=True, pacing_fast=False, text_readable=True,
     )
-    assert result["score"] <= 80
+    assert result.score <= 80
 
 
 # ---- Integration: compute_platform_fit ----
@@ -213,9 +329,26 @@ class TestComputePlatformFit:
       assert "score" in result[key]
       assert "tips" in result[key]
       assert 0 <= result[key]["score"] <= 100
+      assert isinstance(result[key]["tips"], list)
 
   def test_empty_inputs(self):
     result = compute_platform_fit([], [], [], [], {}, [])
     assert "youtube" in result
     for key in result:
       assert 0 <= result[key]["score"] <= 100
+
+  def test_repeat_inputs_hit_cache(
+      self, abcd_features, persuasion_features, structure_features,
+      accessibility_features, video_metadata, sample_scenes,
+  ):
+    import platform_optimizer
+    platform_optimizer._platform_scores.cache_clear()
+    args = (
+        abcd_features, persuasion_features, structure_features,
+        accessibility_features, video_metadata, sample_scenes,
+    )
+    first = compute_platform_fit(*args)
+    first["youtube"]["tips"].append("mutated")
+    second = compute_platform_fit(*args)
+    assert platform_optimizer._platform_scores.cache_info().hits == 1
+    assert "mutated" not in second["youtube"]["tips"]
@@ -1,9 +1,13 @@
 """Tests for reference_library module."""
 
+import json
 import math
+import os
+
 import pytest
 from unittest import mock
 
+import reference_library
 from reference_library import (
     _cosine_similarity,
     _build_feature_vector,
@@ -35,6 +39,13 @@ class TestCosineSimilarity:
   def test_empty_vectors(self):
     assert _cosine_similarity([], []) == 0.0
 
+  def test_matches_definition(self):
+    a = [0.9, 0.1, 0.4, 0.0, 0.7, 0.3, 0.5, 0.2, 0.6]
+    b = [0.2, 0.8, 0.4, 0.1, 0.3, 0.9, 0.0, 0.5, 0.6]
+    dot = sum(x * y for x, y in zip(a, b))
+    expected = dot / (math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b)))
+    assert _cosine_similarity(a, b) == pytest.approx(expected, rel=1e-12)
+
 
 class TestBuildFeatureVector:
   def test_extracts_normalized_scores(self):
@@ -65,6 +76,13 @@ class TestBuildFeatureVector:
     assert len(vec) == 9
     assert all(v == 0.0 for v in vec)
 
+  def test_empty_predictions_share_zero_vector(self):
+    assert _build_feature_vector({}) is _build_feature_vector({"normalized": {}})
+
+  def test_partial_scores_fill_zero(self):
+    vec = _build_feature_vector({"normalized": {"cta": 0.9}})
+    assert vec == (0.0, 0.0, 0.0, 0.0, 0.0, 0.9, 0.0, 0.0, 0.0)
+
 
 class TestFindSimilarAds:
   def test_empty_library_returns_empty(self):
@@ -116,3 +134,87 @@ class TestFindSimilarAds:
     ]):
       result = find_similar_ads({"normalized": {}})
     assert result == []
+
+  def test_zero_vector_skips_library_load(self):
+    with mock.patch("reference_library.load_library") as load:
+      assert find_similar_ads({}) == []
+    load.assert_not_called()
+
+  def test_ties_keep_library_order(self):
+    library = [
+        {"name": f"Ad {i}", "feature_vector": [0.5] * 9, "vertical": ""}
+        for i in range(5)
+    ]
+    with mock.patch("reference_library.load_library", return_value=library):
+      result = find_similar_ads({"normalized": {"cta": 0.4}}, top_k=3)
+    assert [ad["name"] for ad in result] == ["Ad 0", "Ad 1", "Ad 2"]
+
+  def test_rounded_ties_beat_higher_raw_score_later(self):
+    # cta is the sixth feature; "Near" scores ~0.9996, which rounds to 1.0
+    near = [0.0] * 9
+    near[5], near[0] = 1.0, 0.028
+    exact = [0.0] * 9
+    exact[5] = 1.0
+    library = [
+        {"name": "Near", "feature_vector": near, "vertical": ""},
+        {"name": "Exact", "feature_vector": exact, "vertical": ""},
+        {"name": "Far", "feature_vector": [0.5] * 9, "vertical": ""},
+    ]
+    with mock.patch("reference_library.load_library", return_value=library):
+      result = find_similar_ads({"normalized": {"cta": 0.4}}, top_k=1)
+    assert [(ad["name"], ad["similarity"]) for ad in result] == [("Near", 1.0)]
+
+  def test_skips_ads_without_full_vector(self):
+    library = [
+        {"name": "Short", "feature_vector": [0.5] * 4, "vertical": ""},
+        {"name": "Missing", "vertical": ""},
+        {"name": "Zero", "feature_vector": [0.0] * 9, "vertical": ""},
+        {"name": "Full", "feature_vector": [0.5] * 9, "vertical": ""},
+    ]
+    with mock.patch("reference_library.load_library", return_value=library):
+      result = find_similar_ads({"normalized": {"cta": 0.4}}, top_k=5)
+    assert [(ad["name"], ad["similarity"]) for ad in result] == [
+        ("Full", round(1 / 3, 3)), ("Zero", 0.0),
+    ]
+
+  def test_vertical_without_scorable_ads_returns_empty(self):
+    library = [
+        {"name": "Ecom", "feature_vector": [0.5] * 9, "vertical": "ecommerce"},
+        {"name": "SaaS stub", "vertical": "SaaS"},
+    ]
+    with mock.patch("reference_library.load_library", return_value=library):
+      assert find_similar_ads({"normalized": {"cta": 0.4}}, vertical="saas") == []
+      # Unknown verticals fall back to the whole library
+      result = find_similar_ads({"normalized": {"cta": 0.4}}, vertical="auto")
+    assert [ad["name"] for ad in result] == ["Ecom"]
+
+  def test_library_index_reused(self):
+    library = [{"name": "Ad", "feature_vector": [0.5] * 9, "vertical": ""}]
+    with mock.patch("reference_library.load_library", return_value=library):
+      find_similar_ads({"normalized": {"cta": 0.4}})
+      index = reference_library._index_cache
+      find_similar_ads({"normalized": {"cta": 0.9}})
+    assert reference_library._index_cache is index
+    assert index.source is library
+
+
+class TestLoadLibrary:
+  @pytest.fixture(autouse=True)
+  def _library_file(self, tmp_path, monkeypatch):
+    path = tmp_path / "reference_library.json"
+    monkeypatch.setattr(reference_library, "_LIBRARY_PATH", str(path))
+    monkeypatch.setattr(reference_library, "_library_cache", None)
+    monkeypatch.setattr(reference_library, "_library_mtime", None)
+    return path
+
+  def test_cached_until_file_changes(self, _library_file):
+    _library_file.write_text(json.dumps([{"name": "A"}]))
+    first = reference_library.load_library()
+    assert reference_library.load_library() is first
+
+    _library_file.write_text(json.dumps([{"name": "A"}, {"name": "B"}]))
+    os.utime(_library_file, (0, os.stat(_library_file).st_mtime + 5))
+    assert [ad["name"] for ad in reference_library.load_library()] == ["A", "B"]
+
+  def test_missing_file_returns_empty(self):
+    assert reference_library.load_library() == []
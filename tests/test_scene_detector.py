@@ -38,6 +38,11 @@ class TestParseTimestamp:
     def test_zero(self):
         assert _parse_timestamp_seconds("0:00") == 0.0
 
+    @pytest.mark.parametrize("ts", ["", "abc", "1:2:3:4", "0:15s", "1:", ":30"])
+    def test_invalid_raises(self, ts):
+        with pytest.raises(ValueError):
+            _parse_timestamp_seconds(ts)
+
 
 # ---------------------------------------------------------------------------
 # cleanup_temp_dir
@@ -52,6 +57,14 @@ class TestCleanupTempDir:
         cleanup_temp_dir(d)
         assert not os.path.exists(d)
 
+    def test_removes_nested_dirs(self):
+        d = tempfile.mkdtemp(prefix="abcd_test_")
+        os.makedirs(os.path.join(d, "frames", "hi"))
+        with open(os.path.join(d, "frames", "hi", "0001.jpg"), "wb") as f:
+            f.write(b"\xff\xd8")
+        cleanup_temp_dir(d)
+        assert not os.path.exists(d)
+
     def test_empty_string_noop(self):
         cleanup_temp_dir("")  # should not raise
 
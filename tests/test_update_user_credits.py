@@ -0,0 +1,44 @@
+"""Tests for the update_user_credits.py admin script."""
+
+from unittest import mock
+
+import pytest
+
+import update_user_credits
+from db import CreditTransaction, User
+
+
+@pytest.fixture(autouse=True)
+def _script_session(_session_factory):
+  with mock.patch.object(update_user_credits, "SessionLocal", _session_factory):
+    yield
+
+
+class TestUpdateUsersCredits:
+  def test_adds_credits_and_records_grant(self, create_user, db_session):
+    user = create_user(email="Alice@Example.com", credits_balance=100)
+    assert update_user_credits.update_user_credits("alice@example.com", 250)
+
+    db_session.expire_all()
+    assert db_session.get(User, user.id).credits_balance == 350
+    tx = db_session.query(CreditTransaction).filter_by(user_id=user.id).one()
+    assert (tx.type, tx.amount, tx.reason) == ("grant", 250, "admin_manual_grant")
+
+  def test_unknown_email_returns_false(self, db_session):
+    assert not update_user_credits.update_user_credits("nobody@example.com", 10)
+    assert db_session.query(CreditTransaction).count() == 0
+
+  def test_batch_updates_found_users(self, create_user, db_session):
+    a = create_user(email="a@example.com", credits_balance=0)
+    b = create_user(email="b@example.com", credits_balance=5)
+    ok = update_user_credits.update_users_credits([
+        ("a@example.com", 10),
+        ("missing@example.com", 20),
+        ("b@example.com", 30),
+    ])
+
+    assert not ok
+    db_session.expire_all()
+    assert db_session.get(User, a.id).credits_balance == 10
+    assert db_session.get(User, b.id).credits_balance == 35
+    assert db_session.query(CreditTransaction).count() == 2
@@ -1,8 +1,18 @@
 """Tests for web_app.py — config building, result formatting, provider detection."""
 
+import asyncio
+import base64
+import datetime
+import decimal
+import io
 import json
 import pytest
+from unittest import mock
+from starlette.datastructures import UploadFile
+
 import models
+import web_app
+from db import Render
 from web_app import build_config, format_results, format_feature
 
 
@@ -46,8 +56,12 @@ class TestProviderDetection:
         ("gs://my-bucket/video.mp4", "GCS"),
     ])
     def test_detection(self, url, expected):
-        detected = "YOUTUBE" if "youtube.com" in url or "youtu.be" in url else "GCS"
-        assert detected == expected
+        assert web_app._provider_type(url) == expected
+
+
+class TestFilenameSanitizer:
+    def test_replaces_unsafe_characters(self):
+        assert web_app._FILENAME_SANITIZER.sub("_", "my clip (1)/ä.mp4") == "my_clip__1___.mp4"
 
 
 # ---------------------------------------------------------------------------
@@ -55,11 +69,13 @@ class TestProviderDetection:
 # ---------------------------------------------------------------------------
 
 class TestFormatFeature:
-    def _make_fe(self, detected=True):
+    def _make_fe(self, detected=True, fid="F1",
+                 category=models.VideoFeatureCategory.LONG_FORM_ABCD,
+                 sub_category=models.VideoFeatureSubCategory.ATTRACT):
         feat = models.VideoFeature(
-            id="F1", name="Test",
-            category=models.VideoFeatureCategory.LONG_FORM_ABCD,
-            sub_category=models.VideoFeatureSubCategory.ATTRACT,
+            id=fid, name="Test",
+            category=category,
+            sub_category=sub_category,
             video_segment=models.VideoSegment.FULL_VIDEO,
             evaluation_criteria="c", prompt_template=None,
             extra_instructions=[], evaluation_method=models.EvaluationMethod.LLMS,
@@ -86,6 +102,16 @@ class TestFormatFeature:
         result = format_feature(self._make_fe())
         json.dumps(result)  # should not raise
 
+    def test_enum_fields_use_values(self):
+        result = format_feature(self._make_fe())
+        assert result["category"] == models.VideoFeatureCategory.LONG_FORM_ABCD.value
+        assert result["sub_category"] == "ATTRACT"
+
+    def test_plain_string_category_passes_through(self):
+        fe = self._make_fe()
+        fe.feature.sub_category = "CUSTOM"
+        assert format_feature(fe)["sub_category"] == "CUSTOM"
+
     def test_has_no_evaluation_key(self):
         """FeatureEvaluation uses 'detected', not 'evaluation'."""
         fe = self._make_fe()
@@ -139,3 +165,535 @@ class TestFormatResults:
         assert result["abcd"]["total"] == 1
         assert result["abcd"]["passed"] == 1
         assert result["abcd"]["score"] == 100.0
+
+    def test_creative_intel_split_by_sub_category(self):
+        sub = models.VideoFeatureSubCategory
+        make = TestFormatFeature()._make_fe
+        ci = models.VideoFeatureCategory.CREATIVE_INTELLIGENCE
+        creative_intel = [
+            make(fid="P1", category=ci, sub_category=sub.PERSUASION),
+            make(fid="S1", category=ci, sub_category=sub.STRUCTURE),
+            make(fid="P2", category=ci, sub_category=sub.PERSUASION, detected=False),
+            make(fid="X1", category=ci, sub_category=sub.NONE),
+            make(fid="A1", category=ci, sub_category=sub.ACCESSIBILITY),
+        ]
+        result = format_results(
+            brand_name="Acme",
+            video_uri="gs://bucket/video.mp4",
+            long_form=[], shorts=[], creative_intel=creative_intel,
+        )
+        assert [f["id"] for f in result["persuasion"]["features"]] == ["P1", "P2"]
+        assert [f["id"] for f in result["structure"]["features"]] == ["S1"]
+        assert [f["id"] for f in result["accessibility"]["features"]] == ["A1"]
+        assert result["persuasion"]["detected"] == 1
+        assert result["persuasion"]["density"] == 50.0
+
+
+# ---------------------------------------------------------------------------
+# POST /api/evaluate (SSE progress stream)
+# ---------------------------------------------------------------------------
+
+class TestEvaluateStream:
+    def test_streams_progress_then_complete(self, client, create_user):
+        create_user(email="stream@test.com", password="Testpass1",
+                    email_verified=True, credits_balance=100000)
+        resp = client.post("/auth/login/email", json={
+            "email": "stream@test.com", "password": "Testpass1",
+        })
+        headers = {"Cookie": f"session_token={resp.cookies.get('session_token')}"}
+
+        async def _fake_eval(uri, config, on_progress=None):
+            on_progress("metadata", "Extracting...", 8)
+            on_progress("abcd_done", "ABCD features complete", 50,
+                        {"abcd": {"score": 75}})
+            return {"video_uri": uri, "video_metadata": {"duration": "0:30"}}
+
+        with mock.patch.object(web_app, "run_evaluation_async", side_effect=_fake_eval), \
+                mock.patch.object(web_app, "_save_results_to_gcs"), \
+                mock.patch.object(web_app, "_send_slack_notification"), \
+                mock.patch.object(web_app.benchmarking, "log_evaluation"):
+            resp = client.post(
+                "/api/evaluate",
+                data={"gcs_uri": "gs://bucket/stream.mp4"},
+                headers=headers,
+            )
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        events = [
+            json.loads(line[len("data: "):])
+            for line in resp.text.splitlines() if line.startswith("data: ")
+        ]
+        steps = [e["step"] for e in events]
+        assert steps == ["render_estimate", "metadata", "abcd_done", "complete"]
+        # The SSE stream must never be buffered by the gzip middleware
+        assert "content-encoding" not in resp.headers
+        assert events[2]["partial"] == {"abcd": {"score": 75}}
+        assert events[-1]["data"]["video_uri"] == "gs://bucket/stream.mp4"
+        report_id = events[-1]["data"]["report_id"]
+        assert len(report_id) == 8 and int(report_id, 16) >= 0
+
+    def test_success_charges_and_finalizes_render_together(
+        self, client, create_user, db_session, _session_factory,
+    ):
+        user = create_user(email="finalize@test.com", password="Testpass1",
+                           email_verified=True, credits_balance=1000)
+        resp = client.post("/auth/login/email", json={
+            "email": "finalize@test.com", "password": "Testpass1",
+        })
+        headers = {"Cookie": f"session_token={resp.cookies.get('session_token')}"}
+
+        async def _fake_eval(uri, config, on_progress=None):
+            return {"video_uri": uri, "video_metadata": {"duration": "0:30"}}
+
+        web_app._render_activity.clear()
+        with mock.patch.object(web_app, "run_evaluation_async", side_effect=_fake_eval), \
+                mock.patch.object(web_app, "SessionLocal", _session_factory), \
+                mock.patch.object(web_app, "_save_results_to_gcs"), \
+                mock.patch.object(web_app, "_send_slack_notification"), \
+                mock.patch.object(web_app.benchmarking, "log_evaluation"):
+            resp = client.post(
+                "/api/evaluate",
+                data={"gcs_uri": "gs://bucket/final.mp4"},
+                headers=headers,
+            )
+        done = [
+            json.loads(line[len("data: "):])
+            for line in resp.text.splitlines() if line.startswith("data: ")
+        ][-1]["data"]
+        render = db_session.get(Render, done["report_id"])
+        db_session.refresh(user)
+        assert render.status == "succeeded"
+        # Starting the render wakes the stale-render reaper
+        assert web_app._render_activity.is_set()
+        assert render.tokens_used == done["tokens_used"] > 0
+        assert user.credits_balance == done["credits_remaining"] == 1000 - done["tokens_used"]
+
+
+# ---------------------------------------------------------------------------
+# Pre-serialized JSON endpoints
+# ---------------------------------------------------------------------------
+
+class TestJsonEndpoints:
+    def test_health_body(self, client):
+        resp = client.get("/health")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/json"
+        assert resp.json() == {
+            "status": "healthy",
+            "version": web_app.app.version,
+            "database": "ok",
+        }
+
+    def test_health_reuses_recent_probe(self, client):
+        with mock.patch.object(web_app, "_health_cache", {"ok": True, "ts": float("-inf")}), \
+                mock.patch.object(web_app, "check_db_health", return_value=False) as probe:
+            first = client.get("/health")
+            second = client.get("/health")
+        probe.assert_called_once()
+        assert first.status_code == second.status_code == 503
+        assert second.json()["database"] == "unreachable"
+
+    def test_health_reprobes_after_ttl(self, client):
+        with mock.patch.object(web_app, "_health_cache", {"ok": True, "ts": float("-inf")}), \
+                mock.patch.object(web_app, "_HEALTH_TTL_SECONDS", 0.0), \
+                mock.patch.object(web_app, "check_db_health", return_value=True) as probe:
+            client.get("/health")
+            client.get("/health")
+        assert probe.call_count == 2
+
+    def test_db_health_check_survives_connect_failure(self):
+        import db
+        with mock.patch.object(db, "engine") as engine:
+            engine.connect.side_effect = RuntimeError("pool exhausted")
+            assert db.check_db_health() is False
+
+    def test_results_served_from_store(self, client):
+        stored = {"report_id": "jsonrpt1", "abcd": {"score": 75, "features": []}}
+        web_app.results_store["jsonrpt1"] = stored
+        try:
+            resp = client.get("/api/results/jsonrpt1")
+        finally:
+            web_app.results_store.pop("jsonrpt1", None)
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/json"
+        assert resp.json() == stored
+
+    def test_json_response_stringifies_unknown_types(self):
+        resp = web_app._json_response({"cost": decimal.Decimal("1.5")}, status_code=201)
+        assert resp.status_code == 201
+        assert json.loads(resp.body) == {"cost": "1.5"}
+
+    def test_sse_event_frame(self):
+        frame = web_app._sse_event({"step": "é", "cost": decimal.Decimal("2")})
+        assert frame.startswith(b"data: ") and frame.endswith(b"\n\n")
+        assert json.loads(frame[len(b"data: "):]) == {"step": "é", "cost": "2"}
+
+    def test_large_results_are_gzipped(self, client):
+        stored = {"report_id": "jsonrpt2", "scenes": [{"description": "x" * 50}] * 100}
+        web_app.results_store["jsonrpt2"] = stored
+        try:
+            resp = client.get("/api/results/jsonrpt2", headers={"Accept-Encoding": "gzip"})
+        finally:
+            web_app.results_store.pop("jsonrpt2", None)
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.json() == stored
+
+    def test_small_responses_not_compressed(self, client):
+        resp = client.get("/health", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in resp.headers
+
+
+# ---------------------------------------------------------------------------
+# POST /api/upload
+# ---------------------------------------------------------------------------
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class TestUploadVideo:
+    def _headers(self, client, create_user, email):
+        create_user(email=email, password="Testpass1",
+                    email_verified=True, credits_balance=100000)
+        resp = client.post("/auth/login/email", json={
+            "email": email, "password": "Testpass1",
+        })
+        return {"Cookie": f"session_token={resp.cookies.get('session_token')}"}
+
+    def test_streams_file_to_disk(self, client, create_user):
+        headers = self._headers(client, create_user, "upload@test.com")
+        body = b"\x00" * (3 * web_app._UPLOAD_CHUNK_BYTES + 17)
+        seen = {}
+
+        def _upload(path, name):
+            with open(path, "rb") as f:
+                seen["body"] = f.read()
+            seen["in_loop"] = _in_event_loop()
+            return f"gs://bucket/{name}"
+
+        with mock.patch.object(web_app, "upload_to_gcs", side_effect=_upload), \
+                mock.patch.object(web_app, "_send_upload_slack_notification"):
+            resp = client.post(
+                "/api/upload",
+                files={"file": ("clip.mp4", body, "video/mp4")},
+                headers=headers,
+            )
+        assert resp.status_code == 200
+        assert resp.json()["gcs_uri"] == "gs://bucket/clip.mp4"
+        assert seen["body"] == body
+        assert seen["in_loop"] is False
+
+    def test_rejects_oversized_file_without_uploading(self, client, create_user):
+        headers = self._headers(client, create_user, "bigupload@test.com")
+        with mock.patch.object(web_app, "_MAX_UPLOAD_BYTES", 1024), \
+                mock.patch.object(web_app, "upload_to_gcs") as upload:
+            resp = client.post(
+                "/api/upload",
+                files={"file": ("big.mp4", b"\x00" * 4096, "video/mp4")},
+                headers=headers,
+            )
+        assert resp.status_code == 413
+        assert resp.json()["error"] == "file_too_large"
+        upload.assert_not_called()
+
+
+    def test_content_length_rejected_before_parsing(self, client):
+        with mock.patch.object(web_app, "_MAX_UPLOAD_BYTES", 1024), \
+                mock.patch.object(web_app, "_UPLOAD_FORM_OVERHEAD_BYTES", 0), \
+                mock.patch.object(web_app, "_save_upload") as save:
+            # No session cookie: the middleware answers before auth runs
+            resp = client.post(
+                "/api/upload",
+                files={"file": ("big.mp4", b"\x00" * 4096, "video/mp4")},
+            )
+        assert resp.status_code == 413
+        assert resp.json()["error"] == "file_too_large"
+        assert "x-content-type-options" in resp.headers
+        save.assert_not_called()
+
+
+class TestSaveUpload:
+    def test_stops_and_cleans_up_past_limit(self, tmp_path):
+        upload = UploadFile(io.BytesIO(b"x" * (3 << 20)), filename="v.mp4")
+        dest = tmp_path / "v.mp4"
+        size = asyncio.run(web_app._save_upload(upload, dest, max_bytes=1 << 20))
+        assert size > 1 << 20
+        assert not dest.exists()
+
+
+# ---------------------------------------------------------------------------
+# GET /api/video/{report_id}
+# ---------------------------------------------------------------------------
+
+class TestServeVideo:
+    BODY = bytes(range(256)) * 40
+
+    @pytest.fixture
+    def blob(self):
+        blob = mock.Mock(size=len(self.BODY))
+        blob.download_as_bytes.side_effect = (
+            lambda start, end, checksum: self.BODY[start:end + 1]
+        )
+        storage = mock.Mock()
+        storage.bucket.return_value.get_blob.return_value = blob
+        web_app.results_store["vidrpt1"] = {
+            "video_uri": "gs://bucket/videos/clip.mp4",
+            "video_name": "clip.mp4",
+        }
+        with mock.patch.object(web_app, "_get_storage_client", return_value=storage):
+            yield blob
+        web_app.results_store.pop("vidrpt1", None)
+
+    def test_full_file(self, client, blob):
+        with mock.patch.object(web_app, "_VIDEO_CHUNK_BYTES", 4096):
+            resp = client.get("/api/video/vidrpt1")
+        assert resp.status_code == 200
+        assert resp.content == self.BODY
+        assert resp.headers["accept-ranges"] == "bytes"
+        assert resp.headers["content-length"] == str(len(self.BODY))
+        assert blob.download_as_bytes.call_count == 3
+
+    def test_partial_range(self, client, blob):
+        resp = client.get("/api/video/vidrpt1", headers={"Range": "bytes=100-199"})
+        assert resp.status_code == 206
+        assert resp.content == self.BODY[100:200]
+        assert resp.headers["content-range"] == f"bytes 100-199/{len(self.BODY)}"
+
+    def test_suffix_range(self, client, blob):
+        resp = client.get("/api/video/vidrpt1", headers={"Range": "bytes=-10"})
+        assert resp.status_code == 206
+        assert resp.content == self.BODY[-10:]
+
+    def test_unsatisfiable_range(self, client, blob):
+        resp = client.get("/api/video/vidrpt1", headers={"Range": "bytes=999999-"})
+        assert resp.status_code == 416
+        assert resp.headers["content-range"] == f"bytes */{len(self.BODY)}"
+        blob.download_as_bytes.assert_not_called()
+
+    def test_missing_blob(self, client, blob):
+        web_app._get_storage_client().bucket().get_blob.return_value = None
+        resp = client.get("/api/video/vidrpt1")
+        assert resp.status_code == 404
+
+
+# ---------------------------------------------------------------------------
+# Static pages
+# ---------------------------------------------------------------------------
+
+class TestStaticPages:
+    def test_pages_served_from_memory(self, client):
+        with mock.patch.dict(web_app._STATIC, {"index.html": b"<p>cached</p>"}), \
+                mock.patch.object(web_app._STATIC_DIR.__class__, "read_bytes") as read:
+            resp = client.get("/")
+        assert resp.text == "<p>cached</p>"
+        read.assert_not_called()
+
+    def test_examples_served_verbatim(self, client):
+        body = b'{"examples": [], "count": 0, "generated_at": "x"}'
+        with mock.patch.dict(web_app._STATIC, {"examples.json": body}):
+            resp = client.get("/api/examples")
+        assert resp.content == body
+        assert resp.headers["cache-control"] == "public, max-age=3600"
+
+    def test_missing_optional_page_falls_back(self, client):
+        with mock.patch.object(web_app, "_STATIC", {}):
+            resp = client.get("/terms")
+        assert resp.status_code == 200
+        assert "Coming Soon" in resp.text
+
+    def test_served_precompressed_with_etag(self, client):
+        page = b"<p>" + b"x" * 4096 + b"</p>"
+        with mock.patch.dict(web_app._STATIC, {"billing.html": page}):
+            gz = client.get("/billing", headers={"Accept-Encoding": "gzip"})
+            plain = client.get("/billing", headers={"Accept-Encoding": "identity"})
+            again = client.get("/billing", headers={"If-None-Match": gz.headers["etag"]})
+        assert gz.headers["content-encoding"] == "gzip"
+        assert gz.content == plain.content == page
+        assert "content-encoding" not in plain.headers
+        assert again.status_code == 304
+
+    def test_reload_mode_reads_disk(self, client, tmp_path):
+        (tmp_path / "terms.html").write_text("<p>fresh</p>")
+        with mock.patch.object(web_app, "_STATIC_DIR", tmp_path), \
+                mock.patch.object(web_app, "_STATIC_RELOAD", True):
+            resp = client.get("/terms")
+        assert resp.text == "<p>fresh</p>"
+
+
+# ---------------------------------------------------------------------------
+# Render row transitions
+# ---------------------------------------------------------------------------
+
+class TestUpdateRender:
+    @pytest.fixture
+    def render(self, create_user, db_session, _session_factory):
+        user = create_user(email="render@test.com")
+        db_session.add(Render(render_id="rndr1", status="rendering", user_id=user.id))
+        db_session.commit()
+        with mock.patch.object(web_app, "SessionLocal", _session_factory):
+            yield db_session
+
+    def test_sets_fields(self, render):
+        assert web_app._update_render("rndr1", status="succeeded", progress_pct=100)
+        row = render.get(Render, "rndr1", populate_existing=True)
+        assert (row.status, row.progress_pct) == ("succeeded", 100)
+
+    def test_only_active_skips_finished_render(self, render):
+        web_app._update_render("rndr1", status="succeeded")
+        assert not web_app._update_render(
+            "rndr1", only_active=True, status="failed", error_code="STREAM_INTERRUPTED",
+        )
+        row = render.get(Render, "rndr1", populate_existing=True)
+        assert row.status == "succeeded"
+        assert row.error_code is None
+
+    def test_missing_render(self, render):
+        assert not web_app._update_render("nope", status="failed")
+
+    def test_finalize_charges_user_and_marks_succeeded(self, render, create_user):
+        user = render.query(web_app.User).filter_by(email="render@test.com").one()
+        balance = user.credits_balance
+        tokens, remaining = web_app._finalize_render(
+            "rndr1", user.id, 30.0, output_url="https://x/report/rndr1",
+        )
+        row = render.get(Render, "rndr1", populate_existing=True)
+        render.refresh(user)
+        assert (row.status, row.tokens_used, row.output_url) == (
+            "succeeded", tokens, "https://x/report/rndr1",
+        )
+        assert remaining == user.credits_balance == max(0, balance - tokens)
+
+
+class TestReapStaleRenders:
+    @pytest.fixture
+    def renders(self, create_user, db_session, _session_factory):
+        user = create_user(email="reaper@test.com")
+        now = datetime.datetime(2026, 1, 1, 12, 0, 0)
+        threshold = web_app.STALE_RENDER_THRESHOLD_SECONDS
+        old = now - datetime.timedelta(seconds=threshold + 60)
+        db_session.add_all([
+            Render(render_id="stale", status="rendering", started_at=old, user_id=user.id),
+            Render(render_id="queued", status="queued", started_at=old, user_id=user.id),
+            Render(
+                render_id="long", status="rendering", started_at=old,
+                estimated_render_seconds=threshold, user_id=user.id,
+            ),
+            Render(render_id="fresh", status="rendering", started_at=now, user_id=user.id),
+            Render(render_id="done", status="succeeded", started_at=old, user_id=user.id),
+        ])
+        db_session.commit()
+        with mock.patch.object(web_app, "SessionLocal", _session_factory):
+            yield db_session, now
+
+    def test_fails_only_renders_past_their_threshold(self, renders):
+        session, now = renders
+        assert web_app._reap_stale_renders_once(now) == 2
+        rows = {
+            r.render_id: r for r in session.query(Render).populate_existing()
+        }
+        assert {k: r.status for k, r in rows.items()} == {
+            "stale": "failed", "queued": "failed", "long": "rendering",
+            "fresh": "rendering", "done": "succeeded",
+        }
+        assert rows["stale"].error_code == "STALE_TIMEOUT"
+        assert rows["stale"].finished_at == now
+        assert rows["queued"].error_message.startswith(
+            "Render was stuck in 'queued'"
+        )
+
+    def test_nothing_stale(self, renders):
+        session, now = renders
+        assert web_app._reap_stale_renders_once(now - datetime.timedelta(hours=2)) == 0
+
+    def test_has_active_renders(self, renders):
+        session, _ = renders
+        assert web_app._has_active_renders()
+        session.query(Render).filter(
+            Render.status.in_(("queued", "rendering")),
+        ).update({"status": "failed"})
+        session.commit()
+        assert not web_app._has_active_renders()
+
+
+# ---------------------------------------------------------------------------
+# Report ETags
+# ---------------------------------------------------------------------------
+
+class TestReportEtag:
+    @pytest.fixture(autouse=True)
+    def report(self):
+        web_app.results_store["etagrpt1"] = {
+            "report_id": "etagrpt1", "timestamp": "2026-01-01T00:00:00",
+        }
+        with mock.patch.object(web_app, "_pdf_cache", web_app._TTLCache("t", 4, 60)):
+            yield
+        web_app.results_store.pop("etagrpt1", None)
+
+    def test_html_revalidates_with_304(self, client):
+        with mock.patch.object(
+            web_app.report_service, "generate_report_html", return_value="<p>r</p>",
+        ) as gen:
+            first = client.get("/report/etagrpt1")
+            etag = first.headers["etag"]
+            second = client.get("/report/etagrpt1", headers={"If-None-Match": etag})
+        assert first.status_code == 200
+        assert second.status_code == 304
+        gen.assert_called_once()
+
+    def test_pdf_generated_once(self, client):
+        with mock.patch.object(
+            web_app.report_service, "generate_report_pdf", return_value=b"%PDF",
+        ) as gen:
+            first = client.get("/api/report/etagrpt1/pdf")
+            second = client.get("/api/report/etagrpt1/pdf")
+        assert first.content == second.content == b"%PDF"
+        assert first.headers["etag"] == second.headers["etag"]
+        gen.assert_called_once()
+
+    def test_etag_changes_when_report_rerun(self, client):
+        with mock.patch.object(
+            web_app.report_service, "generate_report_html", return_value="<p>r</p>",
+        ):
+            etag = client.get("/report/etagrpt1").headers["etag"]
+            web_app.results_store["etagrpt1"] = {
+                "report_id": "etagrpt1", "timestamp": "2026-02-01T00:00:00",
+            }
+            resp = client.get("/report/etagrpt1", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["etag"] != etag
+
+
+# ---------------------------------------------------------------------------
+# GET /api/keyframe/{report_id}/{scene_idx}
+# ---------------------------------------------------------------------------
+
+class TestServeKeyframe:
+    JPEG = b"\xff\xd8\xff\xe0fake-jpeg"
+
+    @pytest.fixture(autouse=True)
+    def report(self):
+        web_app.results_store["kfrpt1"] = {
+            "timestamp": "2026-01-01T00:00:00",
+            "scenes": [{"keyframe": base64.b64encode(self.JPEG).decode()}, {}],
+        }
+        with mock.patch.object(web_app, "_keyframe_cache", web_app._TTLCache("t", 4, 60)):
+            yield
+        web_app.results_store.pop("kfrpt1", None)
+
+    def test_decodes_once(self, client):
+        with mock.patch.object(web_app.base64, "b64decode", wraps=base64.b64decode) as dec:
+            first = client.get("/api/keyframe/kfrpt1/0")
+            second = client.get("/api/keyframe/kfrpt1/0")
+        assert first.content == second.content == self.JPEG
+        assert first.headers["content-type"] == "image/jpeg"
+        assert "max-age" in first.headers["cache-control"]
+        dec.assert_called_once()
+
+    def test_missing_keyframe(self, client):
+        assert client.get("/api/keyframe/kfrpt1/1").status_code == 404
+        assert client.get("/api/keyframe/kfrpt1/5").status_code == 404
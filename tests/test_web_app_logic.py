@@ -4,14 +4,22 @@ Tests the pure functions in web_app.py that don't require the FastAPI app
 or external services (LLM, GCS, etc.).
 """
 
+import asyncio
+import datetime
+import json
+import queue
 import sys
+import threading
+import time
 import types
+import numpy as np
 import pytest
+from unittest import mock
 
 # Stub out heavy GCP dependencies before importing web_app
 from unittest.mock import MagicMock
 
-_STUB_MODULES = [
+_STUB_MODULES = (
     "vertexai", "vertexai.generative_models", "vertexai.preview",
     "vertexai.preview.generative_models",
     "google.cloud.videointelligence", "google.cloud.videointelligence_v1",
@@ -25,21 +33,398 @@ _STUB_MODULES = [
     "moviepy", "moviepy.editor",
     "yt_dlp",
     "stripe",
-]
-for _mod_name in _STUB_MODULES:
-  if _mod_name not in sys.modules:
-    sys.modules[_mod_name] = MagicMock()
+)
+# The stubs only need to satisfy imports, so they share one mock.
+_STUB = MagicMock(name="gcp-stub")
+sys.modules.update({
+    name: _STUB for name in _STUB_MODULES if name not in sys.modules
+})
 
+import web_app
 from web_app import (
     compute_comparison,
     _compute_emotional_coherence,
     _compute_accessibility,
     _build_action_plan,
     _build_feature_timeline,
+    _format_scenes,
     _parse_ts_seconds,
 )
 
 
+# ---- Background side effects ----
+
+class TestSubmitIo:
+  @pytest.fixture(autouse=True)
+  def _fresh_workers(self):
+    # Earlier tests may leave uploads retrying on the shared workers
+    with mock.patch.object(web_app, "_io_queue", queue.SimpleQueue()), \
+        mock.patch.object(web_app, "_io_threads", []):
+      yield
+
+  def test_runs_after_a_failing_task(self):
+    done = threading.Event()
+
+    def _boom():
+      raise RuntimeError("webhook down")
+
+    web_app._submit_io(_boom)
+    web_app._submit_io(done.set)
+    assert done.wait(timeout=5)
+
+  def test_worker_count_is_bounded(self):
+    for _ in range(3 * web_app._IO_WORKERS):
+      web_app._submit_io(lambda: None)
+    assert len(web_app._io_threads) == web_app._IO_WORKERS
+    assert all(t.daemon for t in web_app._io_threads)
+
+
+class TestUploadSlackNotification:
+  @pytest.fixture(autouse=True)
+  def _inline_io(self):
+    with mock.patch.object(web_app, "SLACK_WEBHOOK_URL", "https://hooks.example/x"), \
+        mock.patch.object(web_app, "_submit_io", side_effect=lambda fn: fn()):
+      yield
+
+  def test_posts_through_shared_session(self):
+    with mock.patch.object(web_app._http_session, "post") as post:
+      post.return_value.status_code = 200
+      web_app._send_upload_slack_notification("a@b.com", "v.mp4", 1.5, "gs://b/v.mp4")
+      web_app._send_upload_slack_notification("c@d.com", "w.mp4", 2.0, "gs://b/w.mp4")
+    assert post.call_count == 2
+    args, kwargs = post.call_args
+    assert args == ("https://hooks.example/x",)
+    assert "w.mp4" in json.loads(kwargs["data"])["text"]
+    assert kwargs["headers"] == {"Content-Type": "application/json"}
+    assert kwargs["timeout"] == 10
+
+  def test_errors_are_swallowed(self):
+    with mock.patch.object(
+        web_app._http_session, "post", side_effect=OSError("no route"),
+    ):
+      web_app._send_upload_slack_notification("a@b.com", "v.mp4", 1.5, "gs://b/v.mp4")
+
+
+class TestReportSlackNotification:
+  def test_posts_report_payload_through_shared_session(self):
+    results = {"video_name": "v.mp4", "brand_name": "Acme",
+               "abcd": {"score": 80, "passed": 6, "total": 8, "result": "Good"}}
+    with mock.patch.object(web_app, "SLACK_WEBHOOK_URL", "https://hooks.example/x"), \
+        mock.patch.object(web_app, "_submit_io", side_effect=lambda fn: fn()), \
+        mock.patch.object(web_app._http_session, "post") as post:
+      post.return_value.status_code = 200
+      web_app._send_slack_notification(results, "https://x/report/abc")
+    post.assert_called_once()
+    payload = json.loads(post.call_args.kwargs["data"])
+    assert payload == web_app.report_service.build_slack_payload(
+        results, "https://x/report/abc",
+    )
+    assert "ABCD: 80%" in payload["text"]
+
+
+class TestBaseUrl:
+  def test_prefers_public_base_url(self):
+    request = mock.Mock(base_url="http://internal:8080/")
+    with mock.patch.object(web_app, "PUBLIC_BASE_URL", "https://app.example"):
+      assert web_app._base_url(request) == "https://app.example"
+
+  def test_falls_back_to_request_origin(self):
+    request = mock.Mock(base_url="http://internal:8080/")
+    with mock.patch.object(web_app, "PUBLIC_BASE_URL", ""):
+      assert web_app._base_url(request) == "http://internal:8080"
+
+
+class TestComparisonSlackNotification:
+  def test_posts_single_summary(self):
+    comparison_result = {"comparison": {
+        "variant_count": 2,
+        "variants": [
+            {"video_name": "a.mp4", "performance_score": 70, "abcd_score": 80},
+            {"video_name": "b.mp4", "performance_score": 60, "abcd_score": 50},
+        ],
+        "recommended_winner": {"index": 0, "video_name": "a.mp4"},
+    }}
+    with mock.patch.object(web_app, "SLACK_WEBHOOK_URL", "https://hooks.example/x"), \
+        mock.patch.object(web_app, "_submit_io", side_effect=lambda fn: fn()), \
+        mock.patch.object(web_app._http_session, "post") as post:
+      post.return_value.status_code = 200
+      web_app._send_comparison_slack_notification(
+          comparison_result, "https://x/report/compare/abc",
+      )
+    post.assert_called_once()
+    payload = json.loads(post.call_args.kwargs["data"])
+    assert "winner a.mp4" in payload["text"]
+    body = payload["blocks"][0]["text"]["text"]
+    assert "b.mp4" in body and "https://x/report/compare/abc" in body
+
+
+class TestBqBatching:
+  def _record(self, uri, dataset="ds", table="tbl"):
+    config = web_app.build_config()
+    config.bq_dataset_name = dataset
+    config.bq_table_name = table
+    return (config, [], [], [], uri)
+
+  def test_flush_groups_by_destination(self):
+    batch = [
+        self._record("gs://b/1.mp4"),
+        self._record("gs://b/2.mp4"),
+        self._record("gs://b/3.mp4", table="other"),
+    ]
+    with mock.patch.object(
+        web_app.confidence_calibration_service, "log_evaluations_confidence",
+    ) as calib, mock.patch.object(
+        web_app.generic_helpers, "store_assessments_in_bq",
+    ) as store:
+      web_app._flush_bq(batch)
+    assert calib.call_count == 2
+    assert [uri for uri, _ in calib.call_args_list[0].args[2]] == [
+        "gs://b/1.mp4", "gs://b/2.mp4",
+    ]
+    assert store.call_count == 2
+    assert [a.video_uri for a in store.call_args_list[0].args[1]] == [
+        "gs://b/1.mp4", "gs://b/2.mp4",
+    ]
+
+  def test_writer_flushes_full_batch(self):
+    flushed = []
+    done = threading.Event()
+
+    def _flush(batch):
+      flushed.append([r[4] for r in batch])
+      done.set()
+
+    with mock.patch.object(web_app, "_bq_queue", queue.Queue()), \
+        mock.patch.object(web_app, "_bq_threads", []), \
+        mock.patch.object(web_app, "_BQ_BATCH_SIZE", 3), \
+        mock.patch.object(web_app, "_BQ_FLUSH_SECONDS", 30), \
+        mock.patch.object(web_app, "_flush_bq", side_effect=_flush):
+      for i in range(3):
+        web_app._bq_log_background(*self._record(f"gs://b/{i}.mp4"))
+      assert done.wait(timeout=5)
+    assert flushed == [["gs://b/0.mp4", "gs://b/1.mp4", "gs://b/2.mp4"]]
+
+  def test_full_queue_drops_record(self):
+    with mock.patch.object(web_app, "_bq_queue", queue.Queue(maxsize=1)), \
+        mock.patch.object(web_app, "_bq_threads", [object()]):
+      web_app._bq_log_background(*self._record("gs://b/1.mp4"))
+      web_app._bq_log_background(*self._record("gs://b/2.mp4"))
+      assert web_app._bq_queue.qsize() == 1
+
+  def test_drain_flushes_pending(self):
+    with mock.patch.object(web_app, "_bq_queue", queue.Queue()), \
+        mock.patch.object(web_app, "_flush_bq") as flush:
+      web_app._bq_queue.put(self._record("gs://b/1.mp4"))
+      web_app._drain_bq()
+      web_app._drain_bq()
+    flush.assert_called_once()
+
+
+class TestTTLCache:
+  def test_evicts_least_recently_used(self):
+    cache = web_app._TTLCache("test", maxsize=2, ttl=60)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1  # touch "a" so "b" is the oldest
+    cache["c"] = 3
+    assert "b" not in cache
+    assert (cache.get("a"), cache.get("c"), len(cache)) == (1, 3, 2)
+    assert cache.evictions == 1
+
+  def test_expired_entries_are_misses(self):
+    cache = web_app._TTLCache("test", maxsize=10, ttl=0)
+    cache["a"] = 1
+    assert cache.get("a") is None
+    with pytest.raises(KeyError):
+      cache["a"]
+    assert len(cache) == 0
+
+  def test_pop(self):
+    cache = web_app._TTLCache("test", maxsize=10, ttl=60)
+    cache["a"] = 1
+    assert cache.pop("a") == 1
+    assert cache.pop("a", "gone") == "gone"
+
+
+class TestCacheKey:
+  def test_same_inputs_same_key(self):
+    assert web_app._cache_key("gs://b/v.mp4", True, False, True) == (
+        web_app._cache_key("gs://b/v.mp4", True, False, True)
+    )
+
+  def test_flags_distinguish_keys(self):
+    keys = {
+        web_app._cache_key("gs://b/v.mp4", *flags)
+        for flags in [(True, False, True), (True, True, True), (False, False, True)]
+    }
+    assert len(keys) == 3
+
+
+class TestGetStorageClient:
+  def test_client_created_once(self):
+    with mock.patch.object(web_app, "_gcs_client", None), \
+        mock.patch.object(web_app.storage, "Client") as client_cls:
+      first = web_app._get_storage_client()
+      assert web_app._get_storage_client() is first
+    client_cls.assert_called_once_with(project=web_app.PROJECT_ID)
+
+
+
+class TestRunEvaluation:
+  @pytest.fixture
+  def pipeline(self):
+    """Patch every external step of run_evaluation with fast fakes."""
+    sd = web_app.scene_detector
+    with mock.patch.object(web_app, "_eval_cache", web_app._TTLCache("test", 8, 60)), \
+        mock.patch.object(web_app, "_bq_log_background"), \
+        mock.patch.object(web_app.generic_helpers, "remove_local_video_files"), \
+        mock.patch.object(web_app, "format_results", side_effect=lambda *a: a) as fmt, \
+        mock.patch.object(
+            sd, "extract_metadata_and_scenes",
+            return_value=({"brand_name": "Acme"}, [{"scene_number": 1}]),
+        ), \
+        mock.patch.object(sd, "download_video_locally", return_value=("/tmp/x", "/tmp/x/v.mp4")), \
+        mock.patch.object(sd, "cleanup_temp_dir"), \
+        mock.patch.object(sd, "extract_keyframes", return_value=["kf"]), \
+        mock.patch.object(sd, "analyze_volume_levels", return_value=["vol"]), \
+        mock.patch.object(sd, "generate_brand_intelligence", return_value={"bi": 1}), \
+        mock.patch.object(sd, "extract_video_metadata", return_value={"vm": 1}), \
+        mock.patch.object(sd, "generate_creative_brief", return_value={"cb": 1}), \
+        mock.patch.object(sd, "analyze_audio_richness", return_value={"ar": 1}), \
+        mock.patch.object(
+            web_app.video_evaluation_service.video_evaluation_service,
+            "evaluate_features", return_value=[],
+        ):
+      yield fmt
+
+  def _config(self):
+    return web_app.build_config(provider_type="YOUTUBE")
+
+  def test_post_stage_steps_run_concurrently(self, pipeline):
+    # Each step waits until all four have started; serial execution would
+    # break the barrier and every step would fall back to its default.
+    barrier = threading.Barrier(4, timeout=5)
+
+    def _step(value):
+      def _wait(*args):
+        barrier.wait()
+        return value
+      return _wait
+
+    sd = web_app.scene_detector
+    with mock.patch.object(sd, "extract_keyframes", side_effect=_step(["kf"])), \
+        mock.patch.object(sd, "analyze_volume_levels", side_effect=_step(["vol"])), \
+        mock.patch.object(sd, "extract_video_metadata", side_effect=_step({"vm": 1})), \
+        mock.patch.object(sd, "analyze_audio_richness", side_effect=_step({"ar": 1})):
+      result = web_app.run_evaluation("https://youtu.be/x", self._config())
+
+    assert result[0] == "Acme"
+    assert result[6:10] == (["kf"], ["vol"], {"bi": 1}, {"vm": 1})
+
+  def test_failed_step_falls_back_to_default(self, pipeline):
+    with mock.patch.object(
+        web_app.scene_detector, "extract_keyframes", side_effect=RuntimeError("boom"),
+    ):
+      result = web_app.run_evaluation("https://youtu.be/x", self._config())
+    assert result[6] == []
+    assert result[7] == ["vol"]
+
+  def test_progress_never_goes_backwards(self, pipeline):
+    seen = []
+    web_app.run_evaluation(
+        "https://youtu.be/x", self._config(),
+        on_progress=lambda step, msg, pct, partial: seen.append(pct),
+    )
+    assert seen == sorted(seen)
+    assert seen[-1] == 95
+
+  def test_steps_run_on_shared_pool(self, pipeline):
+    names = []
+
+    def _keyframes(*args):
+      names.append(threading.current_thread().name)
+      return []
+
+    with mock.patch.object(
+        web_app.scene_detector, "extract_keyframes", side_effect=_keyframes,
+    ):
+      web_app.run_evaluation("https://youtu.be/x", self._config())
+      web_app._eval_cache.pop(web_app._cache_key("https://youtu.be/x", True, False, True))
+      web_app.run_evaluation("https://youtu.be/x", self._config())
+    assert len(names) == 2
+    assert all(name.startswith("eval") for name in names)
+
+  def test_async_entry_point(self, pipeline):
+    result = asyncio.run(
+        web_app.run_evaluation_async("https://youtu.be/x", self._config()),
+    )
+    assert result[5] == [{"scene_number": 1}]
+
+  def test_slow_formatting_does_not_block_loop(self, pipeline):
+    def _slow_format(*args):
+      time.sleep(0.3)
+      return args
+
+    async def _run():
+      ticks = 0
+
+      async def _ticker():
+        nonlocal ticks
+        while True:
+          await asyncio.sleep(0.01)
+          ticks += 1
+
+      ticker = asyncio.create_task(_ticker())
+      with mock.patch.object(web_app, "format_results", side_effect=_slow_format):
+        await web_app.run_evaluation_async("https://youtu.be/x", self._config())
+      ticker.cancel()
+      return ticks
+
+    # On the loop, the sleep would freeze the ticker for the whole 0.3s.
+    assert asyncio.run(_run()) >= 10
+
+
+class TestSaveResultsToGcs:
+  def test_uploads_orjson_bytes(self):
+    client = MagicMock()
+    data = {
+        "score": np.float64(72.5),
+        "when": datetime.datetime(2026, 1, 2, 3, 4, 5),
+        "extra": {1: "int key"},
+    }
+    with mock.patch.object(web_app, "_submit_io", side_effect=lambda fn: fn()):
+      web_app._save_results_to_gcs("rpt1", data, client=client)
+    blob = client.bucket.return_value.blob.return_value
+    body = blob.upload_from_string.call_args.args[0]
+    assert isinstance(body, bytes)
+    assert json.loads(body) == {
+        "score": 72.5, "when": "2026-01-02T03:04:05", "extra": {"1": "int key"},
+    }
+
+
+class TestLoadResultsFromGcs:
+  @pytest.fixture
+  def blob(self):
+    client = MagicMock()
+    store = web_app._TTLCache("test_results", maxsize=2, ttl=60)
+    with mock.patch.object(web_app, "_get_storage_client", return_value=client), \
+        mock.patch.object(web_app, "results_store", store):
+      yield client.bucket.return_value.blob.return_value
+
+  def test_single_download_and_cached(self, blob):
+    blob.download_as_bytes.return_value = b'{"report_id": "rpt1"}'
+    assert web_app._get_results("rpt1") == {"report_id": "rpt1"}
+    assert web_app._get_results("rpt1") == {"report_id": "rpt1"}
+    blob.download_as_bytes.assert_called_once()
+    blob.exists.assert_not_called()
+
+  def test_missing_report_returns_none(self, blob):
+    blob.download_as_bytes.side_effect = type("NotFound", (Exception,), {"code": 404})()
+    with mock.patch.object(web_app.logging, "error") as log_error:
+      assert web_app._get_results("nope") is None
+    log_error.assert_not_called()
+
+
 # ---- Timestamp parsing ----
 
 class TestParseTimestampSeconds:
@@ -61,6 +446,23 @@ class TestParseTimestampSeconds:
   def test_empty(self):
     assert _parse_ts_seconds("") == 0.0
 
+  def test_seconds_only(self):
+    assert _parse_ts_seconds("45") == 45.0
+
+  def test_fractional_seconds(self):
+    assert _parse_ts_seconds("0:15.5") == 15.5
+
+  def test_too_many_parts(self):
+    assert _parse_ts_seconds("1:02:03:04") == 0.0
+
+  def test_repeated_timestamps_hit_scene_detector_cache(self):
+    cached = web_app.scene_detector._parse_timestamp_seconds
+    cached.cache_clear()
+    for _ in range(3):
+      assert _parse_ts_seconds("0:45") == 45.0
+    info = cached.cache_info()
+    assert (info.misses, info.hits, info.currsize) == (1, 2, 1)
+
 
 # ---- Emotional coherence ----
 
@@ -95,6 +497,18 @@ class TestComputeEmotionalCoherence:
     result = _compute_emotional_coherence([])
     assert result["score"] == 100
 
+  def test_score_from_mean_delta(self):
+    scenes = [
+        {"sentiment_score": 0.0, "scene_number": 1},
+        {"sentiment_score": 0.25, "scene_number": 2},
+        {"sentiment_score": -0.5, "scene_number": 3},
+        {"sentiment_score": -0.25, "scene_number": 4},
+    ]
+    result = _compute_emotional_coherence(scenes)
+    # Mean of |0.25|, |-0.75|, |0.25| is 0.4167
+    assert result["score"] == 58.3
+    assert [(f["from_scene"], f["to_scene"]) for f in result["flagged_shifts"]] == [(2, 3)]
+
   def test_mixed_shifts(self, sample_scenes):
     result = _compute_emotional_coherence(sample_scenes)
     assert 0 <= result["score"] <= 100
@@ -132,6 +546,13 @@ class TestComputeAccessibility:
       # All accessibility features should have remediation text
       assert "remediation" in f
 
+  def test_input_features_not_mutated(self, accessibility_features, sample_scenes):
+    before = [dict(f) for f in accessibility_features]
+    result = _compute_accessibility(accessibility_features, sample_scenes)
+    assert accessibility_features == before
+    speech = next(f for f in result["features"] if f["id"] == "acc_speech_rate")
+    assert speech["evidence"].startswith("Computed speech rate")
+
   def test_empty_features(self, sample_scenes):
     result = _compute_accessibility([], sample_scenes)
     assert result["score"] == 100  # No features = perfect
@@ -152,6 +573,19 @@ class TestBuildActionPlan:
     assert plan[0]["priority"] == "high"  # Sorted by priority
     assert plan[1]["priority"] == "medium"
 
+  def test_order_within_priority_preserved(self):
+    features = [
+        {"name": "A", "recommendation": "a", "recommendation_priority": "low"},
+        {"name": "B", "recommendation": "b", "recommendation_priority": "urgent"},
+        {"name": "C", "recommendation": "c", "recommendation_priority": "high"},
+        {"name": "D", "recommendation": "d"},
+        {"name": "E", "recommendation": "e", "recommendation_priority": "low"},
+        {"name": "F", "recommendation": "f", "recommendation_priority": ""},
+        {"name": "G", "recommendation": "g", "recommendation_priority": "high"},
+    ]
+    plan = _build_action_plan(features)
+    assert [p["feature_name"] for p in plan] == ["C", "G", "D", "A", "E", "B", "F"]
+
   def test_empty_features(self):
     assert _build_action_plan([]) == []
 
@@ -193,6 +627,27 @@ class TestBuildFeatureTimeline:
     assert result["video_duration_s"] == 0.0
 
 
+# ---- Scene formatting ----
+
+class TestFormatScenes:
+  def test_pads_missing_keyframes_and_volumes(self):
+    scenes = [{"description": "a"}, {"description": "b", "scene_number": 7}]
+    out = _format_scenes(scenes, ["kf1"], [{"volume_db": -12.0}])
+    assert [s["scene_number"] for s in out] == [1, 7]
+    assert [s["keyframe"] for s in out] == ["kf1", ""]
+    assert out[0]["volume_db"] == -12.0
+    assert "volume_db" not in out[1]
+    assert out[1]["music_mood"] == "none"
+
+  def test_extra_keyframes_are_ignored(self):
+    out = _format_scenes([{}], ["kf1", "kf2"], None)
+    assert len(out) == 1
+
+  def test_volume_fields_override_defaults(self):
+    out = _format_scenes([{"has_music": False}], [], [{"has_music": True}])
+    assert out[0]["has_music"] is True
+
+
 # ---- Comparison ----
 
 class TestComputeComparison:
@@ -251,6 +706,55 @@ class TestComputeComparison:
     assert diff["feature_id"] == "f1"
     assert diff["results"] == [True, False]
 
+  def test_feature_diffs_mark_missing_variants(self):
+    va = self._make_variant("A", 80, 70, 60)
+    va["abcd"]["features"] = [{"id": "f1", "name": "Hook", "detected": True}]
+    vb = self._make_variant("B", 85, 75, 50)
+    vb["abcd"]["features"] = [{"id": "f2", "name": "Logo", "detected": True}]
+    vc = self._make_variant("C", 85, 75, 50)
+    vc["persuasion"]["features"] = [{"id": "f1", "name": "Hook (late)", "detected": False}]
+    result = compute_comparison([va, vb, vc])
+    # f2 appears in one variant only, so there is nothing to disagree on
+    assert result["feature_diffs"] == [{
+        "feature_id": "f1",
+        "feature_name": "Hook",
+        "results": [True, "N/A", False],
+    }]
+
+  def test_feature_diffs_sorted_by_id(self):
+    va = self._make_variant("A", 80, 70, 60)
+    vb = self._make_variant("B", 85, 75, 50)
+    va["abcd"]["features"] = [
+        {"id": fid, "name": fid, "detected": True} for fid in ("f3", "f1", "f2")
+    ]
+    vb["abcd"]["features"] = [
+        {"id": fid, "name": fid, "detected": fid != "f2"} for fid in ("f2", "f3", "f1")
+    ]
+    vb["abcd"]["features"][1]["detected"] = False
+    diffs = compute_comparison([va, vb])["feature_diffs"]
+    assert [d["feature_id"] for d in diffs] == ["f2", "f3"]
+
+  def test_agreeing_variants_have_no_diff(self):
+    variants = [self._make_variant(n, 80, 70, 60) for n in "ABC"]
+    for v in variants:
+      v["abcd"]["features"] = [{"id": "f1", "name": "Hook", "detected": True}]
+    variants[1]["abcd"]["features"] = []
+    assert compute_comparison(variants)["feature_diffs"] == []
+
+  def test_tie_goes_to_earlier_variant(self):
+    variants = [self._make_variant(n, 80, 70, 60) for n in "AB"]
+    assert compute_comparison(variants)["recommended_winner"]["index"] == 0
+
+  def test_runner_up_is_second_best(self):
+    variants = [
+        self._make_variant("A", 90, 90, 90),
+        self._make_variant("B", 10, 10, 10),
+        self._make_variant("C", 80, 80, 80),
+    ]
+    winner = compute_comparison(variants)["recommended_winner"]
+    assert winner["video_name"] == "A"
+    assert "Outperforms C" in winner["justification"]
+
   def test_less_than_two_variants(self):
     assert compute_comparison([self._make_variant("A", 80, 70, 60)]) == {}
 
@@ -2,48 +2,61 @@
 """Script to update user credits."""
 
 import sys
-import datetime
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
-from db import SessionLocal, User, CreditTransaction
+from db import SessionLocal, User, CreditTransaction, utcnow
 
 
-def update_user_credits(email: str, credits: int):
-    """Add credits to a user account."""
+def update_users_credits(grants: list[tuple[str, int]]) -> bool:
+    """Add credits to one or more user accounts in a single transaction.
+
+    Each balance is bumped with one UPDATE ... RETURNING, so there is no
+    read-modify-write race, and all grant records go in with one INSERT.
+
+    Args:
+        grants: (email, credits) pairs.
+    Returns:
+        True if every user was found and updated.
+    """
     db: Session = SessionLocal()
     try:
-        # Find user by email
-        user = db.query(User).filter(User.email == email).first()
-        
-        if not user:
-            print(f"❌ Error: User with email '{email}' not found")
-            return False
-        
-        # Store old balance
-        old_balance = user.credits_balance
-        
-        # Update balance
-        user.credits_balance += credits
-        user.updated_at = datetime.datetime.utcnow()
-        
-        # Create transaction record
-        tx = CreditTransaction(
-            user_id=user.id,
-            type="grant",
-            amount=credits,
-            reason="admin_manual_grant",
-        )
-        db.add(tx)
-        
+        now = utcnow()
+        all_found = True
+        transactions = []
+        for email, credits in grants:
+            row = db.execute(
+                update(User)
+                .where(User.email_normalized == email.lower())
+                .values(
+                    credits_balance=User.credits_balance + credits,
+                    updated_at=now,
+                )
+                .returning(User.id, User.credits_balance)
+            ).first()
+
+            if row is None:
+                print(f"❌ Error: User with email '{email}' not found")
+                all_found = False
+                continue
+
+            transactions.append({
+                "user_id": row.id,
+                "type": "grant",
+                "amount": credits,
+                "reason": "admin_manual_grant",
+            })
+            print(f"✅ Successfully updated user: {email}")
+            print(f"   Previous balance: {row.credits_balance - credits:,} credits")
+            print(f"   Added: {credits:,} credits")
+            print(f"   New balance: {row.credits_balance:,} credits")
+
+        if transactions:
+            db.execute(insert(CreditTransaction), transactions)
+
         # Commit changes
         db.commit()
-        
-        print(f"✅ Successfully updated user: {email}")
-        print(f"   Previous balance: {old_balance:,} credits")
-        print(f"   Added: {credits:,} credits")
-        print(f"   New balance: {user.credits_balance:,} credits")
-        
-        return True
-        
+        return all_found
+
     except Exception as e:
         db.rollback()
         print(f"❌ Error updating user: {e}")
@@ -52,22 +65,31 @@ def update_user_credits(email: str, credits: int):
         db.close()
 
 
+def update_user_credits(email: str, credits: int):
+    """Add credits to a user account."""
+    return update_users_credits([(email, credits)])
+
+
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python update_user_credits.py <email> <credits>")
+    args = sys.argv[1:]
+    if not args or len(args) % 2:
+        print("Usage: python update_user_credits.py <email> <credits> [<email> <credits> ...]")
         print("Example: python update_user_credits.py kevin@upscale.ai 100000")
         sys.exit(1)
-    
-    email = sys.argv[1].strip().lower()
-    try:
-        credits = int(sys.argv[2])
-    except ValueError:
-        print("❌ Error: Credits must be a number")
-        sys.exit(1)
-    
-    if credits <= 0:
-        print("❌ Error: Credits must be positive")
-        sys.exit(1)
-    
-    success = update_user_credits(email, credits)
+
+    grants = []
+    for email, raw_credits in zip(args[::2], args[1::2]):
+        try:
+            credits = int(raw_credits)
+        except ValueError:
+            print("❌ Error: Credits must be a number")
+            sys.exit(1)
+
+        if credits <= 0:
+            print("❌ Error: Credits must be positive")
+            sys.exit(1)
+
+        grants.append((email.strip().lower(), credits))
+
+    success = update_users_credits(grants)
     sys.exit(0 if success else 1)